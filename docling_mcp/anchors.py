@@ -0,0 +1,201 @@
+"""This module maps the anchors of Docling documents to their items."""
+
+import itertools
+import threading
+from collections.abc import Iterator, Mapping
+
+from docling_core.types.doc.document import DoclingDocument, NodeItem
+
+from docling_mcp.docling_cache import DocumentCache
+
+# prefix of the stable ids of the items, telling them apart from their anchors
+STABLE_ID_PREFIX = "@"
+
+# lists of items of a Docling document, which are referenced by the anchors; the
+# older versions of docling-core lack some of them
+ITEM_LISTS = (
+    "groups",
+    "texts",
+    "pictures",
+    "tables",
+    "key_value_items",
+    "form_items",
+    "field_regions",
+    "field_items",
+)
+
+
+def _iter_nodes(doc: DoclingDocument) -> Iterator[NodeItem]:
+    """Iterate over all the nodes of a document, whether in its tree or not."""
+    yield doc.body
+    for name in ITEM_LISTS:
+        yield from getattr(doc, name, [])
+
+
+class AnchorMap:
+    """Lookup of the items of a Docling document from their anchors.
+
+    Items are looked up either by their anchor, e.g. `#/texts/2`, or by a stable id,
+    e.g. `@17`, given to every item when first seen. The anchors of the items shift
+    when other items are deleted, while their stable ids are kept for as long as the
+    items exist.
+
+    New items are picked up on their first lookup. Deletions must be followed by a
+    call to `refresh`, which also tells which anchors shifted.
+    """
+
+    def __init__(
+        self,
+        doc: DoclingDocument,
+        stable_ids: dict[str, str] | None = None,
+        next_id: int = 0,
+    ):
+        """Create the anchor map of a document.
+
+        Args:
+            doc: The document.
+            stable_ids: The stable ids of the items of a previous instance of the
+                document, by anchor, e.g. before it was spilled to disk.
+            next_id: The number of the next stable id to give.
+        """
+        self.doc = doc
+
+        self._items: dict[str, NodeItem] = {}
+        self._by_stable_id: dict[str, NodeItem] = {}
+        # stable ids by item identity, the items being kept alive by the lookups
+        self._stable_ids: dict[int, str] = {}
+        self._counter = itertools.count(next_id)
+        self._lock = threading.RLock()
+
+        self._refresh(stable_ids or {})
+
+    def resolve(self, anchor: str) -> NodeItem:
+        """Get the item at an anchor or with a stable id.
+
+        Raises:
+            ValueError: If no item of the document has this anchor or stable id.
+        """
+        with self._lock:
+            item = self._lookup(anchor)
+            if item is None:
+                # the item may have been added since the last refresh
+                self._refresh({})
+                item = self._lookup(anchor)
+            if item is None:
+                raise ValueError(
+                    f"anchor: {anchor} is not found in document {self.doc.name}."
+                )
+            return item
+
+    def get_stable_id(self, item: NodeItem) -> str:
+        """Get the stable id of an item of the document."""
+        with self._lock:
+            if id(item) not in self._stable_ids:
+                self._refresh({})
+            return self._stable_ids[id(item)]
+
+    def refresh(self, stable_ids: Mapping[int, str] | None = None) -> dict[str, str]:
+        """Update the map after items were added or deleted.
+
+        Args:
+            stable_ids: The stable ids to give back to items which were removed from
+                the document and then restored, by item identity.
+
+        Returns:
+            The new anchor of every remaining item whose anchor shifted, by its
+            previous anchor.
+        """
+        with self._lock:
+            if stable_ids:
+                self._stable_ids = {**stable_ids, **self._stable_ids}
+            return self._refresh({})
+
+    def get_stable_ids(self) -> dict[int, str]:
+        """Get the stable ids of the items of the document, by item identity."""
+        with self._lock:
+            return dict(self._stable_ids)
+
+    def export_stable_ids(self) -> tuple[dict[str, str], int]:
+        """Get the stable ids by anchor and the number of the next stable id."""
+        with self._lock:
+            next_id = next(self._counter)
+            self._counter = itertools.count(next_id)
+            return {
+                anchor: self._stable_ids[id(item)]
+                for anchor, item in self._items.items()
+            }, next_id
+
+    def _lookup(self, anchor: str) -> NodeItem | None:
+        if anchor.startswith(STABLE_ID_PREFIX):
+            return self._by_stable_id.get(anchor)
+        item = self._items.get(anchor)
+        if item is not None and item.self_ref != anchor:
+            return None
+        return item
+
+    def _refresh(self, inherited: dict[str, str]) -> dict[str, str]:
+        previous = {id(item): anchor for anchor, item in self._items.items()}
+
+        items: dict[str, NodeItem] = {}
+        by_stable_id: dict[str, NodeItem] = {}
+        stable_ids: dict[int, str] = {}
+        moved: dict[str, str] = {}
+        for item in _iter_nodes(self.doc):
+            anchor = item.self_ref
+            stable_id = self._stable_ids.get(id(item)) or inherited.get(anchor)
+            if stable_id is None:
+                stable_id = f"{STABLE_ID_PREFIX}{next(self._counter)}"
+
+            items[anchor] = item
+            by_stable_id[stable_id] = item
+            stable_ids[id(item)] = stable_id
+            if id(item) in previous and previous[id(item)] != anchor:
+                moved[previous[id(item)]] = anchor
+
+        self._items = items
+        self._by_stable_id = by_stable_id
+        self._stable_ids = stable_ids
+
+        return moved
+
+
+class AnchorMapCache:
+    """Anchor maps of the documents of a document cache, built on first use.
+
+    The stable ids of a document spilled to disk are kept, and given back to its
+    items when it is reloaded.
+    """
+
+    def __init__(self, documents: DocumentCache):
+        self.documents = documents
+        self._maps: dict[str, AnchorMap] = {}
+        self._spilled: dict[str, tuple[dict[str, str], int]] = {}
+        self._lock = threading.RLock()
+
+        documents.add_evict_callback(self._evict)
+
+    def get(self, document_key: str) -> AnchorMap:
+        """Get the anchor map of a document, building it if needed.
+
+        Raises:
+            KeyError: If the document is not in the document cache.
+        """
+        doc = self.documents[document_key]
+        with self._lock:
+            anchor_map = self._maps.get(document_key)
+            if anchor_map is None or anchor_map.doc is not doc:
+                if anchor_map is not None:
+                    stable_ids, next_id = anchor_map.export_stable_ids()
+                else:
+                    stable_ids, next_id = self._spilled.pop(document_key, ({}, 0))
+                anchor_map = AnchorMap(doc, stable_ids=stable_ids, next_id=next_id)
+                self._maps[document_key] = anchor_map
+            return anchor_map
+
+    def _evict(self, document_key: str) -> None:
+        with self._lock:
+            anchor_map = self._maps.pop(document_key, None)
+            if document_key not in self.documents:
+                self._spilled.pop(document_key, None)
+            elif anchor_map is not None:
+                self._spilled[document_key] = anchor_map.export_stable_ids()
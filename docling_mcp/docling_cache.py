@@ -1,11 +1,20 @@
-"""This module manages the cache directory to run Docling MCP tools."""
+"""This module manages the cache directory and the document caches of Docling MCP."""
 
+import atexit
 import hashlib
 import json
 import os
+import shutil
 import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, MutableMapping
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, BinaryIO, Optional
+
+from docling_core.types.doc.document import DoclingDocument, ImageRef
 
 from docling_mcp.logger import setup_logger
 
@@ -68,15 +77,516 @@ def get_cache_dir() -> Path:
     return cache_path
 
 
+# Content digests of local files, keyed by resolved path, along with the
+# modification time and size they were computed for.
+_file_digests: dict[str, tuple[int, int, str]] = {}
+
+
+def hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Creates a hash-string from the content of a local file.
+
+    The file is read in chunks, so that large documents are never loaded in memory
+    at once. The digest is remembered together with the modification time and the
+    size of the file, and it is only recomputed when any of them changes.
+    """
+    stat = path.stat()
+    resolved = str(path.resolve())
+
+    cached = _file_digests.get(resolved)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    digest = hashlib.sha256(usedforsecurity=False)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+
+    _file_digests[resolved] = (stat.st_mtime_ns, stat.st_size, digest.hexdigest())
+
+    return digest.hexdigest()
+
+
 def get_cache_key(
-    source: str, enable_ocr: bool = False, ocr_language: Optional[list[str]] = None
+    source: str,
+    enable_ocr: bool = False,
+    ocr_language: Optional[list[str]] = None,
+    options: Optional[dict[str, Any]] = None,
 ) -> str:
-    """Generate a cache key for the document conversion."""
-    key_data = {
-        "source": source,
-        "enable_ocr": enable_ocr,
-        "ocr_language": ocr_language or [],
-    }
+    """Generate a cache key for the document conversion.
+
+    Local files are identified by the digest of their content, so that the same
+    document found under different paths shares a single key, while a file edited
+    in place gets a new one. Any other source, like a URL, is identified by the
+    source string itself.
+
+    Args:
+        source: The URL or local file path to the document.
+        enable_ocr: Whether OCR is enabled for the conversion.
+        ocr_language: The languages used by the OCR engine.
+        options: Any other conversion option affecting the resulting document, like
+            the effective pipeline options of the converter.
+    """
+    path = Path(source)
+    try:
+        is_file = path.is_file()
+    except OSError:  # e.g. a URL longer than the maximum file name length
+        is_file = False
+
+    if is_file:
+        key_data: dict[str, Any] = {"content": hash_file(path)}
+    else:
+        key_data = {"source": source}
+
+    key_data.update(
+        {
+            "enable_ocr": enable_ocr,
+            "ocr_language": ocr_language or [],
+            "options": options or {},
+        }
+    )
     key_str = json.dumps(key_data, sort_keys=True)
     hash = hash_string(key_str)
     return hash[:32]
+
+
+def get_conversion_store_dir() -> Path:
+    """Get the directory of the persistent conversion store.
+
+    The store lives in the `conversions` sub-folder of the cache directory and keeps
+    one compact JSON file per converted document, named after its cache key.
+    """
+    store_dir = get_cache_dir() / "conversions"
+    os.makedirs(store_dir, exist_ok=True)
+
+    return store_dir
+
+
+def load_converted_document(cache_key: str) -> DoclingDocument | None:
+    """Load a converted document from the persistent conversion store.
+
+    Returns:
+        The Docling document stored under the cache key, or None if the store does
+        not contain it or the stored file cannot be read.
+    """
+    path = get_conversion_store_dir() / f"{cache_key}.json"
+    if not path.exists():
+        return None
+
+    try:
+        return DoclingDocument.load_from_json(filename=path)
+    except Exception:
+        logger.warning(f"Discarding unreadable converted document: {path}")
+        path.unlink(missing_ok=True)
+        return None
+
+
+def save_converted_document(cache_key: str, doc: DoclingDocument) -> Path:
+    """Save a converted document in the persistent conversion store.
+
+    The document is written to a temporary file first and then renamed, so readers
+    never observe a partially written document.
+
+    Returns:
+        Path: The path to the stored document.
+    """
+    path = get_conversion_store_dir() / f"{cache_key}.json"
+    _write_document(path, doc)
+
+    return path
+
+
+@contextmanager
+def open_atomic(path: Path) -> Iterator[BinaryIO]:
+    """Open a file to be written atomically, in binary mode.
+
+    The data is written to a temporary file next to the path, which is renamed to
+    the path once complete, so readers never observe a partially written file.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _write_document(path: Path, doc: DoclingDocument) -> None:
+    """Atomically write a document as compact JSON."""
+    with open_atomic(path) as f:
+        f.write(doc.model_dump_json(by_alias=True, exclude_none=True).encode("utf-8"))
+
+
+class ConversionManifest:
+    """Checkpoint of the conversion of a batch of files.
+
+    The manifest records the outcome of every file of a batch as a line of JSON in
+    the `batches` folder of the cache directory. When the same batch is run again,
+    the outcomes recorded for the files which did not change in the meantime are
+    reused, so that an interrupted batch resumes where it stopped.
+    """
+
+    def __init__(self, batch_id: str, resume: bool = True):
+        batches_dir = get_cache_dir() / "batches"
+        os.makedirs(batches_dir, exist_ok=True)
+
+        self.path = batches_dir / f"{batch_id}.jsonl"
+        self._entries: dict[str, dict[str, Any]] = {}
+
+        complete = True
+        if resume and self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    complete = line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # the last line of a batch interrupted while writing
+                        continue
+                    self._entries[entry["source"]] = entry
+
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if not complete:
+            self._file.write("\n")
+
+    def __enter__(self) -> "ConversionManifest":
+        """Enter the context of the manifest."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the manifest when leaving its context."""
+        self.close()
+
+    def get(self, source: Path) -> dict[str, Any] | None:
+        """Get the recorded outcome of a file, unless the file changed since."""
+        entry = self._entries.get(str(source))
+        if entry is None:
+            return None
+
+        stat = source.stat()
+        if (entry["mtime_ns"], entry["size"]) != (stat.st_mtime_ns, stat.st_size):
+            return None
+
+        return entry
+
+    def record(
+        self,
+        source: Path,
+        status: str,
+        document_key: str | None,
+        error: str | None = None,
+        **extra: Any,
+    ) -> None:
+        """Record the outcome of a file, along with its modification time and size."""
+        try:
+            stat = source.stat()
+            mtime_ns, size = stat.st_mtime_ns, stat.st_size
+        except OSError:
+            mtime_ns, size = -1, -1
+
+        entry: dict[str, Any] = {
+            "source": str(source),
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "status": status,
+            "document_key": document_key,
+            "error": error,
+            **extra,
+        }
+        self._entries[str(source)] = entry
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the manifest file."""
+        self._file.close()
+
+
+# Rough memory footprint of an item object, its provenance and references
+_ITEM_OVERHEAD = 1024
+
+
+def _estimate_image_size(image: ImageRef | None) -> int:
+    if image is None:
+        return 0
+
+    size = len(str(image.uri))
+    pil_image = getattr(image, "_pil", None)
+    if pil_image is not None:
+        size += pil_image.width * pil_image.height * len(pil_image.getbands())
+
+    return size
+
+
+def estimate_document_size(doc: DoclingDocument) -> int:
+    """Estimate the memory footprint of a Docling document in bytes.
+
+    The estimate accounts for the text of the items, the table cells and the page
+    and picture images, which dominate the size of converted documents.
+    """
+    size = 0
+    for text in doc.texts:
+        size += _ITEM_OVERHEAD + len(text.text) + len(text.orig)
+    for table in doc.tables:
+        size += _ITEM_OVERHEAD
+        for cell in table.data.table_cells:
+            size += _ITEM_OVERHEAD // 4 + len(cell.text)
+    for picture in doc.pictures:
+        size += _ITEM_OVERHEAD + _estimate_image_size(picture.image)
+    for page in doc.pages.values():
+        size += _ITEM_OVERHEAD + _estimate_image_size(page.image)
+    size += _ITEM_OVERHEAD * (
+        len(doc.groups) + len(doc.key_value_items) + len(doc.form_items)
+    )
+
+    return size
+
+
+class DocumentCache(MutableMapping[str, DoclingDocument]):
+    """In-memory cache of Docling documents with bounded size.
+
+    The cache behaves like a dictionary from document keys to Docling documents.
+    Documents are kept in least-recently-used order and, when the number of
+    documents or their estimated size exceeds the limits, the least recently used
+    documents are evicted. Evicted documents are spilled to the cache directory and
+    transparently reloaded on their next access, so that membership tests keep
+    reporting every document that was ever added and not deleted. Pinned documents
+    are never evicted.
+    """
+
+    def __init__(
+        self,
+        max_documents: int | None = None,
+        max_bytes: int | None = None,
+        spill_to_disk: bool = True,
+    ):
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self.spill_to_disk = spill_to_disk
+
+        self._documents: OrderedDict[str, DoclingDocument] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        # documents handed out since their size was last estimated
+        self._touched: set[str] = set()
+        self._spilled: dict[str, Path] = {}
+        self._spill_dir: Path | None = None
+        self._pinned: set[str] = set()
+        self._lock = threading.RLock()
+
+        self._evict_callbacks: list[Callable[[str], None]] = []
+        self._reload_callbacks: list[Callable[[str, DoclingDocument], None]] = []
+        self._replace_callbacks: list[Callable[[str], None]] = []
+
+    def add_evict_callback(self, callback: Callable[[str], None]) -> None:
+        """Register a function called with the key of every document leaving memory.
+
+        This happens when a document is spilled to disk, dropped or deleted. The
+        callbacks are called without holding the lock of the cache.
+        """
+        self._evict_callbacks.append(callback)
+
+    def add_reload_callback(
+        self, callback: Callable[[str, DoclingDocument], None]
+    ) -> None:
+        """Register a function called with every document reloaded from disk."""
+        self._reload_callbacks.append(callback)
+
+    def add_replace_callback(self, callback: Callable[[str], None]) -> None:
+        """Register a function called with the key of every document replaced.
+
+        This happens when another document is added under the key of a document in
+        memory or on disk. The callbacks are called without holding the lock of the
+        cache.
+        """
+        self._replace_callbacks.append(callback)
+
+    def pin(self, key: str) -> None:
+        """Keep a document in memory until it is unpinned or deleted.
+
+        A spilled document stays on disk until its next access.
+
+        Raises:
+            KeyError: If the document is not in the cache.
+        """
+        with self._lock:
+            if key not in self:
+                raise KeyError(key)
+            self._pinned.add(key)
+
+    def unpin(self, key: str) -> None:
+        """Let a pinned document be evicted again."""
+        with self._lock:
+            self._pinned.discard(key)
+
+    def __contains__(self, key: object) -> bool:
+        """Whether the document is in memory or spilled to disk."""
+        with self._lock:
+            return key in self._documents or key in self._spilled
+
+    def __getitem__(self, key: str) -> DoclingDocument:
+        """Get a document, reloading it from disk if it was spilled."""
+        with self._lock:
+            if key in self._documents:
+                self._documents.move_to_end(key)
+                self._touched.add(key)
+                return self._documents[key]
+
+            if key not in self._spilled:
+                raise KeyError(key)
+
+            path = self._spilled.pop(key)
+            logger.info(f"Reloading spilled document {key} from {path}")
+            doc = DoclingDocument.load_from_json(filename=path)
+            path.unlink(missing_ok=True)
+
+            self._insert(key, doc)
+            for callback in self._reload_callbacks:
+                callback(key, doc)
+            evicted = self._shrink(keep=key)
+
+        self._notify_evicted(evicted)
+        return doc
+
+    def __setitem__(self, key: str, doc: DoclingDocument) -> None:
+        """Add or replace a document, evicting others if the limits are exceeded."""
+        with self._lock:
+            replaced = key in self._spilled or (
+                key in self._documents and self._documents[key] is not doc
+            )
+            if key in self._spilled:
+                self._spilled.pop(key).unlink(missing_ok=True)
+            self._insert(key, doc)
+            evicted = self._shrink(keep=key)
+
+        if replaced:
+            for callback in self._replace_callbacks:
+                callback(key)
+        self._notify_evicted(evicted)
+
+    def __delitem__(self, key: str) -> None:
+        """Delete a document from memory and disk."""
+        with self._lock:
+            if key in self._documents:
+                self._remove(key)
+            elif key in self._spilled:
+                self._spilled.pop(key).unlink(missing_ok=True)
+            else:
+                raise KeyError(key)
+            self._pinned.discard(key)
+
+        self._notify_evicted([key])
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the keys of the documents in memory and on disk."""
+        with self._lock:
+            return iter([*self._documents, *self._spilled])
+
+    def __len__(self) -> int:
+        """Count the documents in memory and on disk."""
+        with self._lock:
+            return len(self._documents) + len(self._spilled)
+
+    def is_resident(self, key: str) -> bool:
+        """Whether the document is currently held in memory."""
+        with self._lock:
+            return key in self._documents
+
+    @property
+    def resident_bytes(self) -> int:
+        """The estimated size of the documents currently held in memory."""
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def shrink(
+        self, max_documents: int | None = None, max_bytes: int | None = None
+    ) -> int:
+        """Evict the least recently used documents until the limits are met.
+
+        Args:
+            max_documents: The number of documents to keep in memory, defaults to the
+                limit of the cache.
+            max_bytes: The estimated size of the documents to keep in memory, defaults
+                to the limit of the cache.
+
+        Returns:
+            The number of evicted documents.
+        """
+        with self._lock:
+            evicted = self._shrink(max_documents=max_documents, max_bytes=max_bytes)
+
+        self._notify_evicted(evicted)
+        return len(evicted)
+
+    def _insert(self, key: str, doc: DoclingDocument) -> None:
+        self._documents[key] = doc
+        self._documents.move_to_end(key)
+        self._sizes[key] = estimate_document_size(doc)
+        self._touched.discard(key)
+
+    def _remove(self, key: str) -> DoclingDocument:
+        self._sizes.pop(key, None)
+        self._touched.discard(key)
+        return self._documents.pop(key)
+
+    def _shrink(
+        self,
+        max_documents: int | None = None,
+        max_bytes: int | None = None,
+        keep: str | None = None,
+    ) -> list[str]:
+        """Evict documents until the limits are met, returning their keys.
+
+        The evict callbacks must be called with the keys once the lock is released.
+        """
+        max_documents = self.max_documents if max_documents is None else max_documents
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+
+        if max_bytes is not None:
+            # documents handed out to the tools may have been modified since
+            for key in self._touched:
+                self._sizes[key] = estimate_document_size(self._documents[key])
+            self._touched.clear()
+
+        evicted = []
+        total_bytes = sum(self._sizes.values())
+        for key in list(self._documents):
+            over_documents = (
+                max_documents is not None and len(self._documents) > max_documents
+            )
+            over_bytes = max_bytes is not None and total_bytes > max_bytes
+            if not (over_documents or over_bytes):
+                break
+            if key == keep or key in self._pinned:
+                continue
+
+            total_bytes -= self._sizes[key]
+            self._evict(key)
+            evicted.append(key)
+
+        return evicted
+
+    def _evict(self, key: str) -> None:
+        doc = self._remove(key)
+
+        if self.spill_to_disk:
+            path = self._get_spill_dir() / f"{key}.json"
+            _write_document(path, doc)
+            self._spilled[key] = path
+            logger.info(f"Spilled document {key} to {path}")
+        else:
+            logger.info(f"Dropped document {key} from the cache")
+
+    def _notify_evicted(self, keys: list[str]) -> None:
+        for key in keys:
+            for callback in self._evict_callbacks:
+                callback(key)
+
+    def _get_spill_dir(self) -> Path:
+        if self._spill_dir is None:
+            # a private folder, since spilled documents only live as long as the process
+            spill_dir = Path(tempfile.mkdtemp(prefix="spill-", dir=get_cache_dir()))
+            atexit.register(shutil.rmtree, spill_dir, ignore_errors=True)
+            self._spill_dir = spill_dir
+
+        return self._spill_dir
@@ -0,0 +1,460 @@
+"""This module exports Docling documents, reusing what was already serialized."""
+
+import gzip
+import io
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Literal
+
+from docling_core.transforms.serializer.markdown import (
+    MarkdownDocSerializer,
+    MarkdownParams,
+)
+from docling_core.types.doc.document import (
+    DEFAULT_CONTENT_LAYERS,
+    DOCUMENT_TOKENS_EXPORT_LABELS,
+    ContentLayer,
+    DocItem,
+    DoclingDocument,
+    FloatingItem,
+    NodeItem,
+    RefItem,
+    RichTableCell,
+    SectionHeaderItem,
+    TableItem,
+    TitleItem,
+)
+
+from docling_mcp.docling_cache import DocumentCache, open_atomic
+from docling_mcp.versions import DocumentChange, DocumentVersions
+
+# separator of the top-level fragments of a markdown export
+MARKDOWN_DELIM = "\n\n"
+
+SaveFormat = Literal[
+    "markdown", "json", "json.gz", "json.zst", "html", "doctags", "text"
+]
+
+# file suffixes of the formats documents are saved in
+SAVE_SUFFIXES: dict[str, str] = {
+    "markdown": ".md",
+    "json": ".json",
+    "json.gz": ".json.gz",
+    "json.zst": ".json.zst",
+    "html": ".html",
+    "doctags": ".doctags",
+    "text": ".txt",
+}
+
+
+@dataclass
+class MarkdownFragment:
+    """The markdown of an item, along with the items it covers, e.g. list items."""
+
+    text: str
+    covered: list[NodeItem]
+
+
+class DocumentMarkdown:
+    """Markdown export of a Docling document, serialized item by item.
+
+    The export is the same as `DoclingDocument.export_to_markdown()`, i.e. the
+    fragments of the top-level items of the document, joined by blank lines, each
+    fragment covering the subtree of its item. The fragments are kept, so that only
+    the items which changed are serialized again, and only the fragments needed are
+    serialized when the export is truncated or sliced.
+    """
+
+    def __init__(self, doc: DoclingDocument):
+        self.doc = doc
+
+        self._fragments: dict[int, MarkdownFragment] = {}
+        # the item whose fragment covers every item, by item identity
+        self._owners: dict[int, int] = {}
+        # the top-level items and their levels, walked again after structural changes
+        self._order: list[tuple[NodeItem, int]] = []
+        self._positions: dict[int, int] = {}
+        # the page of every top-level item, from the first provenance of its subtree
+        self._pages: list[int | None] = []
+        self._stale = True
+        self._text: str | None = None
+        self._serializer: MarkdownDocSerializer | None = None
+        self._lock = threading.RLock()
+
+    def apply_change(self, change: DocumentChange) -> None:
+        """Drop the fragments of the items which changed."""
+        with self._lock:
+            self._text = None
+            items = [*change.added, *change.updated, *change.removed]
+            if change.structural:
+                self._stale = True
+                # the serializer computes the captions and excluded items once
+                self._serializer = None
+                # the fragment of a list covers its items
+                items.extend(
+                    item.parent.resolve(doc=self.doc)
+                    for item in change.added
+                    if item.parent is not None
+                )
+            for item in items:
+                owner = self._owners.get(id(item), id(item))
+                fragment = self._fragments.pop(owner, None)
+                if fragment is not None:
+                    for node in fragment.covered:
+                        self._owners.pop(id(node), None)
+
+    def get_text(self, max_size: int | None = None) -> str:
+        """Get the markdown export of the document, up to a number of characters.
+
+        Only the fragments needed to reach `max_size` are serialized.
+        """
+        with self._lock:
+            if self.doc.body.meta:
+                # the metadata of the document is not serialized with its items
+                return self.doc.export_to_markdown()[:max_size]
+
+            if self._text is None:
+                self._walk()
+                parts: list[str] = []
+                size = 0
+                for position in range(len(self._order)):
+                    text = self._get_fragment(position).text
+                    if not text:
+                        continue
+                    size += len(text) + (len(MARKDOWN_DELIM) if parts else 0)
+                    parts.append(text)
+                    if max_size and size >= max_size:
+                        return MARKDOWN_DELIM.join(parts)[:max_size]
+                self._text = MARKDOWN_DELIM.join(parts)
+
+            return self._text[:max_size] if max_size else self._text
+
+    def select(
+        self,
+        first_page: int | None = None,
+        last_page: int | None = None,
+        start_item: NodeItem | None = None,
+        end_item: NodeItem | None = None,
+        section_item: NodeItem | None = None,
+    ) -> list[int]:
+        """Select the top-level items of a slice of the document, without serializing.
+
+        Args:
+            first_page: The first page of the slice. Items without provenance belong
+                to the page of the item before them.
+            last_page: The last page of the slice.
+            start_item: The first item of the slice.
+            end_item: The last item of the slice.
+            section_item: A title or section heading, whose section is the slice,
+                i.e. up to the next heading of the same or a higher level. Other
+                items only select themselves, along with their subtree.
+
+        Returns:
+            The positions of the selected top-level items, in order.
+
+        Raises:
+            ValueError: If an item is not part of the markdown export.
+        """
+        with self._lock:
+            self._walk()
+            start, stop = 0, len(self._order)
+            if start_item is not None:
+                start = max(start, self._get_position(start_item))
+            if end_item is not None:
+                stop = min(stop, self._get_position(end_item) + 1)
+            if section_item is not None:
+                position = self._get_position(section_item)
+                start = max(start, position)
+                stop = min(stop, self._get_section_end(position))
+
+            positions = []
+            for position in range(start, stop):
+                page = self._pages[position]
+                if first_page is not None and (page is None or page < first_page):
+                    continue
+                if last_page is not None and (page is None or page > last_page):
+                    continue
+                positions.append(position)
+            return positions
+
+    def get_chunk(
+        self,
+        positions: list[int],
+        max_size: int,
+        cursor: tuple[int, int] | None = None,
+    ) -> tuple[str, tuple[int, int] | None]:
+        """Get a chunk of the markdown of selected top-level items.
+
+        Chunks end between fragments whenever possible, and within a fragment only
+        if it does not fit in a chunk by itself. The chunks of a selection, joined
+        together, are the fragments of the selection joined by blank lines.
+
+        Args:
+            positions: The positions of the selected top-level items.
+            max_size: The maximum number of characters of the chunk.
+            cursor: The position of the item and the offset in its fragment to start
+                from, as returned for the previous chunk, if any.
+
+        Returns:
+            The chunk, and the cursor of the next chunk, if any.
+        """
+        with self._lock:
+            self._walk()
+            first, offset = 0, 0
+            if cursor is not None:
+                first = positions.index(cursor[0])
+                offset = cursor[1]
+
+            parts: list[str] = []
+            size = 0
+            # whether a fragment precedes the chunk, to be separated from it
+            emitted = cursor is not None
+            for index in range(first, len(positions)):
+                text = self._get_fragment(positions[index]).text[offset:]
+                if not text:
+                    offset = 0
+                    continue
+
+                prefix = MARKDOWN_DELIM if emitted and offset == 0 else ""
+                if size + len(prefix) + len(text) <= max_size:
+                    parts.append(prefix + text)
+                    size += len(prefix) + len(text)
+                    emitted = True
+                    offset = 0
+                    continue
+
+                if parts:
+                    return "".join(parts), (positions[index], offset)
+                taken = max(max_size - len(prefix), 1)
+                return prefix + text[:taken], (positions[index], offset + taken)
+
+            return "".join(parts), None
+
+    def _walk(self) -> None:
+        if not self._stale:
+            return
+
+        self._order = []
+        self._pages = []
+        page = None
+        found = False
+        # the subtree of a top-level item follows it, at a deeper level
+        top_level = None
+        for item, level in self.doc.iterate_items(
+            with_groups=True,
+            included_content_layers=DEFAULT_CONTENT_LAYERS,
+            traverse_pictures=False,
+        ):
+            if item is self.doc.body:
+                continue
+            if top_level is None or level <= top_level:
+                top_level = level
+                self._order.append((item, level))
+                self._pages.append(page)
+                found = False
+            if not found and isinstance(item, DocItem) and item.prov:
+                page = item.prov[0].page_no
+                self._pages[-1] = page
+                found = True
+
+        self._positions = {id(item): i for i, (item, _) in enumerate(self._order)}
+        self._stale = False
+
+    def _get_position(self, item: NodeItem) -> int:
+        node: NodeItem | None = item
+        while node is not None and id(node) not in self._positions:
+            node = node.parent.resolve(doc=self.doc) if node.parent else None
+        if node is None:
+            raise ValueError(
+                f"Item at {item.self_ref} is not part of the markdown export of "
+                f"document {self.doc.name}."
+            )
+        return self._positions[id(node)]
+
+    def _get_section_end(self, position: int) -> int:
+        item = self._order[position][0]
+        if not isinstance(item, TitleItem | SectionHeaderItem):
+            return position + 1
+        for end in range(position + 1, len(self._order)):
+            other = self._order[end][0]
+            if isinstance(other, TitleItem) or (
+                isinstance(item, SectionHeaderItem)
+                and isinstance(other, SectionHeaderItem)
+                and other.level <= item.level
+            ):
+                return end
+        return len(self._order)
+
+    def _get_fragment(self, position: int) -> MarkdownFragment:
+        item, level = self._order[position]
+        fragment = self._fragments.get(id(item))
+        if fragment is None:
+            fragment = self._serialize(item, level)
+        return fragment
+
+    def _serialize(self, item: NodeItem, level: int) -> MarkdownFragment:
+        if self._serializer is None:
+            # the parameters of DoclingDocument.export_to_markdown()
+            self._serializer = MarkdownDocSerializer(
+                doc=self.doc,
+                params=MarkdownParams(
+                    labels=DOCUMENT_TOKENS_EXPORT_LABELS,
+                    layers=DEFAULT_CONTENT_LAYERS,
+                    blocked_meta_names=set(),
+                ),
+            )
+
+        visited: set[str] = set()
+        result = self._serializer.serialize(item=item, visited=visited, level=level)
+
+        covered = [item]
+        covered.extend(
+            RefItem(cref=ref).resolve(doc=self.doc)
+            for ref in visited
+            if ref != item.self_ref
+        )
+        # captions, footnotes and cells are serialized with their table or picture
+        for node in list(covered):
+            if isinstance(node, FloatingItem):
+                covered.extend(
+                    ref.resolve(doc=self.doc)
+                    for ref in (*node.captions, *node.footnotes, *node.references)
+                )
+            if isinstance(node, TableItem):
+                covered.extend(
+                    child
+                    for cell in node.data.table_cells
+                    if isinstance(cell, RichTableCell)
+                    for child, _ in self.doc.iterate_items(
+                        root=cell.ref.resolve(doc=self.doc),
+                        with_groups=True,
+                        traverse_pictures=True,
+                        included_content_layers=set(ContentLayer),
+                    )
+                )
+
+        fragment = MarkdownFragment(text=result.text, covered=covered)
+        self._fragments[id(item)] = fragment
+        for node in covered:
+            self._owners[id(node)] = id(item)
+        return fragment
+
+
+class DocumentMarkdownCache:
+    """Markdown exports of the documents of a document cache, kept up to date.
+
+    An export is dropped when its document leaves memory, and serialized again when
+    the document is reloaded or replaced.
+    """
+
+    def __init__(self, documents: DocumentCache):
+        self.documents = documents
+        self._exports: dict[str, DocumentMarkdown] = {}
+        self._lock = threading.RLock()
+
+        documents.add_evict_callback(self.drop)
+
+    def get(self, document_key: str) -> DocumentMarkdown:
+        """Get the markdown export of a document.
+
+        Raises:
+            KeyError: If the document is not in the document cache.
+        """
+        doc = self.documents[document_key]
+        with self._lock:
+            export = self._exports.get(document_key)
+            if export is None or export.doc is not doc:
+                export = DocumentMarkdown(doc)
+                self._exports[document_key] = export
+            return export
+
+    def apply_change(self, change: DocumentChange) -> None:
+        """Take note of the change of a document, if its export is kept."""
+        with self._lock:
+            export = self._exports.get(change.document_key)
+        if export is not None:
+            export.apply_change(change)
+
+    def drop(self, document_key: str) -> None:
+        """Drop the markdown export of a document."""
+        with self._lock:
+            self._exports.pop(document_key, None)
+
+
+def write_document(doc: DoclingDocument, path: Path, save_format: SaveFormat) -> None:
+    """Write a document to a file in a format, atomically.
+
+    JSON is streamed to the file as it is encoded, and compressed on the fly in the
+    `json.gz` and `json.zst` formats, which are written without indentation. The
+    markdown is wrapped at 72 characters.
+
+    Raises:
+        ValueError: If the `json.zst` format is requested without the `zstandard`
+            package installed.
+    """
+    if save_format == "json.zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError(
+                "Saving in json.zst format requires the zstandard package."
+            ) from None
+
+    with open_atomic(path) as f:
+        stream: BinaryIO | gzip.GzipFile = f
+        if save_format == "json.gz":
+            stream = gzip.GzipFile(fileobj=f, mode="wb", mtime=0)
+        elif save_format == "json.zst":
+            stream = zstandard.ZstdCompressor().stream_writer(f, closefd=False)
+
+        with io.TextIOWrapper(stream, encoding="utf-8") as text:
+            if save_format == "json":
+                json.dump(doc.export_to_dict(), text, indent=2)
+            elif save_format in ("json.gz", "json.zst"):
+                json.dump(doc.export_to_dict(), text, separators=(",", ":"))
+            elif save_format == "markdown":
+                text.write(doc.export_to_markdown(text_width=72))
+            elif save_format == "html":
+                text.write(doc.export_to_html())
+            elif save_format == "doctags":
+                text.write(doc.export_to_doctags())
+            else:
+                text.write(doc.export_to_text())
+
+
+class DocumentSaveLog:
+    """Versions of the documents of a document cache last saved in every format.
+
+    Saving a document again is skipped as long as its version did not change and
+    the file is still there. The log of a document is forgotten when it is deleted
+    from the cache.
+    """
+
+    def __init__(self, documents: DocumentCache, versions: DocumentVersions):
+        self.documents = documents
+        self.versions = versions
+        self._saved: dict[tuple[str, str], tuple[Path, int]] = {}
+        self._lock = threading.RLock()
+
+        documents.add_evict_callback(self._evict)
+
+    def is_saved(self, document_key: str, save_format: str, path: Path) -> bool:
+        """Whether the current version of a document is saved in a file."""
+        with self._lock:
+            saved = self._saved.get((document_key, save_format))
+        return saved == (path, self.versions.get(document_key)) and path.exists()
+
+    def record(
+        self, document_key: str, save_format: str, path: Path, version: int
+    ) -> None:
+        """Record that a version of a document was saved in a file."""
+        with self._lock:
+            self._saved[(document_key, save_format)] = (path, version)
+
+    def _evict(self, document_key: str) -> None:
+        with self._lock:
+            if document_key not in self.documents:
+                for key in [key for key in self._saved if key[0] == document_key]:
+                    del self._saved[key]
@@ -0,0 +1,575 @@
+"""This module indexes the text of Docling documents for searching."""
+
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+from docling_core.types.doc.document import DoclingDocument, NodeItem, TextItem
+
+from docling_mcp.docling_cache import DocumentCache
+from docling_mcp.logger import setup_logger
+from docling_mcp.versions import DocumentChange
+
+# Create a default project logger
+logger = setup_logger()
+
+TOKEN_PATTERN = re.compile(r"\b\w+\b")
+
+# length of the n-grams indexing the vocabulary for fuzzy matching
+GRAM_SIZE = 3
+
+
+def tokenize(text: str) -> list[str]:
+    """Split a text into its lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def get_snippet(text: str, terms: set[str], width: int = 160) -> str:
+    """Get an excerpt of a text around the first occurrence of any of the terms."""
+    start = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        if match.group().lower() in terms:
+            start = max(0, (match.start() + match.end() - width) // 2)
+            break
+    end = min(len(text), start + width)
+    start = max(0, end - width)
+
+    snippet = " ".join(text[start:end].split())
+    if start > 0:
+        snippet = "..." + snippet
+    if end < len(text):
+        snippet += "..."
+    return snippet
+
+
+def get_max_edits(term: str) -> int:
+    """Get the default number of typos tolerated in a word, from its length."""
+    if len(term) <= 2:
+        return 0
+    if len(term) <= 5:
+        return 1
+    return 2
+
+
+def get_edit_distance(first: str, second: str, max_edits: int) -> int:
+    """Get the Levenshtein distance between two words, up to a maximum.
+
+    Returns:
+        The distance, or `max_edits + 1` if the words are further apart.
+    """
+    if abs(len(first) - len(second)) > max_edits:
+        return max_edits + 1
+
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, start=1):
+        current = [i]
+        for j, other in enumerate(second, start=1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char != other),
+                )
+            )
+        if min(current) > max_edits:
+            return max_edits + 1
+        previous = current
+
+    return min(previous[-1], max_edits + 1)
+
+
+def _get_grams(term: str) -> set[str]:
+    """Get the n-grams of a word, padded so that its edges have their own n-grams."""
+    padding = "$" * (GRAM_SIZE - 1)
+    padded = padding + term + padding
+    return {padded[i : i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+@dataclass
+class TermStatistics:
+    """Statistics of an index for the terms of a query."""
+
+    items: int
+    tokens: int
+    frequencies: dict[str, int]
+
+
+class DocumentIndex:
+    """Inverted index of the text items of a Docling document.
+
+    The index maps every token to the text items containing it, along with the
+    positions of the token within their text. It covers the text items returned by
+    `DoclingDocument.iterate_items()`, and returns its matches in that order.
+
+    The vocabulary of the index is itself indexed by n-grams and sorted, on first
+    need, to expand the words of fuzzy and prefix queries into the tokens they match.
+
+    Items added, updated or removed after the index was built must be reported with
+    `add_items`, `update_items` and `remove_items`, so that only they are tokenized
+    again. The order of the items is recomputed on the next search after a structural
+    change, which also picks up any item not reported.
+    """
+
+    def __init__(self, doc: DoclingDocument):
+        self.doc = doc
+
+        self._items: dict[int, TextItem] = {}
+        # text of the items when they were tokenized, to detect unreported updates
+        self._sources: dict[int, str] = {}
+        self._texts: dict[int, str] = {}
+        self._tokens: dict[int, dict[str, list[int]]] = {}
+        self._lengths: dict[int, int] = {}
+        self._total_length = 0
+        self._postings: dict[str, dict[int, list[int]]] = {}
+        # n-grams and sorted list of the tokens, None until first needed
+        self._grams: dict[str, set[str]] | None = None
+        self._vocabulary: list[str] | None = None
+        # position of the items in document order, None after a structural change
+        self._positions: dict[int, int] | None = None
+        self._lock = threading.RLock()
+
+        with self._lock:
+            self._get_positions()
+        logger.info(f"Indexed {len(self._items)} text items of {doc.name}")
+
+    def __len__(self) -> int:
+        """The number of indexed text items."""
+        with self._lock:
+            return len(self._get_positions())
+
+    def add_items(self, items: Sequence[NodeItem]) -> None:
+        """Index items newly added to the document."""
+        with self._lock:
+            for item in items:
+                if isinstance(item, TextItem) and id(item) not in self._items:
+                    self._add(item)
+            self._positions = None
+
+    def update_items(self, items: Sequence[NodeItem]) -> None:
+        """Index again items of the document whose text changed."""
+        with self._lock:
+            for item in items:
+                if isinstance(item, TextItem) and id(item) in self._items:
+                    self._remove(id(item))
+                    self._add(item)
+
+    def remove_items(self, items: Sequence[NodeItem]) -> None:
+        """Drop items deleted from the document, along with their children."""
+        with self._lock:
+            for item in items:
+                if id(item) in self._items:
+                    self._remove(id(item))
+            self._positions = None
+
+    def find_text(self, text: str) -> list[TextItem]:
+        """Find the items containing a text, ignoring case, in document order."""
+        query = text.lower()
+        with self._lock:
+            positions = self._get_positions()
+
+            # the whole words inside the query must be tokens of the matching items,
+            # while the words at its edges may only be parts of tokens
+            inner = [
+                match.group()
+                for match in TOKEN_PATTERN.finditer(query)
+                if match.start() > 0 and match.end() < len(query)
+            ]
+            if inner:
+                candidates = self._get_candidates(inner)
+            else:
+                candidates = set(positions)
+
+            found = [item_id for item_id in candidates if query in self._texts[item_id]]
+            found.sort(key=positions.__getitem__)
+
+            return [self._items[item_id] for item_id in found]
+
+    def find_keywords(
+        self, keywords: set[str]
+    ) -> list[tuple[TextItem, dict[str, int]]]:
+        """Find the items containing any of the keywords, in document order.
+
+        Returns:
+            The matching items along with the number of occurrences of each keyword
+            within them, in order of first occurrence.
+        """
+        with self._lock:
+            positions = self._get_positions()
+
+            found: dict[int, list[tuple[int, str, int]]] = {}
+            for keyword in keywords:
+                for item_id, offsets in self._postings.get(keyword, {}).items():
+                    found.setdefault(item_id, []).append(
+                        (offsets[0], keyword, len(offsets))
+                    )
+
+            return [
+                (
+                    self._items[item_id],
+                    {keyword: count for _, keyword, count in sorted(found[item_id])},
+                )
+                for item_id in sorted(found, key=positions.__getitem__)
+            ]
+
+    def expand_prefix(self, prefix: str) -> set[str]:
+        """Get the tokens of the index starting with a prefix."""
+        with self._lock:
+            self._get_positions()
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self._postings)
+
+            start = bisect.bisect_left(self._vocabulary, prefix)
+            end = start
+            while end < len(self._vocabulary) and self._vocabulary[end].startswith(
+                prefix
+            ):
+                end += 1
+            return set(self._vocabulary[start:end])
+
+    def expand_fuzzy(self, term: str, max_edits: int) -> set[str]:
+        """Get the tokens of the index within a number of edits of a word.
+
+        A token within `max_edits` edits shares all but `GRAM_SIZE * max_edits` of
+        the n-grams of the word, so that only the tokens sharing enough n-grams are
+        compared to the word.
+        """
+        with self._lock:
+            self._get_positions()
+            if max_edits == 0:
+                return {term} if term in self._postings else set()
+
+            if self._grams is None:
+                self._grams = {}
+                for token in self._postings:
+                    self._add_grams(token)
+
+            grams = _get_grams(term)
+            threshold = len(grams) - GRAM_SIZE * max_edits
+            if threshold > 0:
+                counts = Counter(
+                    token for gram in grams for token in self._grams.get(gram, ())
+                )
+                candidates = [
+                    token for token, count in counts.items() if count >= threshold
+                ]
+            else:
+                candidates = list(self._postings)
+
+            return {
+                token
+                for token in candidates
+                if get_edit_distance(term, token, max_edits) <= max_edits
+            }
+
+    def find_terms(
+        self, alternatives: Sequence[set[str]], phrase: bool = False
+    ) -> list[tuple[TextItem, list[str]]]:
+        """Find the items containing one of the tokens of every alternative.
+
+        Args:
+            alternatives: For every word of the query, the tokens matching it.
+            phrase: Whether the matching tokens must follow each other in order.
+
+        Returns:
+            The matching items in document order, along with the tokens matching
+            the query within them, in order of the query.
+        """
+        with self._lock:
+            positions = self._get_positions()
+            if not alternatives:
+                return []
+
+            slots: list[dict[int, dict[int, str]]] = []
+            for alternative in alternatives:
+                slot: dict[int, dict[int, str]] = {}
+                for token in alternative:
+                    for item_id, offsets in self._postings.get(token, {}).items():
+                        matches = slot.setdefault(item_id, {})
+                        matches.update(dict.fromkeys(offsets, token))
+                slots.append(slot)
+
+            candidates = set(slots[0])
+            for slot in slots[1:]:
+                candidates.intersection_update(slot)
+
+            found = []
+            for item_id in sorted(candidates, key=positions.__getitem__):
+                if phrase:
+                    start = next(
+                        (
+                            offset
+                            for offset in sorted(slots[0][item_id])
+                            if all(
+                                offset + i in slot[item_id]
+                                for i, slot in enumerate(slots)
+                            )
+                        ),
+                        None,
+                    )
+                    if start is None:
+                        continue
+                    matched = [slot[item_id][start + i] for i, slot in enumerate(slots)]
+                else:
+                    matched = [slot[item_id][min(slot[item_id])] for slot in slots]
+                found.append((self._items[item_id], list(dict.fromkeys(matched))))
+
+            return found
+
+    def get_statistics(self, terms: set[str]) -> TermStatistics:
+        """Get the statistics of the index needed to rank items for the terms."""
+        with self._lock:
+            return TermStatistics(
+                items=len(self._get_positions()),
+                tokens=self._total_length,
+                frequencies={term: len(self._postings.get(term, {})) for term in terms},
+            )
+
+    def rank(
+        self,
+        weights: Mapping[str, float],
+        average_length: float,
+        top_k: int,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> list[tuple[float, int, TextItem]]:
+        """Rank the items containing any of the terms with the Okapi BM25 function.
+
+        Args:
+            weights: The inverse document frequency of every term of the query.
+            average_length: The average number of tokens of the items of the corpus.
+            top_k: The maximum number of items to return.
+            k1: The saturation of the frequency of the terms.
+            b: The normalization of the scores by the length of the items.
+
+        Returns:
+            The best items with their score and position, from the best one.
+        """
+        with self._lock:
+            positions = self._get_positions()
+
+            scores: dict[int, float] = {}
+            for term, weight in weights.items():
+                for item_id, offsets in self._postings.get(term, {}).items():
+                    norm = k1 * (1 - b + b * self._lengths[item_id] / average_length)
+                    frequency = len(offsets)
+                    scores[item_id] = scores.get(item_id, 0.0) + (
+                        weight * frequency * (k1 + 1) / (frequency + norm)
+                    )
+
+            best = heapq.nsmallest(
+                top_k,
+                scores,
+                key=lambda item_id: (-scores[item_id], positions[item_id]),
+            )
+            return [
+                (scores[item_id], positions[item_id], self._items[item_id])
+                for item_id in best
+            ]
+
+    def _get_candidates(self, tokens: list[str]) -> set[int]:
+        """Get the items containing all the tokens."""
+        postings = sorted(
+            (self._postings.get(token, {}) for token in set(tokens)), key=len
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return candidates
+
+    def _get_positions(self) -> dict[int, int]:
+        """Get the position of the items, reconciling the index with the document."""
+        if self._positions is not None:
+            return self._positions
+
+        positions: dict[int, int] = {}
+        for item, _ in self.doc.iterate_items():
+            if not isinstance(item, TextItem):
+                continue
+            positions[id(item)] = len(positions)
+            if id(item) not in self._items:
+                self._add(item)
+            elif self._sources[id(item)] is not item.text:
+                self._remove(id(item))
+                self._add(item)
+
+        for item_id in self._items.keys() - positions.keys():
+            self._remove(item_id)
+
+        self._positions = positions
+        return positions
+
+    def _add(self, item: TextItem) -> None:
+        item_id = id(item)
+        text = item.text.lower()
+
+        tokens: dict[str, list[int]] = {}
+        for offset, token in enumerate(TOKEN_PATTERN.findall(text)):
+            tokens.setdefault(token, []).append(offset)
+        for token, offsets in tokens.items():
+            if token not in self._postings:
+                self._postings[token] = {}
+                self._vocabulary = None
+                self._add_grams(token)
+            self._postings[token][item_id] = offsets
+
+        self._items[item_id] = item
+        self._sources[item_id] = item.text
+        self._texts[item_id] = text
+        self._tokens[item_id] = tokens
+        self._lengths[item_id] = sum(len(offsets) for offsets in tokens.values())
+        self._total_length += self._lengths[item_id]
+
+    def _remove(self, item_id: int) -> None:
+        for token in self._tokens.pop(item_id):
+            posting = self._postings[token]
+            del posting[item_id]
+            if not posting:
+                del self._postings[token]
+                self._vocabulary = None
+                if self._grams is not None:
+                    for gram in _get_grams(token):
+                        self._grams[gram].discard(token)
+
+        del self._items[item_id]
+        del self._sources[item_id]
+        del self._texts[item_id]
+        self._total_length -= self._lengths.pop(item_id)
+
+    def _add_grams(self, token: str) -> None:
+        if self._grams is None:
+            return
+        for gram in _get_grams(token):
+            self._grams.setdefault(gram, set()).add(token)
+
+
+@dataclass
+class RankedItem:
+    """A text item matching a query across several documents."""
+
+    document_key: str
+    item: TextItem
+    score: float
+
+
+def rank_bm25(
+    indexes: Mapping[str, DocumentIndex],
+    query: str,
+    top_k: int = 10,
+    k1: float = 1.2,
+    b: float = 0.75,
+) -> list[RankedItem]:
+    """Rank the text items of several documents for a query with Okapi BM25.
+
+    Every text item is scored as a document of a single corpus made of the items
+    of all the indexes, so that scores are comparable across documents.
+
+    Returns:
+        The best items, from the best one. Ties are broken by document key and
+        order of the items within their document.
+    """
+    terms = set(tokenize(query))
+    if not terms or top_k <= 0:
+        return []
+
+    statistics = [index.get_statistics(terms) for index in indexes.values()]
+    items = sum(_.items for _ in statistics)
+    if items == 0:
+        return []
+    average_length = max(sum(_.tokens for _ in statistics) / items, 1.0)
+
+    weights = {}
+    for term in terms:
+        frequency = sum(_.frequencies[term] for _ in statistics)
+        if frequency:
+            weights[term] = math.log(1 + (items - frequency + 0.5) / (frequency + 0.5))
+
+    ranked = heapq.nsmallest(
+        top_k,
+        (
+            (-score, document_key, position, item)
+            for document_key, index in indexes.items()
+            for score, position, item in index.rank(
+                weights, average_length, top_k, k1=k1, b=b
+            )
+        ),
+        key=lambda _: _[:3],
+    )
+    return [
+        RankedItem(document_key=document_key, item=item, score=-score)
+        for score, document_key, _, item in ranked
+    ]
+
+
+class DocumentIndexCache:
+    """Inverted indexes of the documents of a document cache, built on first use.
+
+    An index is dropped when its document leaves memory, and rebuilt when the
+    document is reloaded or replaced.
+    """
+
+    def __init__(self, documents: DocumentCache):
+        self.documents = documents
+        self._indexes: dict[str, DocumentIndex] = {}
+        self._lock = threading.RLock()
+
+        documents.add_evict_callback(self.drop)
+
+    def get(self, document_key: str) -> DocumentIndex:
+        """Get the index of a document, building it if needed.
+
+        Raises:
+            KeyError: If the document is not in the document cache.
+        """
+        doc = self.documents[document_key]
+        with self._lock:
+            index = self._indexes.get(document_key)
+            if index is None or index.doc is not doc:
+                index = DocumentIndex(doc)
+                self._indexes[document_key] = index
+            return index
+
+    def get_resident(self) -> dict[str, DocumentIndex]:
+        """Get the indexes of all the documents held in memory, building them if needed."""
+        indexes = {}
+        for document_key in list(self.documents):
+            if self.documents.is_resident(document_key):
+                try:
+                    indexes[document_key] = self.get(document_key)
+                except KeyError:
+                    # deleted concurrently
+                    continue
+        return indexes
+
+    def peek(self, document_key: str) -> DocumentIndex | None:
+        """Get the index of a document only if it is already built and current."""
+        with self._lock:
+            index = self._indexes.get(document_key)
+        if index is None or not self.documents.is_resident(document_key):
+            return None
+        if index.doc is not self.documents[document_key]:
+            return None
+        return index
+
+    def apply_change(self, change: DocumentChange) -> None:
+        """Update the index of a changed document, if it is already built."""
+        index = self.peek(change.document_key)
+        if index is None:
+            return
+        if change.removed:
+            index.remove_items(change.removed)
+        if change.updated:
+            index.update_items(change.updated)
+        if change.added:
+            index.add_items(change.added)
+
+    def drop(self, document_key: str) -> None:
+        """Drop the index of a document."""
+        with self._lock:
+            self._indexes.pop(document_key, None)
@@ -0,0 +1,170 @@
+"""This module runs long tasks, like document conversions, as background jobs."""
+
+import itertools
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from docling_mcp.logger import setup_logger
+
+# Create a default project logger
+logger = setup_logger()
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+
+@dataclass
+class Job:
+    """A task submitted to a job queue, along with its outcome."""
+
+    job_id: str
+    priority: int
+    func: Callable[[], Any] = field(repr=False)
+    status: JobStatus = "queued"
+    result: Any = field(default=None, repr=False)
+    error: str | None = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the job reached a final status."""
+        return self.status in ("succeeded", "failed", "cancelled")
+
+
+class JobQueue:
+    """Priority queue of jobs run by a bounded pool of worker threads.
+
+    Jobs with the lowest priority value run first, and jobs of the same priority
+    run in order of submission. The worker threads are started with the first job,
+    and the outcomes of the most recent finished jobs are kept until they are
+    dropped to make room for newer ones.
+    """
+
+    def __init__(
+        self, max_workers: int = 1, max_pending: int | None = None, history: int = 1000
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending
+        self.history = history
+
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._queue: queue.PriorityQueue[tuple[int, int, str]] = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._workers: list[threading.Thread] = []
+        self._pending = 0
+        self._lock = threading.RLock()
+
+    def submit(self, func: Callable[[], Any], priority: int = 0) -> Job:
+        """Submit a task to run in the background.
+
+        Raises:
+            ValueError: If the queue already holds the maximum number of pending jobs.
+        """
+        with self._lock:
+            if self.max_pending is not None and self._pending >= self.max_pending:
+                raise ValueError(
+                    f"The job queue is full with {self._pending} pending jobs, "
+                    "retry later."
+                )
+
+            job = Job(job_id=uuid.uuid4().hex, priority=priority, func=func)
+            self._jobs[job.job_id] = job
+            self._pending += 1
+            self._queue.put((priority, next(self._counter), job.job_id))
+            self._start_workers()
+
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """Get a job from its identifier.
+
+        Raises:
+            ValueError: If the job is unknown.
+        """
+        with self._lock:
+            if job_id not in self._jobs:
+                raise ValueError(f"job-id {job_id} is not a known or recent job.")
+            return self._jobs[job_id]
+
+    def position(self, job_id: str) -> int | None:
+        """Get the number of queued jobs which run before a queued job."""
+        with self._lock:
+            job = self.get(job_id)
+            if job.status != "queued":
+                return None
+            with self._queue.mutex:
+                entries = list(self._queue.queue)
+            key = next(entry for entry in entries if entry[2] == job_id)
+            return sum(
+                1
+                for entry in entries
+                if entry < key and self._jobs[entry[2]].status == "queued"
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job which has not started yet.
+
+        Running jobs cannot be interrupted and are left to complete.
+
+        Returns:
+            Whether the job was cancelled.
+        """
+        with self._lock:
+            job = self.get(job_id)
+            if job.status != "queued":
+                return job.status == "cancelled"
+
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            self._pending -= 1
+            self._forget_finished()
+
+            return True
+
+    def _start_workers(self) -> None:
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._work,
+                name=f"docling-mcp-job-{len(self._workers)}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self) -> None:
+        while True:
+            _, _, job_id = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.status != "queued":
+                    # cancelled while waiting in the queue
+                    continue
+                job.status = "running"
+                job.started_at = time.time()
+
+            try:
+                result, error = job.func(), None
+            except Exception as e:
+                logger.exception(f"Job {job_id} failed")
+                result, error = None, str(e)
+
+            with self._lock:
+                job.result = result
+                job.error = error
+                job.status = "succeeded" if error is None else "failed"
+                job.finished_at = time.time()
+                self._pending -= 1
+                self._forget_finished()
+
+    def _forget_finished(self) -> None:
+        """Drop the oldest finished jobs beyond the history limit."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
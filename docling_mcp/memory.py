@@ -0,0 +1,159 @@
+"""This module reclaims memory when the server process is under memory pressure."""
+
+import gc
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Annotated
+
+from pydantic import Field
+
+from docling_mcp.docling_cache import DocumentCache
+from docling_mcp.logger import setup_logger
+
+# Create a default project logger
+logger = setup_logger()
+
+
+def get_rss() -> int | None:
+    """Get the resident set size of the current process in bytes, if available."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    return int(psutil.Process().memory_info().rss)
+
+
+@dataclass
+class MemoryStats:
+    """Counters of a memory manager."""
+
+    checks: Annotated[
+        int, Field(description="The number of checks of the memory usage.")
+    ] = 0
+    collections: Annotated[
+        int, Field(description="The number of garbage collections run.")
+    ] = 0
+    collected_objects: Annotated[
+        int, Field(description="The number of objects freed by garbage collections.")
+    ] = 0
+    collection_seconds: Annotated[
+        float, Field(description="The total time spent in garbage collections.")
+    ] = 0.0
+    evictions: Annotated[
+        int, Field(description="The number of times documents were evicted.")
+    ] = 0
+    evicted_documents: Annotated[
+        int, Field(description="The number of documents evicted from the cache.")
+    ] = 0
+    rss_bytes: Annotated[
+        int | None,
+        Field(description="The resident set size of the process, if available."),
+    ] = None
+    cache_bytes: Annotated[
+        int,
+        Field(description="The estimated size of the documents held in memory."),
+    ] = 0
+
+
+class MemoryManager:
+    """Reclaim memory only above watermarks, instead of after every request.
+
+    Every check compares the resident set size of the process and the estimated
+    size of the documents held by the document cache to their watermarks:
+
+    - Above the eviction watermark, the least recently used documents are evicted
+      from the cache, by the amount of memory beyond the watermark.
+    - Above the collection watermark, or when the resident set size grew by more
+      than the allowed growth since the last collection, a full garbage collection
+      is run. Collections are at least `min_interval` seconds apart.
+    """
+
+    def __init__(
+        self,
+        cache: DocumentCache,
+        collect_rss_bytes: int | None = None,
+        rss_growth_bytes: int | None = None,
+        evict_rss_bytes: int | None = None,
+        evict_cache_bytes: int | None = None,
+        min_interval: float = 0.0,
+    ):
+        self.cache = cache
+        self.collect_rss_bytes = collect_rss_bytes
+        self.rss_growth_bytes = rss_growth_bytes
+        self.evict_rss_bytes = evict_rss_bytes
+        self.evict_cache_bytes = evict_cache_bytes
+        self.min_interval = min_interval
+
+        self._stats = MemoryStats()
+        self._baseline_rss = get_rss()
+        self._last_collection = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> MemoryStats:
+        """A snapshot of the counters, along with the current memory usage."""
+        with self._lock:
+            self._stats.rss_bytes = get_rss()
+            self._stats.cache_bytes = self.cache.resident_bytes
+            return MemoryStats(**vars(self._stats))
+
+    def check(self) -> None:
+        """Evict documents and collect garbage if memory is above the watermarks."""
+        with self._lock:
+            self._stats.checks += 1
+            rss = get_rss()
+            cache_bytes = self.cache.resident_bytes
+
+            # bytes to free from the cache, to get back under the watermarks
+            excess = 0
+            if self.evict_rss_bytes is not None and rss is not None:
+                excess = max(excess, rss - self.evict_rss_bytes)
+            if self.evict_cache_bytes is not None:
+                excess = max(excess, cache_bytes - self.evict_cache_bytes)
+
+            evicted = 0
+            if excess > 0:
+                evicted = self.cache.shrink(max_bytes=max(0, cache_bytes - excess))
+                if evicted:
+                    self._stats.evictions += 1
+                    self._stats.evicted_documents += evicted
+                    logger.info(f"Evicted {evicted} documents under memory pressure")
+
+            if (evicted or self._above_collect_watermark(rss)) and (
+                time.monotonic() - self._last_collection >= self.min_interval
+            ):
+                self._collect()
+
+    def _above_collect_watermark(self, rss: int | None) -> bool:
+        if rss is None:
+            return False
+        if self.collect_rss_bytes is not None and rss > self.collect_rss_bytes:
+            return True
+        if self.rss_growth_bytes is not None and self._baseline_rss is not None:
+            return rss - self._baseline_rss > self.rss_growth_bytes
+        return False
+
+    def _collect(self) -> None:
+        start = time.monotonic()
+        collected = gc.collect()
+        self._last_collection = time.monotonic()
+
+        self._stats.collections += 1
+        self._stats.collected_objects += collected
+        self._stats.collection_seconds += self._last_collection - start
+        # memory is rarely given back to the system, measure growth from here
+        self._baseline_rss = get_rss()
+
+        logger.info(
+            f"Performed memory cleanup of {collected} objects in "
+            f"{self._last_collection - start:.3f}s"
+        )
@@ -0,0 +1,93 @@
+"""This module inspects PDF files before their conversion."""
+
+from functools import lru_cache
+from pathlib import Path
+
+import pypdfium2 as pdfium
+
+from docling.utils.locks import pypdfium2_lock
+
+from docling_mcp.logger import setup_logger
+
+# Create a default project logger
+logger = setup_logger()
+
+
+def get_page_count(source: str) -> int | None:
+    """Get the number of pages of a local PDF file.
+
+    Returns:
+        The number of pages, or None if the document is not a local PDF file or
+        cannot be read.
+    """
+    path = Path(source)
+    try:
+        if path.suffix.lower() != ".pdf" or not path.is_file():
+            return None
+        with pypdfium2_lock:
+            pdf = pdfium.PdfDocument(str(path))
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+    except (OSError, pdfium.PdfiumError):
+        return None
+
+
+def has_text_layer(source: str, min_chars: int = 32) -> bool:
+    """Check whether a local PDF file has an embedded text layer.
+
+    Every page is checked for extractable text, which is cheap compared with the
+    conversion. The document is considered to have a text layer only if every page
+    has enough text, so that a document with scanned pages still gets OCR.
+
+    Args:
+        source: The URL or local file path to the document.
+        min_chars: The minimum number of non-blank characters of a page with text.
+
+    Returns:
+        Whether the document is a PDF file with a text layer. Documents which are
+        not local PDF files, or which cannot be read, are considered without.
+    """
+    path = Path(source)
+    try:
+        if path.suffix.lower() != ".pdf" or not path.is_file():
+            return False
+        stat = path.stat()
+    except OSError:
+        return False
+
+    return _has_text_layer(
+        str(path.resolve()), stat.st_mtime_ns, stat.st_size, min_chars
+    )
+
+
+@lru_cache(maxsize=1024)
+def _has_text_layer(path: str, mtime_ns: int, size: int, min_chars: int) -> bool:
+    """Check the text layer of a PDF file, memoized by its modification time."""
+    try:
+        with pypdfium2_lock:
+            pdf = pdfium.PdfDocument(path)
+            try:
+                num_pages = len(pdf)
+                if num_pages == 0:
+                    return False
+
+                for page_no in range(num_pages):
+                    page = pdf[page_no]
+                    textpage = page.get_textpage()
+                    try:
+                        text = textpage.get_text_range()
+                    finally:
+                        textpage.close()
+                        page.close()
+                    if sum(not char.isspace() for char in text) < min_chars:
+                        logger.info(f"Page {page_no + 1} of {path} needs OCR")
+                        return False
+            finally:
+                pdf.close()
+    except pdfium.PdfiumError:
+        logger.exception(f"Could not check the text layer of {path}")
+        return False
+
+    return True
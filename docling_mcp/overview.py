@@ -0,0 +1,172 @@
+"""This module renders the outline of Docling documents, along with their anchors."""
+
+import threading
+
+from docling_core.types.doc.document import (
+    DocItem,
+    DoclingDocument,
+    GroupItem,
+    NodeItem,
+    SectionHeaderItem,
+    TitleItem,
+)
+
+from docling_mcp.docling_cache import DocumentCache
+from docling_mcp.versions import DocumentChange
+
+
+def render_overview_line(
+    item: NodeItem, level: int, section_level: int
+) -> tuple[str, int] | None:
+    """Render the line of an item in the outline of its document.
+
+    Args:
+        item: The item.
+        level: The nesting level of the item in the document tree.
+        section_level: The level of the last section heading before the item.
+
+    Returns:
+        The line and its depth, i.e. its number of indentations, or None if the
+        item is not part of the outline.
+    """
+    ref = item.get_ref()
+
+    if isinstance(item, DocItem):
+        if isinstance(item, TitleItem):
+            return f"[anchor:{ref.cref}] {item.label}: {item.text}", 0
+
+        if isinstance(item, SectionHeaderItem):
+            depth = level + item.level
+            return (
+                f"{'  ' * depth}[anchor:{ref.cref}] {item.label}-{level}: {item.text}",
+                depth,
+            )
+
+        depth = level + section_level + 1
+        return f"{'  ' * depth}[anchor:{ref.cref}] {item.label}", depth
+
+    if isinstance(item, GroupItem):
+        depth = level + section_level + 1
+        return f"{'  ' * depth}[anchor:{ref.cref}] {item.label}", depth
+
+    return None
+
+
+class DocumentOverview:
+    """Outline of a Docling document, rendered once and kept up to date.
+
+    The outline lists the items of `DoclingDocument.iterate_items()`, one per line,
+    indented by their nesting and section levels. When the text of items changes,
+    only their lines are rendered again. When items are added or removed, the tree
+    is walked again on the next request.
+    """
+
+    def __init__(self, doc: DoclingDocument):
+        self.doc = doc
+
+        self._items: list[NodeItem] = []
+        # nesting and section levels of the items, to render their lines again
+        self._levels: list[tuple[int, int]] = []
+        self._lines: list[str] = []
+        self._depths: list[int] = []
+        self._positions: dict[int, int] = {}
+        # positions of the lines of every depth limit, computed on first request
+        self._selections: dict[int | None, list[int]] = {}
+        self._stale = True
+        self._dirty: set[int] = set()
+        self._lock = threading.RLock()
+
+    def apply_change(self, change: DocumentChange) -> None:
+        """Take note of the items which changed, to render them on next request."""
+        with self._lock:
+            if change.structural:
+                self._stale = True
+            for item in change.updated:
+                if id(item) in self._positions:
+                    self._dirty.add(self._positions[id(item)])
+
+    def get_lines(self, max_depth: int | None = None) -> list[str]:
+        """Get the lines of the outline, up to a depth."""
+        with self._lock:
+            if self._stale:
+                self._render()
+            for position in self._dirty:
+                self._render_line(position)
+            self._dirty.clear()
+
+            if max_depth not in self._selections:
+                self._selections[max_depth] = [
+                    position
+                    for position, depth in enumerate(self._depths)
+                    if max_depth is None or depth <= max_depth
+                ]
+            return [self._lines[position] for position in self._selections[max_depth]]
+
+    def _render(self) -> None:
+        self._items = []
+        self._levels = []
+        self._lines = []
+        self._depths = []
+
+        section_level = 0
+        for item, level in self.doc.iterate_items():
+            if isinstance(item, SectionHeaderItem):
+                section_level = item.level
+            rendered = render_overview_line(item, level, section_level)
+            if rendered is None:
+                continue
+            self._items.append(item)
+            self._levels.append((level, section_level))
+            self._lines.append(rendered[0])
+            self._depths.append(rendered[1])
+
+        self._positions = {id(item): i for i, item in enumerate(self._items)}
+        self._selections = {}
+        self._stale = False
+        self._dirty.clear()
+
+    def _render_line(self, position: int) -> None:
+        rendered = render_overview_line(self._items[position], *self._levels[position])
+        if rendered is not None:
+            self._lines[position] = rendered[0]
+
+
+class DocumentOverviewCache:
+    """Outlines of the documents of a document cache, rendered on first use.
+
+    An outline is dropped when its document leaves memory, and rendered again when
+    the document is reloaded or replaced.
+    """
+
+    def __init__(self, documents: DocumentCache):
+        self.documents = documents
+        self._overviews: dict[str, DocumentOverview] = {}
+        self._lock = threading.RLock()
+
+        documents.add_evict_callback(self.drop)
+
+    def get(self, document_key: str) -> DocumentOverview:
+        """Get the outline of a document.
+
+        Raises:
+            KeyError: If the document is not in the document cache.
+        """
+        doc = self.documents[document_key]
+        with self._lock:
+            overview = self._overviews.get(document_key)
+            if overview is None or overview.doc is not doc:
+                overview = DocumentOverview(doc)
+                self._overviews[document_key] = overview
+            return overview
+
+    def apply_change(self, change: DocumentChange) -> None:
+        """Take note of the change of a document, if its outline is rendered."""
+        with self._lock:
+            overview = self._overviews.get(change.document_key)
+        if overview is not None:
+            overview.apply_change(change)
+
+    def drop(self, document_key: str) -> None:
+        """Drop the outline of a document."""
+        with self._lock:
+            self._overviews.pop(document_key, None)
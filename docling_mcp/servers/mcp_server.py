@@ -1,12 +1,15 @@
 """This module initializes and runs the Docling MCP server."""
 
 import enum
+import threading
 from typing import Annotated
 
 import typer
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
 
 from docling_mcp.logger import setup_logger
-from docling_mcp.shared import mcp
+from docling_mcp.shared import mcp, server_ready
 from smithery.decorators import smithery
 
 app = typer.Typer()
@@ -34,6 +37,18 @@ class TransportType(str, enum.Enum):
 _DEFAULT_TOOLS = [ToolGroups.CONVERSION, ToolGroups.GENERATION, ToolGroups.MANIPULATION]
 
 
+async def health(request: Request) -> Response:
+    """Report whether the server is ready, with a 503 status while warming up."""
+    if server_ready.is_set():
+        return JSONResponse({"status": "ready"})
+
+    return JSONResponse({"status": "warming-up"}, status_code=503)
+
+
+# registered without a decorator, which mypy reports as untyped
+mcp.custom_route("/health", methods=["GET"])(health)
+
+
 @app.command()
 def main(
     transport: TransportType = TransportType.STDIO,
@@ -45,6 +60,20 @@ def main(
             help=f"Tools to be loaded in the server. The default list is {', '.join(_DEFAULT_TOOLS)}"
         ),
     ] = None,
+    warmup: Annotated[
+        bool,
+        typer.Option(
+            help="Preload the converters and run a tiny document through them at "
+            "startup. The health endpoint reports the server ready once done."
+        ),
+    ] = False,
+    warmup_profile: Annotated[
+        list[str] | None,
+        typer.Option(
+            help="Conversion profile to warm up, can be repeated. The default "
+            "profile is warmed up if not provided."
+        ),
+    ] = None,
 ) -> None:
     """Initialize and run the Docling MCP server."""
     # Create a default project logger
@@ -77,6 +106,36 @@ def main(
         logger.info("loading Llama Stack Structured Output tools...")
         import docling_mcp.tools.llama_stack.structured_output
 
+    if warmup and ToolGroups.CONVERSION in tools:
+        from docling_mcp.settings.conversion import settings as conversion_settings
+        from docling_mcp.tools.conversion import warm_up_converters
+
+        for profile in warmup_profile or []:
+            if profile not in conversion_settings.profiles:
+                raise typer.BadParameter(
+                    f"{profile} is not a conversion profile, use one of: "
+                    f"{', '.join(conversion_settings.profiles)}.",
+                    param_hint="--warmup-profile",
+                )
+
+        def warm_up() -> None:
+            logger.info("warming up the converters...")
+            try:
+                if warm_up_converters(warmup_profile):
+                    logger.info("the converters are warm")
+                else:
+                    logger.warning("some converters could not be warmed up")
+            finally:
+                # the server is usable, if slower, with cold converters
+                logger.info("the server is ready")
+                server_ready.set()
+
+        threading.Thread(
+            target=warm_up, name="docling-mcp-warm-up", daemon=True
+        ).start()
+    else:
+        server_ready.set()
+
     # Initialize and run the server
     logger.info("starting up Docling MCP-server ...")
     mcp.settings.host = host
@@ -109,6 +168,7 @@ def create_server():
         import docling_mcp.tools.manipulation
 
     logger.info("Docling MCP server created successfully")
+    server_ready.set()
     
     return mcp
 
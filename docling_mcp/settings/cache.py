@@ -0,0 +1,21 @@
+"""This module contains the settings for the document caches."""
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Settings for the document caches."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="DOCLING_MCP_CACHE_",
+        env_file=".env",
+        # extra="allow",
+    )
+    persistent: bool = True
+    # Limits of the in-memory document cache, unbounded when not set
+    max_documents: int | None = None
+    max_bytes: int | None = None
+    spill_to_disk: bool = True
+
+
+settings = Settings()
@@ -1,8 +1,29 @@
 """This module contains the settings for conversion tools."""
 
+from typing import Literal
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class ConversionProfile(BaseModel):
+    """Options of the conversion pipeline of a profile."""
+
+    # Whether to run OCR on the bitmaps of the pages
+    do_ocr: bool = True
+    # Whether to run the table structure model, and in which mode
+    do_table_structure: bool = True
+    table_structure_mode: Literal["fast", "accurate"] = "accurate"
+
+
+DEFAULT_PROFILES: dict[str, ConversionProfile] = {
+    # born-digital documents, where OCR and table structure only burn CPU
+    "fast": ConversionProfile(do_ocr=False, do_table_structure=False),
+    "balanced": ConversionProfile(table_structure_mode="fast"),
+    "accurate": ConversionProfile(),
+}
+
+
 class Settings(BaseSettings):
     """Settings for the conversion tools."""
 
@@ -12,6 +33,26 @@ class Settings(BaseSettings):
         # extra="allow",
     )
     keep_images: bool = False
+    # Named pipeline profiles, and the profile used when a tool does not select one
+    profiles: dict[str, ConversionProfile] = DEFAULT_PROFILES
+    default_profile: str = "accurate"
+    # Skip OCR for the PDF files whose pages all have a text layer
+    ocr_triage: bool = True
+    ocr_triage_min_chars: int = 32
+    # Number of worker processes converting the files of a directory concurrently
+    num_workers: int = 1
+    # Number of documents converted concurrently by a converter
+    batch_size: int = 1
+    # Number of pages processed together by the models of a converter
+    page_batch_size: int = 4
+    # Maximum time in seconds spent converting a single document
+    document_timeout: float | None = None
+    # Number of pages converted and cached together when converting page ranges
+    page_chunk_size: int = 16
+    # Number of conversion jobs run concurrently by the job queue
+    max_jobs: int = 1
+    # Maximum number of conversion jobs waiting or running, unbounded when not set
+    max_pending_jobs: int | None = None
 
 
 settings = Settings()
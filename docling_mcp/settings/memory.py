@@ -0,0 +1,25 @@
+"""This module contains the settings for the memory manager."""
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Settings for the memory manager."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="DOCLING_MCP_MEMORY_",
+        env_file=".env",
+        # extra="allow",
+    )
+    # Resident set size above which garbage is collected, not checked when not set
+    collect_rss_bytes: int | None = None
+    # Growth of the resident set size since the last collection triggering one
+    rss_growth_bytes: int | None = 512 * 1024 * 1024
+    # Resident set size and cache size above which documents are evicted
+    evict_rss_bytes: int | None = None
+    evict_cache_bytes: int | None = None
+    # Minimum time in seconds between two garbage collections
+    min_interval: float = 1.0
+
+
+settings = Settings()
@@ -1,15 +1,87 @@
 """This module defines shared resources."""
 
+import threading
+
 from mcp.server.fastmcp import FastMCP
 
 from docling_core.types.doc.document import (
     DoclingDocument,
     NodeItem,
+    RefItem,
 )
 
+from docling_mcp.anchors import AnchorMapCache
+from docling_mcp.docling_cache import DocumentCache
+from docling_mcp.exports import DocumentMarkdownCache, DocumentSaveLog
+from docling_mcp.indexing import DocumentIndexCache
+from docling_mcp.memory import MemoryManager
+from docling_mcp.overview import DocumentOverviewCache
+from docling_mcp.settings.cache import settings
+from docling_mcp.settings.memory import settings as memory_settings
+from docling_mcp.transactions import DocumentTransactions
+from docling_mcp.versions import DocumentVersions
+
 # Create a single shared FastMCP instance
 mcp = FastMCP("docling")
 
+# Set once the server serves requests at steady-state latency, e.g. once warmed up
+server_ready = threading.Event()
+
 # Define your shared cache here if it's used by multiple tools
-local_document_cache: dict[str, DoclingDocument] = {}
+local_document_cache = DocumentCache(
+    max_documents=settings.max_documents,
+    max_bytes=settings.max_bytes,
+    spill_to_disk=settings.spill_to_disk,
+)
 local_stack_cache: dict[str, list[NodeItem]] = {}
+# Versions of the cached documents, bumped by the tools changing them
+local_document_versions = DocumentVersions(local_document_cache)
+# Inverted indexes of the cached documents, built on their first search
+local_index_cache = DocumentIndexCache(local_document_cache)
+local_document_versions.add_listener(local_index_cache.apply_change)
+# Outlines of the cached documents, rendered on their first overview
+local_overview_cache = DocumentOverviewCache(local_document_cache)
+local_document_versions.add_listener(local_overview_cache.apply_change)
+# Markdown exports of the cached documents, serialized on their first export
+local_markdown_cache = DocumentMarkdownCache(local_document_cache)
+local_document_versions.add_listener(local_markdown_cache.apply_change)
+# Versions of the cached documents last saved to disk, in every format
+local_save_log = DocumentSaveLog(local_document_cache, local_document_versions)
+# Lookups of the items of the cached documents by anchor and stable id
+local_anchor_cache = AnchorMapCache(local_document_cache)
+# Edit sessions of the cached documents, which can be rolled back
+local_transactions = DocumentTransactions(
+    local_document_cache,
+    local_document_versions,
+    local_anchor_cache,
+    local_stack_cache,
+)
+
+# Reclaim memory only when the process is under memory pressure
+memory_manager = MemoryManager(
+    local_document_cache,
+    collect_rss_bytes=memory_settings.collect_rss_bytes,
+    rss_growth_bytes=memory_settings.rss_growth_bytes,
+    evict_rss_bytes=memory_settings.evict_rss_bytes,
+    evict_cache_bytes=memory_settings.evict_cache_bytes,
+    min_interval=memory_settings.min_interval,
+)
+
+
+def _drop_stack(document_key: str) -> None:
+    """Drop the generation stack of a document which left the cache for good."""
+    if document_key not in local_document_cache:
+        local_stack_cache.pop(document_key, None)
+
+
+def _rebind_stack(document_key: str, doc: DoclingDocument) -> None:
+    """Point the generation stack of a reloaded document to its new items."""
+    if document_key in local_stack_cache:
+        local_stack_cache[document_key] = [
+            RefItem(cref=item.self_ref).resolve(doc=doc)
+            for item in local_stack_cache[document_key]
+        ]
+
+
+local_document_cache.add_evict_callback(_drop_stack)
+local_document_cache.add_reload_callback(_rebind_stack)
@@ -1,41 +1,89 @@
 """Tools for converting documents into DoclingDocument objects."""
 
-import gc
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
+from fnmatch import fnmatch
 from functools import lru_cache
+from importlib.metadata import version
+from io import BytesIO
+from itertools import islice
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any, Literal
 
+import pypdfium2 as pdfium
 from mcp.server.fastmcp import Context
 from mcp.shared.exceptions import McpError
 from mcp.types import INTERNAL_ERROR, ErrorData
 from pydantic import Field
 
-from docling.datamodel.base_models import InputFormat
+from docling.datamodel.base_models import (
+    DocumentStream,
+    FormatToExtensions,
+    InputFormat,
+)
+from docling.datamodel.document import ConversionResult
 from docling.datamodel.pipeline_options import (
     PdfPipelineOptions,
+    TableFormerMode,
+    TableStructureOptions,
 )
+from docling.datamodel.settings import DEFAULT_PAGE_RANGE, settings as docling_settings
 from docling.document_converter import DocumentConverter, FormatOption, PdfFormatOption
+from docling.exceptions import ConversionError
+from docling.utils.locks import pypdfium2_lock
 from docling_core.types.doc.document import (
     ContentLayer,
+    DocItem,
+    DoclingDocument,
+    FloatingItem,
+    FormItem,
+    KeyValueItem,
+    NodeItem,
+    RefItem,
+    RichTableCell,
+    TableItem,
 )
 from docling_core.types.doc.labels import (
     DocItemLabel,
 )
 
-from docling_mcp.docling_cache import get_cache_key
+from docling_mcp.anchors import ITEM_LISTS
+from docling_mcp.docling_cache import (
+    ConversionManifest,
+    get_cache_key,
+    hash_string,
+    load_converted_document,
+    save_converted_document,
+)
+from docling_mcp.job_queue import Job, JobQueue, JobStatus
 from docling_mcp.logger import setup_logger
+from docling_mcp.memory import MemoryStats
+from docling_mcp.ocr_triage import get_page_count, has_text_layer
+from docling_mcp.settings.cache import settings as cache_settings
 from docling_mcp.settings.conversion import settings
-from docling_mcp.shared import local_document_cache, local_stack_cache, mcp
+from docling_mcp.shared import (
+    local_document_cache,
+    local_document_versions,
+    local_stack_cache,
+    mcp,
+    memory_manager,
+)
 
 # Create a default project logger
 logger = setup_logger()
 
 
 def cleanup_memory() -> None:
-    """Force garbage collection to free up memory."""
-    logger.info("Performed memory cleanup")
-    gc.collect()
+    """Free up memory if the server is under memory pressure."""
+    memory_manager.check()
 
 
 @dataclass
@@ -79,95 +127,865 @@ class ConvertDocumentOutput:
         str,
         Field(description="The unique identifier of the document in the local cache."),
     ]
+    ocr: Annotated[
+        bool | None,
+        Field(
+            description=(
+                "Whether the document was converted with OCR. OCR is skipped for PDF "
+                "files with a text layer."
+            )
+        ),
+    ] = None
+
+
+FileConversionStatus = Literal["converted", "cached", "failed", "skipped"]
+
+
+@dataclass
+class ConvertFileOutput:
+    """Output of the convert_directory_files_into_docling_document tool for a file."""
+
+    from_cache: Annotated[
+        bool,
+        Field(
+            description=(
+                "Whether the document was already converted in the local cache."
+            )
+        ),
+    ]
+    document_key: Annotated[
+        str | None,
+        Field(
+            description=(
+                "The unique identifier of the document in the local cache, if the "
+                "file could be read."
+            )
+        ),
+    ]
+    source: Annotated[str, Field(description="The local path to the file.")]
+    status: Annotated[
+        FileConversionStatus,
+        Field(
+            description=(
+                "Whether the file was converted, found in cache, failed to convert or "
+                "was skipped because it failed to convert in a previous run."
+            )
+        ),
+    ]
+    error: Annotated[
+        str | None,
+        Field(description="The reason of the failure of a failed or skipped file."),
+    ] = None
+    ocr: Annotated[
+        bool | None,
+        Field(
+            description=(
+                "Whether the file was converted with OCR. OCR is skipped for PDF files "
+                "with a text layer."
+            )
+        ),
+    ] = None
+
+
+def _get_profile(profile: str | None) -> str:
+    """Get the name of a conversion profile, or of the default one if not given.
+
+    Raises:
+        ValueError: If the profile is not configured.
+    """
+    if profile is None:
+        return settings.default_profile
+    if profile not in settings.profiles:
+        raise ValueError(
+            f"profile {profile} is not a conversion profile, use one of: "
+            f"{', '.join(settings.profiles)}."
+        )
+
+    return profile
+
+
+def _use_ocr(source: str, profile: str) -> bool:
+    """Decide whether a document is converted with OCR.
+
+    OCR is skipped for the profiles without OCR, as well as for the PDF files whose
+    pages all have a text layer when the OCR triage is enabled.
+    """
+    if not settings.profiles[profile].do_ocr:
+        return False
+    if not settings.ocr_triage:
+        return True
+
+    return not has_text_layer(source, min_chars=settings.ocr_triage_min_chars)
 
 
 @lru_cache
-def _get_converter() -> DocumentConverter:
+def _get_pipeline_options(profile: str, ocr: bool = True) -> PdfPipelineOptions:
+    options = settings.profiles[profile]
     pipeline_options = PdfPipelineOptions()
-    # pipeline_options.do_ocr = False  # Skip OCR for faster processing (enable for scanned docs)
+    pipeline_options.do_ocr = options.do_ocr and ocr
+    pipeline_options.do_table_structure = options.do_table_structure
+    pipeline_options.table_structure_options = TableStructureOptions(
+        mode=TableFormerMode(options.table_structure_mode)
+    )
     pipeline_options.generate_page_images = settings.keep_images
+    pipeline_options.document_timeout = settings.document_timeout
+
+    return pipeline_options
+
+
+@lru_cache
+def _get_conversion_options(profile: str, ocr: bool = True) -> dict[str, Any]:
+    """Get the options that identify the documents produced by a converter.
+
+    They are part of the cache key, so that documents converted by another Docling
+    version, profile or with different pipeline options are never served from the
+    cache.
+    """
+    return {
+        "docling": version("docling"),
+        "profile": profile,
+        "pipeline_options": _get_pipeline_options(profile, ocr).model_dump(mode="json"),
+    }
+
+
+@lru_cache
+def _get_converter(profile: str, ocr: bool = True) -> DocumentConverter:
+    pipeline_options = _get_pipeline_options(profile, ocr)
+
+    # Documents of a batch are converted concurrently, each in batches of pages
+    docling_settings.perf.doc_batch_size = settings.batch_size
+    docling_settings.perf.doc_batch_concurrency = settings.batch_size
+    docling_settings.perf.page_batch_size = settings.page_batch_size
 
     format_options: dict[InputFormat, FormatOption] = {
         InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options),
         InputFormat.IMAGE: PdfFormatOption(pipeline_options=pipeline_options),
     }
 
-    logger.info(f"Creating DocumentConverter with format_options: {format_options}")
+    logger.info(
+        f"Creating DocumentConverter for profile {profile} (ocr={ocr}) with "
+        f"format_options: "
+        f"{format_options}"
+    )
     return DocumentConverter(format_options=format_options)
 
 
+def _add_document_to_local_cache(
+    cache_key: str, doc: DoclingDocument, source: str
+) -> None:
+    """Add a converted document and its generation stack to the local caches."""
+    local_document_cache[cache_key] = doc
+
+    item = doc.add_text(
+        label=DocItemLabel.TEXT,
+        text=f"source: {source}",
+        content_layer=ContentLayer.FURNITURE,
+    )
+
+    local_stack_cache[cache_key] = [item]
+
+
+def _is_document_cached(cache_key: str, source: str) -> bool:
+    """Check the local cache and the persistent conversion store for a document.
+
+    A document found in the persistent conversion store is loaded into the local
+    cache, so that it is available to all the other tools.
+    """
+    if cache_key in local_document_cache:
+        return True
+
+    if not cache_settings.persistent:
+        return False
+
+    doc = load_converted_document(cache_key)
+    if doc is None:
+        return False
+
+    logger.info(f"Loaded {source} from the persistent conversion store.")
+    _add_document_to_local_cache(cache_key, doc, source)
+
+    return True
+
+
+def _store_converted_document(cache_key: str, doc: DoclingDocument) -> None:
+    """Save a freshly converted document in the persistent conversion store."""
+    if not cache_settings.persistent:
+        return
+
+    try:
+        save_converted_document(cache_key, doc)
+    except OSError:
+        logger.exception(f"Could not persist the document with key: {cache_key}")
+
+
+def _get_conversion_error(result: ConversionResult) -> str | None:
+    """Get the error message of a failed conversion, or None if it succeeded."""
+    # Check for errors - handle different API versions
+    has_error = False
+    error_message = ""
+
+    # Try different ways to check for errors based on the API version
+    if hasattr(result, "status"):
+        if hasattr(result.status, "is_error"):
+            has_error = result.status.is_error
+        elif hasattr(result.status, "error"):
+            has_error = result.status.error
+
+    if hasattr(result, "errors") and result.errors:
+        has_error = True
+        error_message = str(result.errors)
+
+    return error_message if has_error else None
+
+
+def _convert_file(
+    source: str,
+    profile: str,
+    ocr: bool = True,
+    page_range: tuple[int, int] = DEFAULT_PAGE_RANGE,
+) -> DoclingDocument:
+    """Convert a document with the converter of the current process.
+
+    This function runs in the worker processes of the conversion pool, as well as
+    in worker threads of the server process.
+
+    Raises:
+        RuntimeError: If the conversion failed.
+    """
+    result = _get_converter(profile, ocr).convert(source, page_range=page_range)
+
+    error_message = _get_conversion_error(result)
+    if error_message is not None:
+        raise RuntimeError(f"Conversion failed: {error_message}")
+
+    return result.document
+
+
+def _get_ocr_variants(profile: str) -> list[bool]:
+    """Get the OCR settings the converters of a profile are used with.
+
+    Raises:
+        ValueError: If the profile is not configured.
+    """
+    do_ocr = settings.profiles[_get_profile(profile)].do_ocr
+    # the OCR triage converts the documents with a text layer without OCR
+    return [True, False] if do_ocr and settings.ocr_triage else [do_ocr]
+
+
+def _warm_up_converter() -> None:
+    """Initialize the converters of the default profile in a new worker process."""
+    try:
+        variants = _get_ocr_variants(settings.default_profile)
+    except ValueError:
+        logger.exception("Could not warm up the converters of a conversion worker")
+        return
+    for ocr in variants:
+        try:
+            converter = _get_converter(settings.default_profile, ocr)
+            converter.initialize_pipeline(InputFormat.PDF)
+        except Exception:
+            # a failing initializer breaks the whole pool, let the conversions
+            # report it
+            logger.exception(
+                f"Could not warm up the converter (ocr={ocr}) of a conversion worker"
+            )
+
+
+@lru_cache
+def _get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Get a pool of worker processes, each holding its own warm converter."""
+    logger.info(f"Starting a conversion pool with {max_workers} worker processes")
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        # forking a process running the models or the event loop is unsafe
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_up_converter,
+    )
+
+
+def _get_warm_up_document() -> DocumentStream:
+    """Get a tiny document with a single blank page, to run through a converter."""
+    stream = BytesIO()
+    with pypdfium2_lock:
+        pdf = pdfium.PdfDocument.new()
+        try:
+            pdf.new_page(612, 792)
+            pdf.save(stream)
+        finally:
+            pdf.close()
+    stream.seek(0)
+
+    return DocumentStream(name="warm-up.pdf", stream=stream)
+
+
+def warm_up_converters(profiles: list[str] | None = None) -> bool:
+    """Preload the converters of conversion profiles and run a tiny document through.
+
+    The converters of a profile with OCR are warmed up with and without OCR when the
+    OCR triage is enabled, as both are used. With more than one conversion worker,
+    the worker processes of the conversion pool are started and warmed up as well.
+
+    Args:
+        profiles: The conversion profiles to warm up, the default profile if not
+            given.
+
+    Returns:
+        Whether all the converters were warmed up successfully.
+    """
+    success = True
+    for profile in profiles or [settings.default_profile]:
+        try:
+            variants = _get_ocr_variants(profile)
+        except ValueError:
+            logger.exception(f"Could not warm up the converter of {profile}")
+            success = False
+            continue
+        for ocr in variants:
+            start = time.monotonic()
+            try:
+                converter = _get_converter(profile, ocr)
+                converter.initialize_pipeline(InputFormat.PDF)
+                converter.convert(_get_warm_up_document(), raises_on_error=False)
+            except Exception:
+                logger.exception(f"Could not warm up the converter of {profile}")
+                success = False
+                continue
+            logger.info(
+                f"Warmed up the converter of profile {profile} (ocr={ocr}) in "
+                f"{time.monotonic() - start:.1f}s"
+            )
+
+    if settings.num_workers > 1:
+        pool = _get_process_pool(settings.num_workers)
+        # every worker process warms up its converter before its first task
+        try:
+            futures = [pool.submit(os.getpid) for _ in range(settings.num_workers)]
+            for future in futures:
+                future.result()
+        except Exception:
+            logger.exception("Could not warm up the conversion workers")
+            success = False
+
+    return success
+
+
+async def _convert_files(
+    files: list[Path], profile: str, ocr: bool = True
+) -> AsyncIterator[tuple[int, DoclingDocument | None, str | None]]:
+    """Convert files without blocking the event loop.
+
+    With more than one worker configured, the files are converted concurrently in
+    the conversion pool. Otherwise they are streamed through the batch conversion
+    of the shared converter, in a worker thread. A file failing to convert does not
+    interrupt the conversion of the other files.
+
+    Yields:
+        The index of each file along with either its document or the reason of its
+        failure, in order of completion.
+    """
+    if not files:
+        return
+
+    if settings.num_workers <= 1:
+        async for item in _convert_files_in_batches(files, profile, ocr):
+            yield item
+        return
+
+    loop = asyncio.get_running_loop()
+    pool = _get_process_pool(settings.num_workers)
+
+    async def convert(
+        i: int, file: Path
+    ) -> tuple[int, DoclingDocument | None, str | None]:
+        try:
+            return (
+                i,
+                await loop.run_in_executor(
+                    pool, _convert_file, str(file), profile, ocr
+                ),
+                None,
+            )
+        except BrokenProcessPool as e:
+            # a crashed worker breaks the pool, release it and start a new one for
+            # the next batches
+            pool.shutdown(wait=False, cancel_futures=True)
+            _get_process_pool.cache_clear()
+            return i, None, f"Conversion failed: {e!s}"
+        except Exception as e:
+            return i, None, str(e)
+
+    tasks = [asyncio.ensure_future(convert(i, file)) for i, file in enumerate(files)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        # do not keep the pool busy with a batch which failed or was cancelled
+        for task in tasks:
+            task.cancel()
+
+
+def _resolve_paths(files: list[Path]) -> list[Path]:
+    return [file.resolve() for file in files]
+
+
+def _next_result(
+    results: Iterator[ConversionResult],
+) -> tuple[ConversionResult, Path] | None:
+    """Get the next result of a batch conversion, and the full path of its file."""
+    result = next(results, None)
+    if result is None:
+        return None
+    return result, Path(result.input.file).resolve()
+
+
+async def _convert_files_in_batches(
+    files: list[Path], profile: str, ocr: bool = True
+) -> AsyncIterator[tuple[int, DoclingDocument | None, str | None]]:
+    """Convert files with the batch conversion of the shared converter.
+
+    The results are pulled one at a time from a worker thread, so that every
+    document is yielded as soon as it is converted, while the models of the
+    converter stay loaded across the whole batch.
+    """
+    results = _get_converter(profile, ocr).convert_all(files, raises_on_error=False)
+    # files of different folders may share their names, compare their full paths
+    paths = await asyncio.to_thread(_resolve_paths, files)
+    pending = deque(enumerate(paths))
+
+    while (item := await asyncio.to_thread(_next_result, results)) is not None:
+        result, path = item
+        # results come in order, unless Docling skipped an unsupported file
+        while pending and pending[0][1] != path:
+            i, _ = pending.popleft()
+            yield i, None, "Conversion failed: the file was not converted"
+        if not pending:
+            break
+        i, _ = pending.popleft()
+
+        error_message = _get_conversion_error(result)
+        if error_message is not None:
+            yield i, None, f"Conversion failed: {error_message}"
+        else:
+            yield i, result.document, None
+
+    for i, _ in pending:
+        yield i, None, "Conversion failed: the file was not converted"
+
+
+def _get_page_range(
+    page_range: tuple[int, int] | None, max_pages: int | None
+) -> tuple[int, int] | None:
+    """Get the range of pages to convert, or None to convert the whole document.
+
+    Raises:
+        ValueError: If the page range or the maximum number of pages is invalid.
+    """
+    if max_pages is not None and max_pages < 1:
+        raise ValueError(f"max_pages {max_pages} must be at least 1.")
+    if page_range is None:
+        return None if max_pages is None else (1, max_pages)
+
+    first, last = page_range
+    if first < 1 or last < first:
+        raise ValueError(
+            f"page_range {list(page_range)} must start at page 1 or later and end "
+            "after its start."
+        )
+    if max_pages is not None:
+        last = min(last, first + max_pages - 1)
+
+    return first, last
+
+
+def _merge_page_chunks(
+    chunks: list[DoclingDocument], first: int, last: int
+) -> DoclingDocument:
+    """Merge the chunks of pages of a document, keeping the pages in a range.
+
+    The chunks must hold consecutive ranges of pages, in order. Unlike a plain
+    concatenation, the pages keep their numbers in the original document.
+    """
+    if len(chunks) == 1 and not chunks[0].pages:
+        # a document without pages
+        return chunks[0]
+
+    parts = []
+    page_nos: list[int] = []
+    for chunk in chunks:
+        page_nrs = {page_no for page_no in chunk.pages if first <= page_no <= last}
+        if page_nrs == set(chunk.pages):
+            parts.append(chunk)
+        elif page_nrs:
+            parts.append(chunk.filter(page_nrs=page_nrs))
+        page_nos.extend(sorted(page_nrs))
+
+    doc = DoclingDocument.concatenate(parts)
+
+    # the concatenation numbers the pages from 1, restore the original numbers
+    original = dict(zip(sorted(doc.pages), page_nos, strict=True))
+    doc.pages = {
+        original[page_no]: page.model_copy(update={"page_no": original[page_no]})
+        for page_no, page in doc.pages.items()
+    }
+    for item, _ in doc.iterate_items(
+        traverse_pictures=True, included_content_layers=set(ContentLayer)
+    ):
+        if isinstance(item, DocItem):
+            for prov in item.prov:
+                prov.page_no = original.get(prov.page_no, prov.page_no)
+
+    return doc
+
+
+def _append_page_chunk(doc: DoclingDocument, chunk: DoclingDocument) -> list[NodeItem]:
+    """Move the items and pages of a chunk of pages to the end of a document.
+
+    Unlike merging all the chunks again, only the items of the new chunk are
+    touched. The chunk must be a copy owned by the caller, as its items are moved
+    rather than copied.
+
+    Returns:
+        The items added to the document.
+    """
+    offsets = {
+        name: len(getattr(doc, name)) for name in ITEM_LISTS if hasattr(doc, name)
+    }
+
+    def shift(ref: RefItem) -> RefItem:
+        parts = ref.cref.split("/")
+        if len(parts) != 3:
+            # the body of the document
+            return ref
+        return RefItem(cref=f"#/{parts[1]}/{int(parts[2]) + offsets[parts[1]]}")
+
+    added: list[NodeItem] = []
+    for name in offsets:
+        for item in getattr(chunk, name):
+            item.self_ref = shift(item.get_ref()).cref
+            if item.parent is not None:
+                item.parent = shift(item.parent)
+            item.children = [shift(ref) for ref in item.children]
+            if isinstance(item, FloatingItem):
+                item.captions = [shift(ref) for ref in item.captions]
+                item.references = [shift(ref) for ref in item.references]
+                item.footnotes = [shift(ref) for ref in item.footnotes]
+            if isinstance(item, TableItem):
+                for cell in item.data.table_cells:
+                    if isinstance(cell, RichTableCell):
+                        cell.ref = shift(cell.ref)
+            if isinstance(item, KeyValueItem | FormItem):
+                for graph_cell in item.graph.cells:
+                    if graph_cell.item_ref is not None:
+                        graph_cell.item_ref = shift(graph_cell.item_ref)
+            added.append(item)
+
+    for name in offsets:
+        getattr(doc, name).extend(getattr(chunk, name))
+    doc.body.children.extend(shift(ref) for ref in chunk.body.children)
+    doc.pages.update(chunk.pages)
+
+    return added
+
+
+def _iter_page_chunks(
+    source: str, profile: str, ocr: bool, page_range: tuple[int, int]
+) -> Iterator[DoclingDocument]:
+    """Convert a range of pages of a document, in chunks of pages.
+
+    The pages are converted in chunks aligned on multiples of the page chunk size,
+    and each chunk is saved in the persistent conversion store. Converting another
+    range of pages of the same document later only converts the missing chunks.
+
+    Yields:
+        The chunks of pages, in order, as soon as they are converted. A document
+        whose backend ignores page ranges is yielded whole, as a single chunk.
+
+    Raises:
+        RuntimeError: If the conversion failed.
+    """
+    first, last = page_range
+    size = settings.page_chunk_size
+
+    page_count = get_page_count(source)
+    if page_count is not None:
+        # Docling rejects the chunks starting after the last page of the document
+        last = max(first, min(last, page_count))
+
+    for i, start in enumerate(range((first - 1) // size * size + 1, last + 1, size)):
+        chunk_range = (start, start + size - 1)
+        chunk_key = get_cache_key(
+            source,
+            enable_ocr=ocr,
+            options={
+                **_get_conversion_options(profile, ocr),
+                "page_range": list(chunk_range),
+            },
+        )
+
+        chunk = (
+            load_converted_document(chunk_key) if cache_settings.persistent else None
+        )
+        if chunk is None:
+            logger.info(f"Converting pages {start} to {chunk_range[1]} of {source}")
+            try:
+                chunk = _convert_file(source, profile, ocr, chunk_range)
+            except ConversionError as e:
+                if i > 0 and "page_range start" in str(e):
+                    # the previous chunk ended on the last page of the document
+                    return
+                raise
+            _store_converted_document(chunk_key, chunk)
+
+        if (
+            not chunk.pages
+            or min(chunk.pages) < start
+            or max(chunk.pages) > chunk_range[1]
+        ):
+            # the backend of the document ignores page ranges
+            if i == 0:
+                yield chunk
+            return
+
+        yield chunk
+        if max(chunk.pages) < chunk_range[1]:
+            # the last page of the document
+            return
+
+
+def _convert_page_range(
+    source: str, profile: str, ocr: bool, page_range: tuple[int, int]
+) -> DoclingDocument:
+    """Convert a range of pages of a document, merging its chunks of pages.
+
+    Raises:
+        RuntimeError: If the conversion failed.
+    """
+    chunks = list(_iter_page_chunks(source, profile, ocr, page_range))
+
+    return _merge_page_chunks(chunks, *page_range)
+
+
+def _get_document_key(
+    source: str, profile: str, page_range: tuple[int, int] | None = None
+) -> tuple[str, bool]:
+    """Get the cache key of a document, and whether it is converted with OCR."""
+    ocr = _use_ocr(source, profile)
+    options = _get_conversion_options(profile, ocr)
+    if page_range is not None:
+        options = {**options, "page_range": list(page_range)}
+
+    return get_cache_key(source, enable_ocr=ocr, options=options), ocr
+
+
+def _convert_document(
+    source: str, profile: str, page_range: tuple[int, int] | None = None
+) -> ConvertDocumentOutput:
+    """Convert a document into the local cache, unless it is already cached.
+
+    Raises:
+        RuntimeError: If the conversion failed.
+    """
+    # Remove any quotes from the source string
+    source = source.strip("\"'")
+
+    # Log the cleaned source
+    logger.info(f"Processing document from source: {source}")
+
+    # Generate cache key, which records whether the document needs OCR
+    cache_key, ocr = _get_document_key(source, profile, page_range)
+
+    if _is_document_cached(cache_key, source):
+        logger.info(f"{source} has previously been added.")
+        return ConvertDocumentOutput(True, cache_key, ocr)
+
+    # Convert the document
+    logger.info(f"Start conversion (ocr={ocr}, page_range={page_range})")
+    if page_range is None:
+        doc = _convert_file(source, profile, ocr)
+    else:
+        doc = _convert_page_range(source, profile, ocr, page_range)
+
+    _store_converted_document(cache_key, doc)
+    _add_document_to_local_cache(cache_key, doc, source)
+
+    # Log completion
+    logger.info(f"Successfully created the Docling document: {source}")
+
+    # Clean up memory
+    cleanup_memory()
+
+    return ConvertDocumentOutput(False, cache_key, ocr)
+
+
 @mcp.tool(title="Convert document into Docling document")
 def convert_document_into_docling_document(
     source: Annotated[
         str,
         Field(description="The URL or local file path to the document."),
     ],
+    profile: Annotated[
+        str | None,
+        Field(
+            description=(
+                "The conversion profile, for example fast (no OCR nor table "
+                "structure, for born-digital documents), balanced or accurate. The "
+                "default profile of the server is used if not provided."
+            )
+        ),
+    ] = None,
+    page_range: Annotated[
+        tuple[int, int] | None,
+        Field(
+            description=(
+                "The first and last pages to convert, numbered from 1. The whole "
+                "document is converted if not provided. Converting another range of "
+                "the same document later reuses the pages already converted."
+            ),
+            examples=[[1, 20]],
+        ),
+    ] = None,
+    max_pages: Annotated[
+        int | None,
+        Field(
+            description=(
+                "The maximum number of pages to convert, from the first page of the "
+                "range or of the document."
+            )
+        ),
+    ] = None,
 ) -> ConvertDocumentOutput:
     """Convert a document of any type from a URL or local path and store in local cache.
 
     This tool takes a document's URL or local file path, converts it using
     Docling's DocumentConverter, and stores the resulting Docling document in a
     local cache. It returns an output with a boolean set to False along with the
-    document's unique cache key. If the document was already in the local cache,
-    the conversion is skipped and the output boolean is set to True.
+    document's unique cache key. If the document was already in the local cache or
+    in the persistent conversion store, the conversion is skipped and the output
+    boolean is set to True. The conversion blocks until it completes: for large
+    documents, prefer submitting a conversion job.
     """
     try:
-        # Remove any quotes from the source string
-        source = source.strip("\"'")
-
-        # Log the cleaned source
-        logger.info(f"Processing document from source: {source}")
-
-        # Generate cache key
-        cache_key = get_cache_key(source)
-
-        if cache_key in local_document_cache:
-            logger.info(f"{source} has previously been added.")
-            return ConvertDocumentOutput(True, cache_key)
+        return _convert_document(
+            source, _get_profile(profile), _get_page_range(page_range, max_pages)
+        )
 
-        # Get converter
-        converter = _get_converter()
+    except Exception as e:
+        logger.exception(f"Error converting document: {source}")
+        raise McpError(
+            ErrorData(code=INTERNAL_ERROR, message=f"Unexpected error: {e!s}")
+        ) from e
 
-        # Convert the document
-        logger.info("Start conversion")
-        result = converter.convert(source)
 
-        # Check for errors - handle different API versions
-        has_error = False
-        error_message = ""
+@mcp.tool(title="Stream document into Docling document")
+async def stream_document_into_docling_document(
+    source: Annotated[
+        str,
+        Field(description="The URL or local file path to the document."),
+    ],
+    ctx: Context,  # type: ignore[type-arg]
+    profile: Annotated[
+        str | None,
+        Field(
+            description=(
+                "The conversion profile, for example fast (no OCR nor table "
+                "structure, for born-digital documents), balanced or accurate. The "
+                "default profile of the server is used if not provided."
+            )
+        ),
+    ] = None,
+    page_range: Annotated[
+        tuple[int, int] | None,
+        Field(
+            description=(
+                "The first and last pages to convert, numbered from 1. The whole "
+                "document is converted if not provided. Converting another range of "
+                "the same document later reuses the pages already converted."
+            ),
+            examples=[[1, 20]],
+        ),
+    ] = None,
+    max_pages: Annotated[
+        int | None,
+        Field(
+            description=(
+                "The maximum number of pages to convert, from the first page of the "
+                "range or of the document."
+            )
+        ),
+    ] = None,
+) -> ConvertDocumentOutput:
+    """Convert a document page by page, making the converted pages available early.
 
-        # Try different ways to check for errors based on the API version
-        if hasattr(result, "status"):
-            if hasattr(result.status, "is_error"):
-                has_error = result.status.is_error
-            elif hasattr(result.status, "error"):
-                has_error = result.status.error
+    This tool converts a document like the conversion tool, except that the pages are
+    converted in chunks and published in the local cache as soon as they are
+    converted. The unique cache key of the Docling document is sent in a log message
+    when the conversion starts, so that the other tools can read the pages already
+    converted while the following ones are being converted. Progress is reported in
+    pages. Changes made to the document before the conversion completes are lost.
+    """
+    try:
+        # Remove any quotes from the source string
+        source = source.strip("\"'")
+        profile = _get_profile(profile)
+        pages = _get_page_range(page_range, max_pages)
+        cache_key, ocr = await asyncio.to_thread(
+            _get_document_key, source, profile, pages
+        )
 
-        if hasattr(result, "errors") and result.errors:
-            has_error = True
-            error_message = str(result.errors)
+        if await asyncio.to_thread(_is_document_cached, cache_key, source):
+            logger.info(f"{source} has previously been added.")
+            return ConvertDocumentOutput(True, cache_key, ocr)
 
-        if has_error:
-            error_msg = f"Conversion failed: {error_message}"
-            raise McpError(ErrorData(code=INTERNAL_ERROR, message=error_msg))
+        first, last = pages or DEFAULT_PAGE_RANGE
+        total = await asyncio.to_thread(get_page_count, source)
+        if total is not None:
+            total = max(0, min(last, total) - first + 1)
+        await ctx.info(f"Converting {source} with Docling document key: {cache_key}")
 
-        local_document_cache[cache_key] = result.document
+        page_chunks = _iter_page_chunks(source, profile, ocr, (first, last))
+        chunks: list[DoclingDocument] = []
+        try:
+            while (
+                chunk := await asyncio.to_thread(next, page_chunks, None)
+            ) is not None:
+                chunks.append(chunk)
 
-        item = result.document.add_text(
-            label=DocItemLabel.TEXT,
-            text=f"source: {source}",
-            content_layer=ContentLayer.FURNITURE,
-        )
+                # Publish the pages converted so far, appending the new ones to
+                # the published document unless it was deleted meanwhile
+                part = await asyncio.to_thread(_merge_page_chunks, [chunk], first, last)
+                if len(chunks) > 1 and cache_key in local_document_cache:
+                    doc = local_document_cache[cache_key]
+                    added = _append_page_chunk(doc, part)
+                    local_document_versions.record(cache_key, added=added)
+                else:
+                    if len(chunks) > 1:
+                        part = await asyncio.to_thread(
+                            _merge_page_chunks, chunks, first, last
+                        )
+                    doc = part
+                    local_document_cache[cache_key] = doc
+                await ctx.report_progress(
+                    len(doc.pages), total, f"Converted {len(doc.pages)} pages"
+                )
+        except BaseException:
+            # the pages published so far are not the whole document
+            if chunks and cache_key in local_document_cache:
+                del local_document_cache[cache_key]
+            raise
 
-        local_stack_cache[cache_key] = [item]
+        if not chunks:
+            raise RuntimeError("Conversion failed: no pages were converted")
 
-        # Log completion
+        # Merge the chunks once more, dropping the changes made to the pages
+        # published so far
+        doc = await asyncio.to_thread(_merge_page_chunks, chunks, first, last)
+        _store_converted_document(cache_key, doc)
+        _add_document_to_local_cache(cache_key, doc, source)
         logger.info(f"Successfully created the Docling document: {source}")
 
-        # Clean up memory
         cleanup_memory()
 
-        return ConvertDocumentOutput(False, cache_key)
+        return ConvertDocumentOutput(False, cache_key, ocr)
 
     except Exception as e:
         logger.exception(f"Error converting document: {source}")
@@ -176,6 +994,308 @@ def convert_document_into_docling_document(
         ) from e
 
 
+_job_queue = JobQueue(
+    max_workers=settings.max_jobs, max_pending=settings.max_pending_jobs
+)
+
+
+@dataclass
+class SubmitConversionJobOutput:
+    """Output of the submit_conversion_job tool."""
+
+    job_id: Annotated[
+        str, Field(description="The unique identifier of the conversion job.")
+    ]
+
+
+@mcp.tool(title="Submit conversion job")
+def submit_conversion_job(
+    source: Annotated[
+        str,
+        Field(description="The URL or local file path to the document."),
+    ],
+    priority: Annotated[
+        int,
+        Field(
+            description=(
+                "The priority of the job. Jobs with lower values run first, and jobs "
+                "of the same priority run in order of submission."
+            )
+        ),
+    ] = 0,
+    profile: Annotated[
+        str | None,
+        Field(
+            description=(
+                "The conversion profile, for example fast (no OCR nor table "
+                "structure, for born-digital documents), balanced or accurate. The "
+                "default profile of the server is used if not provided."
+            )
+        ),
+    ] = None,
+    page_range: Annotated[
+        tuple[int, int] | None,
+        Field(
+            description=(
+                "The first and last pages to convert, numbered from 1. The whole "
+                "document is converted if not provided. Converting another range of "
+                "the same document later reuses the pages already converted."
+            ),
+            examples=[[1, 20]],
+        ),
+    ] = None,
+    max_pages: Annotated[
+        int | None,
+        Field(
+            description=(
+                "The maximum number of pages to convert, from the first page of the "
+                "range or of the document."
+            )
+        ),
+    ] = None,
+) -> SubmitConversionJobOutput:
+    """Submit the conversion of a document of any type from a URL or local path.
+
+    This tool queues the conversion of a document into a Docling document and returns
+    immediately with the identifier of the conversion job. Use the job identifier to
+    follow the job status, cancel the job while it is queued, or get the unique cache
+    key of the Docling document once the job succeeded.
+    """
+    profile = _get_profile(profile)
+    pages = _get_page_range(page_range, max_pages)
+    job = _job_queue.submit(
+        lambda: _convert_document(source, profile, pages), priority=priority
+    )
+    logger.info(f"Submitted conversion job {job.job_id} for {source}")
+
+    return SubmitConversionJobOutput(job.job_id)
+
+
+@dataclass
+class ConversionJobStatusOutput:
+    """Output of the get_conversion_job_status and cancel_conversion_job tools."""
+
+    job_id: Annotated[
+        str, Field(description="The unique identifier of the conversion job.")
+    ]
+    status: Annotated[
+        JobStatus,
+        Field(
+            description=(
+                "The status of the job: queued, running, succeeded, failed or "
+                "cancelled."
+            )
+        ),
+    ]
+    queue_position: Annotated[
+        int | None,
+        Field(description="The number of queued jobs to run before a queued job."),
+    ] = None
+    error: Annotated[
+        str | None, Field(description="The reason of the failure of a failed job.")
+    ] = None
+
+
+def _get_job_status(job: Job) -> ConversionJobStatusOutput:
+    return ConversionJobStatusOutput(
+        job.job_id, job.status, _job_queue.position(job.job_id), job.error
+    )
+
+
+@mcp.tool(title="Get conversion job status")
+def get_conversion_job_status(
+    job_id: Annotated[
+        str, Field(description="The unique identifier of the conversion job.")
+    ],
+) -> ConversionJobStatusOutput:
+    """Get the status of a conversion job."""
+    return _get_job_status(_job_queue.get(job_id))
+
+
+@mcp.tool(title="Cancel conversion job")
+def cancel_conversion_job(
+    job_id: Annotated[
+        str, Field(description="The unique identifier of the conversion job.")
+    ],
+) -> ConversionJobStatusOutput:
+    """Cancel a queued conversion job.
+
+    A job which is already running cannot be cancelled and is left to complete. The
+    output holds the status of the job after the cancellation attempt.
+    """
+    _job_queue.cancel(job_id)
+
+    return _get_job_status(_job_queue.get(job_id))
+
+
+@mcp.tool(title="Get conversion job result")
+def get_conversion_job_result(
+    job_id: Annotated[
+        str, Field(description="The unique identifier of the conversion job.")
+    ],
+) -> ConvertDocumentOutput:
+    """Get the unique cache key of the Docling document converted by a job.
+
+    The job must have succeeded. Check the job status first: a queued or running job
+    has no result yet.
+    """
+    job = _job_queue.get(job_id)
+    if job.status == "failed":
+        raise McpError(
+            ErrorData(
+                code=INTERNAL_ERROR,
+                message=f"Conversion job {job_id} failed: {job.error}",
+            )
+        )
+    if job.status != "succeeded":
+        raise ValueError(f"Conversion job {job_id} is {job.status}, it has no result.")
+
+    result: ConvertDocumentOutput = job.result
+    return result
+
+
+def _iter_directory_files(
+    directory: Path,
+    recursive: bool = False,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+) -> Iterator[Path]:
+    """Lazily walk a directory, yielding the files that Docling can convert.
+
+    The directory is scanned with `os.scandir`, one folder at a time, so that the
+    first files are yielded before the whole tree is listed. Files are filtered by
+    the extensions of the input formats supported by the converter, as well as by
+    glob patterns matched against their path relative to the directory, see
+    `_match_glob`.
+
+    Args:
+        directory: The directory to walk.
+        recursive: Whether to descend into sub-directories.
+        include: If given, only files matching any of these patterns are yielded.
+        exclude: Files and sub-directories matching any of these patterns are
+            skipped.
+    """
+    extensions = _get_supported_extensions()
+    folders = [directory]
+
+    while folders:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                path = Path(entry.path)
+                relative = path.relative_to(directory).parts
+                if exclude and any(_match_glob(relative, p) for p in exclude):
+                    continue
+
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        folders.append(path)
+                elif entry.is_file():
+                    if path.suffix.lower().lstrip(".") not in extensions:
+                        logger.debug(f"Skipping unsupported file {path}")
+                    elif not include or any(_match_glob(relative, p) for p in include):
+                        yield path
+
+
+def _match_glob(parts: tuple[str, ...], pattern: str) -> bool:
+    """Match the parts of a relative path against a glob pattern.
+
+    As in `.gitignore` files, a pattern without a slash matches the name of a file
+    or folder at any depth. Otherwise the pattern matches the whole path, where `*`
+    and `?` do not match slashes and `**` matches any number of folders, including
+    none.
+    """
+    if "/" not in pattern:
+        return fnmatch(parts[-1], pattern)
+
+    def match(parts: tuple[str, ...], components: list[str]) -> bool:
+        if not components:
+            return not parts
+        if components[0] == "**":
+            return any(match(parts[i:], components[1:]) for i in range(len(parts) + 1))
+        return (
+            bool(parts)
+            and fnmatch(parts[0], components[0])
+            and match(parts[1:], components[1:])
+        )
+
+    return match(parts, pattern.strip("/").split("/"))
+
+
+@lru_cache
+def _get_supported_extensions() -> frozenset[str]:
+    """Get the file extensions of the input formats allowed by the converter."""
+    return frozenset(
+        extension
+        for input_format in _get_converter(settings.default_profile).allowed_formats
+        or list(InputFormat)
+        for extension in FormatToExtensions[input_format]
+    )
+
+
+# Number of files walked, looked up in cache and converted together
+_DIRECTORY_CHUNK_SIZE = 64
+
+
+def _get_batch_id(
+    directory: Path,
+    recursive: bool,
+    include: list[str] | None,
+    exclude: list[str] | None,
+    profile: str,
+) -> str:
+    """Get the identifier of the conversion manifest of a directory batch."""
+    return hash_string(
+        json.dumps(
+            {
+                "directory": str(directory.resolve()),
+                "recursive": recursive,
+                "include": include,
+                "exclude": exclude,
+                "options": _get_conversion_options(profile),
+                "ocr_triage": settings.ocr_triage,
+            },
+            sort_keys=True,
+        )
+    )
+
+
+def _lookup_file(
+    file: Path, manifest: ConversionManifest, retry_failed: bool, profile: str
+) -> ConvertFileOutput | tuple[str, bool]:
+    """Look up a file of a directory batch in the manifest and in the caches.
+
+    Returns:
+        The output of the file if it needs no conversion, otherwise its cache key
+        and whether it needs OCR.
+    """
+    entry = manifest.get(file)
+    if entry is not None:
+        cache_key, ocr = entry["document_key"], entry.get("ocr")
+        if entry["status"] in ("converted", "cached") and _is_document_cached(
+            cache_key, str(file)
+        ):
+            # the file did not change since, skip hashing it again
+            return ConvertFileOutput(True, cache_key, str(file), "cached", ocr=ocr)
+        if entry["status"] in ("failed", "skipped") and not retry_failed:
+            error = f"failed in a previous run: {entry['error']}"
+            return ConvertFileOutput(
+                False, cache_key, str(file), "skipped", error, ocr=ocr
+            )
+
+    ocr = _use_ocr(str(file), profile)
+    try:
+        cache_key = get_cache_key(
+            str(file), enable_ocr=ocr, options=_get_conversion_options(profile, ocr)
+        )
+    except OSError as e:
+        return ConvertFileOutput(False, None, str(file), "failed", str(e), ocr=ocr)
+
+    if _is_document_cached(cache_key, str(file)):
+        return ConvertFileOutput(True, cache_key, str(file), "cached", ocr=ocr)
+
+    return cache_key, ocr
+
+
 @mcp.tool(
     title="Convert files from directory into Docling document", structured_output=True
 )
@@ -185,73 +1305,166 @@ async def convert_directory_files_into_docling_document(
         Field(description="The path to a local directory"),
     ],
     ctx: Context,  # type: ignore[type-arg]
-) -> list[ConvertDocumentOutput]:
+    recursive: Annotated[
+        bool,
+        Field(description="Whether to convert the files of all the sub-directories."),
+    ] = False,
+    include: Annotated[
+        list[str] | None,
+        Field(
+            description=(
+                "Glob patterns of the files to convert, relative to the directory. "
+                "A pattern without a slash matches file names at any depth, e.g. "
+                "*.pdf, otherwise the whole relative path, where ** matches any "
+                "number of folders. All the supported files are converted if not "
+                "provided."
+            ),
+            examples=[["*.pdf", "reports/**/*.docx"]],
+        ),
+    ] = None,
+    exclude: Annotated[
+        list[str] | None,
+        Field(
+            description=(
+                "Glob patterns of the files and sub-directories to skip, relative to "
+                "the directory. A pattern without a slash matches names at any "
+                "depth, e.g. drafts skips every drafts folder."
+            ),
+            examples=[["drafts", "*.tmp.pdf"]],
+        ),
+    ] = None,
+    resume: Annotated[
+        bool,
+        Field(
+            description=(
+                "Whether to resume from the outcomes recorded by a previous run on "
+                "the same directory, for the files which did not change since."
+            )
+        ),
+    ] = True,
+    retry_failed: Annotated[
+        bool,
+        Field(
+            description=(
+                "Whether to convert again the files which failed in a previous run. "
+                "They are skipped otherwise."
+            )
+        ),
+    ] = False,
+    profile: Annotated[
+        str | None,
+        Field(
+            description=(
+                "The conversion profile, for example fast (no OCR nor table "
+                "structure, for born-digital documents), balanced or accurate. The "
+                "default profile of the server is used if not provided."
+            )
+        ),
+    ] = None,
+) -> list[ConvertFileOutput]:
     """Convert all files from a local directory path and store them in local cache.
 
-    This tool takes a local directory path, converts every file in the directory using
-    Docling's DocumentConverter and stores the resulting Docling documents in a local
-    cache. It returns a list of conversion outputs, where each output consists of a
-    boolean set to False along with a document's unique cache key. If a document was
-    already in the local cache, the conversion is skipped and the output boolean is set
-    to True.
+    This tool takes a local directory path, converts every supported file in the
+    directory using Docling's DocumentConverter and stores the resulting Docling
+    documents in a local cache. Sub-directories are walked in recursive mode, and
+    files can be selected with include and exclude glob patterns. Files are converted
+    while the directory is being walked, concurrently when the server is configured
+    with more than one conversion worker. It returns a list of outputs, one per file,
+    with the file's status: converted, cached, failed or skipped. A file failing to
+    convert does not interrupt the conversion of the other files. The outcome of
+    every file is recorded, so that running the tool again on the same directory
+    resumes an interrupted conversion, and skips the files which failed unless they
+    are retried.
     """
     try:
         # Remove any quotes from the source string
         source = source.strip("\"'")
         directory = Path(source)
-        files: list[Path] = list(directory.iterdir())
-        out: list[ConvertDocumentOutput] = []
-        logger.info("Getting the converter")
-        converter = _get_converter()
+        profile = _get_profile(profile)
+        files = _iter_directory_files(directory, recursive, include, exclude)
+        batch_id = await asyncio.to_thread(
+            _get_batch_id, directory, recursive, include, exclude, profile
+        )
+        manifest = await asyncio.to_thread(ConversionManifest, batch_id, resume)
+        out: list[ConvertFileOutput] = []
+        done = 0
 
-        for i, file in enumerate(files):
-            if not file.is_file():
-                continue
+        with manifest:
+            while chunk := await asyncio.to_thread(
+                list, islice(files, _DIRECTORY_CHUNK_SIZE)
+            ):
+                chunk_out: list[ConvertFileOutput | None] = [None] * len(chunk)
 
-            # Track progress
-            await ctx.info(f"Processing file {file}")
-            await ctx.report_progress(i + 1, len(files))
-
-            logger.info(f"Processing file {file}")
-            cache_key = get_cache_key(str(file))
-            if cache_key in local_document_cache:
-                logger.info(f"{file} has been previously converted.")
-                out.append(ConvertDocumentOutput(True, cache_key))
-            else:
-                # Convert the document
-                logger.info("Start conversion")
-                result = converter.convert(file)
-                has_error = False
-                error_message = ""
-                if hasattr(result, "status"):
-                    if hasattr(result.status, "is_error"):
-                        has_error = result.status.is_error
-                    elif hasattr(result.status, "error"):
-                        has_error = result.status.error
-
-                if hasattr(result, "errors") and result.errors:
-                    has_error = True
-                    error_message = str(result.errors)
-
-                if has_error:
-                    error_msg = f"Conversion failed: {error_message}"
-                    raise McpError(ErrorData(code=INTERNAL_ERROR, message=error_msg))
-
-                local_document_cache[cache_key] = result.document
-
-                item = result.document.add_text(
-                    label=DocItemLabel.TEXT,
-                    text=f"source: {file}",
-                    content_layer=ContentLayer.FURNITURE,
-                )
+                # Serve the documents in cache and collect the ones to convert
+                to_convert: dict[bool, list[tuple[int, str]]] = {False: [], True: []}
+                for i, file in enumerate(chunk):
+                    logger.info(f"Processing file {file}")
+                    lookup = await asyncio.to_thread(
+                        _lookup_file, file, manifest, retry_failed, profile
+                    )
+                    if isinstance(lookup, tuple):
+                        cache_key, ocr = lookup
+                        to_convert[ocr].append((i, cache_key))
+                        continue
 
-                local_stack_cache[cache_key] = [item]
+                    logger.info(f"{file} is {lookup.status}.")
+                    chunk_out[i] = lookup
+                    if lookup.status != "skipped":
+                        manifest.record(
+                            file,
+                            lookup.status,
+                            lookup.document_key,
+                            lookup.error,
+                            ocr=lookup.ocr,
+                        )
 
-                await ctx.debug(
-                    f"Completed step {i + 1} with Docling document key: {cache_key}"
-                )
-                logger.info(f"Successfully created the Docling document: {file}")
-                out.append(ConvertDocumentOutput(False, cache_key))
+                    # Track progress
+                    done += 1
+                    await ctx.report_progress(done)
+
+                # Convert the documents with a text layer apart from the ones
+                # needing OCR, as they use different converters
+                for ocr, group in to_convert.items():
+                    async for j, doc, error in _convert_files(
+                        [chunk[i] for i, _ in group], profile, ocr
+                    ):
+                        i, cache_key = group[j]
+                        file = chunk[i]
+                        if doc is not None:
+                            try:
+                                _store_converted_document(cache_key, doc)
+                                _add_document_to_local_cache(cache_key, doc, str(file))
+                            except Exception as e:
+                                error = str(e)
+
+                        if error is None:
+                            output = ConvertFileOutput(
+                                False, cache_key, str(file), "converted", ocr=ocr
+                            )
+                            await ctx.info(f"Converted file {file}")
+                            logger.info(
+                                f"Successfully created the Docling document: {file}"
+                            )
+                        else:
+                            output = ConvertFileOutput(
+                                False, cache_key, str(file), "failed", error, ocr=ocr
+                            )
+                            await ctx.info(f"Failed to convert file {file}: {error}")
+                            logger.error(f"Failed to convert {file}: {error}")
+
+                        chunk_out[i] = output
+                        manifest.record(
+                            file, output.status, cache_key, output.error, ocr=ocr
+                        )
+
+                        # Track progress
+                        done += 1
+                        await ctx.report_progress(done)
+                        await ctx.debug(
+                            f"Completed step {done} with Docling document key: {cache_key}"
+                        )
+
+                out.extend(output for output in chunk_out if output is not None)
 
         cleanup_memory()
 
@@ -262,3 +1475,14 @@ async def convert_directory_files_into_docling_document(
         raise McpError(
             ErrorData(code=INTERNAL_ERROR, message=f"Unexpected error: {e!s}")
         ) from e
+
+
+@mcp.tool(title="Get memory statistics")
+def get_memory_statistics() -> MemoryStats:
+    """Get the memory usage of the server and the counters of its memory manager.
+
+    Memory is reclaimed after conversions only when the server is under memory
+    pressure: the counters tell how often garbage was collected and documents were
+    evicted from the local cache, to tune the memory watermarks of the server.
+    """
+    return memory_manager.stats
@@ -1,7 +1,8 @@
 """Tools for generating Docling documents."""
 
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from io import BytesIO
 from typing import Annotated
 
@@ -18,6 +19,8 @@ from docling_core.types.doc.document import (
     DoclingDocument,
     GroupItem,
     LevelNumber,
+    NodeItem,
+    TableData,
 )
 from docling_core.types.doc.labels import (
     DocItemLabel,
@@ -26,8 +29,17 @@ from docling_core.types.doc.labels import (
 from docling_core.types.io import DocumentStream
 
 from docling_mcp.docling_cache import get_cache_dir
+from docling_mcp.exports import SAVE_SUFFIXES, SaveFormat, write_document
 from docling_mcp.logger import setup_logger
-from docling_mcp.shared import local_document_cache, local_stack_cache, mcp
+from docling_mcp.shared import (
+    local_anchor_cache,
+    local_document_cache,
+    local_document_versions,
+    local_markdown_cache,
+    local_save_log,
+    local_stack_cache,
+    mcp,
+)
 
 # Create a default project logger
 logger = setup_logger()
@@ -98,6 +110,8 @@ def export_docling_document_to_markdown(
 
     This tool converts a Docling document that exists in the local cache into
     a markdown formatted string, which can be used for display or further processing.
+    The export is kept until the document changes, and only the items which changed
+    are converted again.
     """
     if document_key not in local_document_cache:
         doc_keys = ", ".join(local_document_cache.keys())
@@ -105,29 +119,178 @@ def export_docling_document_to_markdown(
             f"document-key: {document_key} is not found. Existing document-keys are: {doc_keys}"
         )
 
-    markdown = local_document_cache[document_key].export_to_markdown()
-    if max_size:
-        markdown = markdown[:max_size]
+    # only the items needed to reach the maximum size are converted
+    markdown = local_markdown_cache.get(document_key).get_text(max_size=max_size)
 
     return ExportDocumentMarkdownOutput(document_key, markdown)
 
 
+@dataclass
+class ExportDocumentChunkOutput:
+    """Output of the export_docling_document_chunk_to_markdown tool."""
+
+    document_key: Annotated[
+        str,
+        Field(description="The unique identifier of the document in the local cache."),
+    ]
+    markdown: Annotated[
+        str,
+        Field(
+            description="The chunk of the selected part of the document in markdown."
+        ),
+    ]
+    next_cursor: Annotated[
+        str | None,
+        Field(
+            description=(
+                "The cursor to get the next chunk, with the same selection, or null if "
+                "this chunk is the last one."
+            )
+        ),
+    ] = None
+
+
+@mcp.tool(title="Export chunk of Docling document to markdown format")
+def export_docling_document_chunk_to_markdown(
+    document_key: Annotated[
+        str,
+        Field(description="The unique identifier of the document in the local cache."),
+    ],
+    first_page: Annotated[
+        int | None,
+        Field(description="The first page of the part to export, starting at 1."),
+    ] = None,
+    last_page: Annotated[
+        int | None,
+        Field(description="The last page of the part to export, included."),
+    ] = None,
+    start_anchor: Annotated[
+        str | None,
+        Field(
+            description=(
+                "The anchor reference, or the stable id, of the first item of the part "
+                "to export."
+            ),
+            examples=["#/texts/6", "@12"],
+        ),
+    ] = None,
+    end_anchor: Annotated[
+        str | None,
+        Field(
+            description=(
+                "The anchor reference, or the stable id, of the last item of the part "
+                "to export, included."
+            ),
+            examples=["#/texts/42", "@40"],
+        ),
+    ] = None,
+    section_anchor: Annotated[
+        str | None,
+        Field(
+            description=(
+                "The anchor reference, or the stable id, of a title or section heading, "
+                "to export its section up to the next heading of the same or a higher "
+                "level."
+            ),
+            examples=["#/texts/3", "@2"],
+        ),
+    ] = None,
+    cursor: Annotated[
+        str | None,
+        Field(description="The cursor returned with the previous chunk, if any."),
+    ] = None,
+    max_size: Annotated[
+        int,
+        Field(description="The maximum number of characters of the chunk.", ge=100),
+    ] = 10000,
+) -> ExportDocumentChunkOutput:
+    """Export a part of a document from the local document cache to markdown, chunk by chunk.
+
+    This tool converts a part of a Docling document that exists in the local cache
+    into markdown, selected by a range of pages, a range of anchors, or the section
+    of a heading, which can be combined. Only the selected items are converted. The
+    markdown is returned in chunks of at most max_size characters, which end between
+    items whenever possible: the next chunk is returned when the next_cursor is given
+    back as cursor, along with the same selection, until next_cursor is null.
+    """
+    if document_key not in local_document_cache:
+        doc_keys = ", ".join(local_document_cache.keys())
+        raise ValueError(
+            f"document-key: {document_key} is not found. Existing document-keys are: {doc_keys}"
+        )
+
+    anchor_map = local_anchor_cache.get(document_key)
+    export = local_markdown_cache.get(document_key)
+    positions = export.select(
+        first_page=first_page,
+        last_page=last_page,
+        start_item=anchor_map.resolve(start_anchor) if start_anchor else None,
+        end_item=anchor_map.resolve(end_anchor) if end_anchor else None,
+        section_item=anchor_map.resolve(section_anchor) if section_anchor else None,
+    )
+
+    # the cursor holds the version of the document, the item and the offset in it
+    version = local_document_versions.get(document_key)
+    start = None
+    if cursor is not None:
+        try:
+            cursor_version, position, offset = map(int, cursor.split(":"))
+        except ValueError:
+            raise ValueError(f"cursor: {cursor} is not valid.") from None
+        if cursor_version != version:
+            raise ValueError(
+                f"document-key: {document_key} changed since cursor: {cursor} was "
+                "returned. Please export the document again from its first chunk."
+            )
+        if position not in positions:
+            raise ValueError(f"cursor: {cursor} is not part of the selection.")
+        start = (position, offset)
+
+    markdown, end = export.get_chunk(positions, max_size=max_size, cursor=start)
+    next_cursor = f"{version}:{end[0]}:{end[1]}" if end is not None else None
+
+    return ExportDocumentChunkOutput(document_key, markdown, next_cursor)
+
+
+@dataclass
+class SavedDocumentFile:
+    """A file in which a document is saved."""
+
+    save_format: Annotated[SaveFormat, Field(description="The format of the file.")]
+    path: Annotated[
+        str, Field(description="The path in the cache directory to the file.")
+    ]
+    written: Annotated[
+        bool,
+        Field(
+            description=(
+                "Whether the file was written, or left as is since the document did "
+                "not change since it was last saved."
+            )
+        ),
+    ]
+
+
 @dataclass
 class SaveDocumentOutput:
     """Output of the save_docling_document tool."""
 
     md_file: Annotated[
-        str,
+        str | None,
         Field(
             description="The path in the cache directory to the file in markdown format."
         ),
-    ]
+    ] = None
     json_file: Annotated[
-        str,
+        str | None,
         Field(
             description="The path in the cache directory to the file in JSON format."
         ),
-    ]
+    ] = None
+    files: Annotated[
+        list[SavedDocumentFile],
+        Field(description="The files in which the document is saved, in every format."),
+    ] = field(default_factory=list)
 
 
 @mcp.tool(title="Save Docling document")
@@ -136,12 +299,26 @@ def save_docling_document(
         str,
         Field(description="The unique identifier of the document in the local cache."),
     ],
+    formats: Annotated[
+        list[SaveFormat] | None,
+        Field(
+            description=(
+                "The formats to save the document in, markdown and JSON if not given. "
+                "The json.gz and json.zst formats are compressed JSON."
+            )
+        ),
+    ] = None,
+    force: Annotated[
+        bool,
+        Field(description="Whether to save the document even if it did not change."),
+    ] = False,
 ) -> SaveDocumentOutput:
-    """Save a document from the local document cache to disk in both markdown and JSON formats.
+    """Save a document from the local document cache to disk in the requested formats.
 
     This tool takes a document that exists in the local cache and saves it to the specified
-    cache directory with filenames based on the document key. Both markdown and JSON versions
-    of the document are saved.
+    cache directory with filenames based on the document key. By default, both markdown and
+    JSON versions of the document are saved. The files are replaced atomically, and are not
+    written again if the document did not change since it was last saved.
     """
     if document_key not in local_document_cache:
         doc_keys = ", ".join(local_document_cache.keys())
@@ -149,14 +326,27 @@ def save_docling_document(
             f"document-key: {document_key} is not found. Existing document-keys are: {doc_keys}"
         )
 
+    doc = local_document_cache[document_key]
+    version = local_document_versions.get(document_key)
     cache_dir = get_cache_dir()
-    md_file = str(cache_dir / f"{document_key}.md")
-    json_file = str(cache_dir / f"{document_key}.json")
 
-    local_document_cache[document_key].save_as_markdown(filename=md_file, text_width=72)
-    local_document_cache[document_key].save_as_json(filename=json_file)
+    requested: list[SaveFormat] = formats or ["markdown", "json"]
+    output = SaveDocumentOutput()
+    for save_format in dict.fromkeys(requested):
+        path = cache_dir / f"{document_key}{SAVE_SUFFIXES[save_format]}"
+
+        written = force or not local_save_log.is_saved(document_key, save_format, path)
+        if written:
+            write_document(doc, path, save_format)
+            local_save_log.record(document_key, save_format, path, version)
+
+        output.files.append(SavedDocumentFile(save_format, str(path), written))
+        if save_format == "markdown":
+            output.md_file = str(path)
+        elif save_format == "json":
+            output.json_file = str(path)
 
-    return SaveDocumentOutput(md_file, json_file)
+    return output
 
 
 @mcp.tool(title="Generate the thumbnail of a page in the Docling document")
@@ -254,6 +444,7 @@ def add_title_to_docling_document(
 
     item = local_document_cache[document_key].add_title(text=title)
     local_stack_cache[document_key][-1] = item
+    local_document_versions.record(document_key, added=[item])
 
     return UpdateDocumentOutput(document_key)
 
@@ -303,6 +494,7 @@ def add_section_heading_to_docling_document(
         text=section_heading, level=section_level
     )
     local_stack_cache[document_key][-1] = item
+    local_document_versions.record(document_key, added=[item])
 
     return UpdateDocumentOutput(document_key)
 
@@ -345,6 +537,7 @@ def add_paragraph_to_docling_document(
         label=DocItemLabel.TEXT, text=paragraph
     )
     local_stack_cache[document_key][-1] = item
+    local_document_versions.record(document_key, added=[item])
 
     return UpdateDocumentOutput(document_key)
 
@@ -375,6 +568,7 @@ def open_list_in_docling_document(
 
     item = local_document_cache[document_key].add_group(label=GroupLabel.LIST)
     local_stack_cache[document_key].append(item)
+    local_document_versions.record(document_key, added=[item])
 
     return UpdateDocumentOutput(document_key)
 
@@ -439,6 +633,9 @@ def add_list_items_to_list_in_docling_document(
             f"document-key: {document_key} is not found. Existing document-keys are: {doc_keys}"
         )
 
+    # get the document first, as reloading a spilled document rebinds its stack
+    doc = local_document_cache[document_key]
+
     if len(local_stack_cache[document_key]) == 0:
         raise ValueError(
             f"Stack size is zero for document with document-key: {document_key}. Abort document generation"
@@ -456,16 +653,48 @@ def add_list_items_to_list_in_docling_document(
             "No list is currently opened. Please open a list before adding list-items!"
         )
 
-    for list_item in list_items:
-        local_document_cache[document_key].add_list_item(
+    items = [
+        doc.add_list_item(
             text=list_item.list_item_text,
             marker=list_item.list_marker_text,
             parent=parent,
         )
+        for list_item in list_items
+    ]
+    local_document_versions.record(document_key, added=items)
 
     return UpdateDocumentOutput(document_key)
 
 
+@lru_cache
+def _get_html_converter() -> DocumentConverter:
+    return DocumentConverter(allowed_formats=[InputFormat.HTML])
+
+
+@lru_cache(maxsize=256)
+def _parse_html_table(html_table: str) -> TableData | None:
+    """Parse the first table of an HTML string, memoized for repeated tables.
+
+    Returns:
+        The data of the table, or None if the HTML has no table or cannot be parsed.
+        It must not be modified, as it is shared by all the calls with the same HTML.
+    """
+    html_doc: str = f"<html><body>{html_table}</body></html>"
+
+    buff = BytesIO(html_doc.encode("utf-8"))
+    doc_stream = DocumentStream(name="tmp", stream=buff)
+
+    conv_result: ConversionResult = _get_html_converter().convert(doc_stream)
+
+    if (
+        conv_result.status == ConversionStatus.SUCCESS
+        and len(conv_result.document.tables) > 0
+    ):
+        return conv_result.document.tables[0].data
+
+    return None
+
+
 @mcp.tool(title="Add HTML table to Docling document")
 def add_table_in_html_format_to_docling_document(
     document_key: Annotated[
@@ -510,27 +739,24 @@ def add_table_in_html_format_to_docling_document(
             f"Stack size is zero for document with document-key: {document_key}. Abort document generation"
         )
 
-    html_doc: str = f"<html><body>{html_table}</body></html>"
-
-    buff = BytesIO(html_doc.encode("utf-8"))
-    doc_stream = DocumentStream(name="tmp", stream=buff)
-
-    converter = DocumentConverter(allowed_formats=[InputFormat.HTML])
-    conv_result: ConversionResult = converter.convert(doc_stream)
+    table_data = _parse_html_table(html_table)
 
-    if (
-        conv_result.status == ConversionStatus.SUCCESS
-        and len(conv_result.document.tables) > 0
-    ):
-        table = doc.add_table(data=conv_result.document.tables[0].data)
+    if table_data is not None:
+        # copy the memoized table, as the document owns the data of its items
+        table = doc.add_table(data=table_data.model_copy(deep=True))
+        items: list[NodeItem] = [table]
 
         for _ in table_captions or []:
             caption = doc.add_text(label=DocItemLabel.CAPTION, text=_)
             table.captions.append(caption.get_ref())
+            items.append(caption)
 
         for _ in table_footnotes or []:
             footnote = doc.add_text(label=DocItemLabel.FOOTNOTE, text=_)
             table.footnotes.append(footnote.get_ref())
+            items.append(footnote)
+
+        local_document_versions.record(document_key, added=items)
     else:
         raise ValueError(
             "Could not parse the html string of the table! Please fix the html and try again!"
@@ -1,22 +1,25 @@
 """Tools for manipulating Docling documents."""
 
-import re
 from dataclasses import dataclass
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import Field
 
 from docling_core.types.doc.document import (
-    DocItem,
-    GroupItem,
-    RefItem,
-    SectionHeaderItem,
     TextItem,
-    TitleItem,
 )
 
+from docling_mcp.indexing import get_max_edits, get_snippet, rank_bm25, tokenize
 from docling_mcp.logger import setup_logger
-from docling_mcp.shared import local_document_cache, mcp
+from docling_mcp.shared import (
+    local_anchor_cache,
+    local_document_cache,
+    local_document_versions,
+    local_index_cache,
+    local_overview_cache,
+    local_transactions,
+    mcp,
+)
 
 # Create a default project logger
 logger = setup_logger()
@@ -36,6 +39,24 @@ class DocumentAnchorOutput:
             )
         ),
     ]
+    total_lines: Annotated[
+        int | None,
+        Field(
+            description=(
+                "The total number of lines of the structure up to the maximum depth, "
+                "to page through it with the offset and limit."
+            )
+        ),
+    ] = None
+    version: Annotated[
+        int | None,
+        Field(
+            description=(
+                "The version of the document, which increases with every change. The "
+                "structure does not need to be retrieved again while it is unchanged."
+            )
+        ),
+    ] = None
 
 
 @mcp.tool(title="Get overview of Docling document anchors")
@@ -44,12 +65,38 @@ def get_overview_of_document_anchors(
         str,
         Field(description="The unique identifier of the document in the local cache."),
     ],
+    offset: Annotated[
+        int,
+        Field(description="The number of lines of the structure to skip.", ge=0),
+    ] = 0,
+    limit: Annotated[
+        int | None,
+        Field(
+            description=(
+                "The maximum number of lines of the structure to return, all of them "
+                "if not set."
+            ),
+            ge=1,
+        ),
+    ] = None,
+    max_depth: Annotated[
+        int | None,
+        Field(
+            description=(
+                "The maximum indentation level of the lines to return, e.g. 0 for "
+                "the title only, or 2 for the title and top section headings. All the "
+                "levels if not set."
+            ),
+            ge=0,
+        ),
+    ] = None,
 ) -> DocumentAnchorOutput:
     """Retrieve a structured overview of a document from the local document cache.
 
     This tool returns a text representation of the Docling document's structure,
     showing the hierarchy and types of elements within the document. Each line in the
-    output includes the document anchor reference and item label.
+    output includes the document anchor reference and item label. Large documents can
+    be retrieved page by page with an offset and a limit, or down to a maximum depth.
     """
     if document_key not in local_document_cache:
         doc_keys = ", ".join(local_document_cache.keys())
@@ -58,33 +105,14 @@ def get_overview_of_document_anchors(
             f"{doc_keys}"
         )
 
-    doc = local_document_cache[document_key]
-
-    lines = []
-    slevel = 0
-    for item, level in doc.iterate_items():
-        ref = item.get_ref()
-
-        if isinstance(item, DocItem):
-            if isinstance(item, TitleItem):
-                lines.append(f"[anchor:{ref.cref}] {item.label}: {item.text}")
-
-            elif isinstance(item, SectionHeaderItem):
-                slevel = item.level
-                indent = "  " * (level + slevel)
-                lines.append(
-                    f"{indent}[anchor:{ref.cref}] {item.label}-{level}: {item.text}"
-                )
-
-            else:
-                indent = "  " * (level + slevel + 1)
-                lines.append(f"{indent}[anchor:{ref.cref}] {item.label}")
+    lines = local_overview_cache.get(document_key).get_lines(max_depth=max_depth)
+    end = len(lines) if limit is None else offset + limit
 
-        elif isinstance(item, GroupItem):
-            indent = "  " * (level + slevel + 1)
-            lines.append(f"{indent}[anchor:{ref.cref}] {item.label}")
-
-    return DocumentAnchorOutput("\n".join(lines))
+    return DocumentAnchorOutput(
+        structure="\n".join(lines[offset:end]),
+        total_lines=len(lines),
+        version=local_document_versions.get(document_key),
+    )
 
 
 @dataclass
@@ -116,6 +144,29 @@ def search_for_text_in_document_anchors(
             description="The string of text to search for in the document's anchors."
         ),
     ],
+    match_mode: Annotated[
+        Literal["exact", "phrase", "prefix", "fuzzy"],
+        Field(
+            description=(
+                "How the text is matched: 'exact' for the exact text, falling back to "
+                "its individual keywords, 'phrase' for its words in sequence, 'prefix' "
+                "for words starting with each of its words, and 'fuzzy' for words "
+                "within a few typos of each of its words, e.g. in OCR'd documents."
+            )
+        ),
+    ] = "exact",
+    max_edits: Annotated[
+        int | None,
+        Field(
+            description=(
+                "The maximum number of typos per word in the fuzzy mode. By default, "
+                "no typo for words of up to 2 characters, 1 for up to 5 characters "
+                "and 2 for longer words."
+            ),
+            ge=0,
+            le=3,
+        ),
+    ] = None,
 ) -> TextSearchOutput:
     """Search for specific text and keywords within a document's anchors.
 
@@ -124,6 +175,11 @@ def search_for_text_in_document_anchors(
     If the exact text is not found, the tool will search for individual keywords
     within the text, splitting it on non-alphanumeric characters. If keywords
     are found, they are listed alongside their number of occurrences in parentheses.
+
+    The other match modes return the anchors containing all the words of the text,
+    in sequence for the phrase mode, or words starting with them for the prefix
+    mode, or words with a few typos for the fuzzy mode. The words which matched are
+    listed alongside the anchors.
     """
     if document_key not in local_document_cache:
         doc_keys = ", ".join(local_document_cache.keys())
@@ -131,39 +187,53 @@ def search_for_text_in_document_anchors(
             f"document-key: {document_key} is not found. Existing document-keys are: {doc_keys}"
         )
 
-    doc = local_document_cache[document_key]
-    exact_matches = []
+    index = local_index_cache.get(document_key)
+
+    if match_mode != "exact":
+        terms = tokenize(text)
+        if match_mode == "prefix":
+            alternatives = [index.expand_prefix(term) for term in terms]
+        elif match_mode == "fuzzy":
+            alternatives = [
+                index.expand_fuzzy(
+                    term, get_max_edits(term) if max_edits is None else max_edits
+                )
+                for term in terms
+            ]
+        else:
+            alternatives = [{term} for term in terms]
+
+        found = index.find_terms(alternatives, phrase=match_mode == "phrase")
+        if not found:
+            return TextSearchOutput(
+                f"No {match_mode} matches found for '{text}' in document with key "
+                f"{document_key}."
+            )
+        return TextSearchOutput(
+            f"Found {match_mode} matches in the following anchors:\n"
+            + "\n".join(
+                f"[anchor:{item.get_ref().cref}] matching words: {', '.join(tokens)}"
+                for item, tokens in found
+            )
+        )
+
+    exact_matches = [
+        f"[anchor:{item.get_ref().cref}]" for item in index.find_text(text)
+    ]
+
     matches = []
-    keywords_set = {word for word in set(re.findall(r"\b\w+\b", text.lower())) if word}
+    if not exact_matches:
+        keywords_set = {word for word in tokenize(text) if word}
 
-    for item, _ in doc.iterate_items():
-        if isinstance(item, TextItem):
+        for item, keyword_occurrences in index.find_keywords(keywords_set):
             ref = item.get_ref()
-
-            if text.lower() in item.text.lower():
-                exact_matches.append(f"[anchor:{ref.cref}]")
-
-            if not exact_matches:
-                keyword_occurrences: dict[str, int] = {}
-                total_matches = 0
-
-                strings = re.findall(r"\b\w+\b", item.text.lower())
-
-                for string in strings:
-                    if string in keywords_set:
-                        total_matches += 1
-                        if string in keyword_occurrences:
-                            keyword_occurrences[string] += 1
-                        else:
-                            keyword_occurrences[string] = 1
-
-                if keyword_occurrences:
-                    matches.append(
-                        (
-                            f"[anchor:{ref.cref}] keyword matches ({total_matches} total):{','.join([f' {k} ({v} occurrences)' for k, v in sorted(keyword_occurrences.items(), key=lambda x: x[1], reverse=True)])}",
-                            total_matches,
-                        )
-                    )
+            total_matches = sum(keyword_occurrences.values())
+            matches.append(
+                (
+                    f"[anchor:{ref.cref}] keyword matches ({total_matches} total):{','.join([f' {k} ({v} occurrences)' for k, v in sorted(keyword_occurrences.items(), key=lambda x: x[1], reverse=True)])}",
+                    total_matches,
+                )
+            )
 
     if exact_matches:
         return TextSearchOutput(
@@ -187,6 +257,88 @@ def search_for_text_in_document_anchors(
     )
 
 
+@dataclass
+class CachedDocumentsSearchResult:
+    """An item matching the search_for_text_in_cached_documents tool."""
+
+    document_key: Annotated[
+        str,
+        Field(description="The unique identifier of the document in the local cache."),
+    ]
+    document_anchor: Annotated[
+        str,
+        Field(
+            description=(
+                "The anchor reference that identifies the matching item within the "
+                "document."
+            ),
+            examples=["#/texts/2"],
+        ),
+    ]
+    score: Annotated[
+        float,
+        Field(description="The relevance score of the item, higher is better."),
+    ]
+    snippet: Annotated[
+        str,
+        Field(description="An excerpt of the text of the item around the match."),
+    ]
+
+
+@dataclass
+class CachedDocumentsSearchOutput:
+    """Output of the search_for_text_in_cached_documents tool."""
+
+    results: Annotated[
+        list[CachedDocumentsSearchResult],
+        Field(description="The best matching items, from the most relevant one."),
+    ]
+    spilled_document_keys: Annotated[
+        list[str],
+        Field(
+            description=(
+                "The documents of the local cache spilled to disk, which were not "
+                "searched. They are loaded back in memory by any tool using them."
+            )
+        ),
+    ]
+
+
+@mcp.tool(title="Search for text in all cached Docling documents")
+def search_for_text_in_cached_documents(
+    text: Annotated[
+        str,
+        Field(description="The keywords to search for in the documents."),
+    ],
+    top_k: Annotated[
+        int,
+        Field(description="The maximum number of items to return.", ge=1),
+    ] = 10,
+) -> CachedDocumentsSearchOutput:
+    """Search for keywords across all the documents in the local document cache.
+
+    This tool ranks the text items of every document held in memory by relevance to
+    the keywords, using the Okapi BM25 ranking function, and returns the best items
+    with their document key, anchor and an excerpt of their text. The search is
+    case-insensitive, and items matching more of the rarer keywords rank higher.
+    """
+    indexes = local_index_cache.get_resident()
+    terms = set(tokenize(text))
+
+    results = [
+        CachedDocumentsSearchResult(
+            document_key=ranked.document_key,
+            document_anchor=ranked.item.get_ref().cref,
+            score=round(ranked.score, 4),
+            snippet=get_snippet(ranked.item.text, terms),
+        )
+        for ranked in rank_bm25(indexes, text, top_k=top_k)
+    ]
+    spilled = [key for key in local_document_cache.keys() if key not in indexes]
+
+    return CachedDocumentsSearchOutput(results=results, spilled_document_keys=spilled)
+
+
 @dataclass
 class DocumentItemText:
     """Text content of a Docling document item."""
@@ -207,10 +359,10 @@ def get_text_of_document_item_at_anchor(
         str,
         Field(
             description=(
-                "The anchor reference that identifies the specific item within the "
-                "document."
+                "The anchor reference, or the stable id, that identifies the specific "
+                "item within the document."
             ),
-            examples=["#/texts/2"],
+            examples=["#/texts/2", "@12"],
         ),
     ],
 ) -> DocumentItemText:
@@ -225,10 +377,7 @@ def get_text_of_document_item_at_anchor(
             f"document-key: {document_key} is not found. Existing document-keys are: {doc_keys}"
         )
 
-    doc = local_document_cache[document_key]
-
-    ref = RefItem(cref=document_anchor)
-    item = ref.resolve(doc=doc)
+    item = local_anchor_cache.get(document_key).resolve(document_anchor)
 
     if isinstance(item, TextItem):
         text = item.text
@@ -260,10 +409,10 @@ def update_text_of_document_item_at_anchor(
         str,
         Field(
             description=(
-                "The anchor reference that identifies the specific item within the "
-                "document."
+                "The anchor reference, or the stable id, that identifies the specific "
+                "item within the document."
             ),
-            examples=["#/texts/6"],
+            examples=["#/texts/6", "@12"],
         ),
     ],
     updated_text: Annotated[
@@ -284,13 +433,12 @@ def update_text_of_document_item_at_anchor(
             f"{doc_keys}"
         )
 
-    doc = local_document_cache[document_key]
-
-    ref = RefItem(cref=document_anchor)
-    item = ref.resolve(doc=doc)
+    item = local_anchor_cache.get(document_key).resolve(document_anchor)
 
     if isinstance(item, TextItem):
+        local_transactions.before_update(document_key, [item])
         item.text = updated_text
+        local_document_versions.record(document_key, updated=[item])
     else:
         raise ValueError(
             f"Item at {document_anchor} for document-key: {document_key} is not a "
@@ -300,6 +448,186 @@ def update_text_of_document_item_at_anchor(
     return UpdateDocumentOutput(document_key=document_key)
 
 
+@dataclass
+class DocumentItemTextUpdate:
+    """A new text for a textual item of a Docling document."""
+
+    document_anchor: Annotated[
+        str,
+        Field(
+            description=(
+                "The anchor reference, or the stable id, that identifies the specific "
+                "item within the document."
+            ),
+            examples=["#/texts/6", "@12"],
+        ),
+    ]
+    updated_text: Annotated[
+        str,
+        Field(description="The new text content to replace the existing content."),
+    ]
+
+
+@dataclass
+class DocumentItemUpdateStatus:
+    """Outcome of the update of a document item by a batch of updates."""
+
+    document_anchor: Annotated[
+        str,
+        Field(description="The anchor reference or stable id given for the item."),
+    ]
+    status: Annotated[
+        Literal["updated", "unchanged", "failed", "not_applied"],
+        Field(
+            description=(
+                "'updated' if the text was replaced, 'unchanged' if it already was the "
+                "new text, 'failed' if the update is invalid, and 'not_applied' if "
+                "the update is valid but another one of the batch failed."
+            )
+        ),
+    ]
+    error: Annotated[
+        str | None,
+        Field(description="The reason why the update is invalid, if it failed."),
+    ] = None
+
+
+@dataclass
+class BatchUpdateDocumentOutput:
+    """Output of the update_texts_of_document_items_at_anchors tool."""
+
+    document_key: Annotated[
+        str,
+        Field(description="The unique identifier of the document in the local cache."),
+    ]
+    applied: Annotated[
+        bool,
+        Field(
+            description=(
+                "Whether the updates were applied. Either all updates are applied, or "
+                "none of them if any is invalid."
+            )
+        ),
+    ]
+    results: Annotated[
+        list[DocumentItemUpdateStatus],
+        Field(description="The outcome of every update, in the order given."),
+    ]
+
+
+@mcp.tool(title="Update texts of Docling document items at anchors")
+def update_texts_of_document_items_at_anchors(
+    document_key: Annotated[
+        str,
+        Field(description="The unique identifier of the document in the local cache."),
+    ],
+    updates: Annotated[
+        list[DocumentItemTextUpdate],
+        Field(description="A list of document_anchor and updated_text items."),
+    ],
+) -> BatchUpdateDocumentOutput:
+    """Update the text content of many document items in a single call.
+
+    This tool modifies the text of several existing document items, identified by
+    their anchors, within a document that exists in the local document cache. The
+    updates are all applied, or none of them if any of them is invalid, e.g. if an
+    anchor is not found, is not a textual item or is given more than once. The
+    outcome of every update is returned.
+    """
+    if document_key not in local_document_cache:
+        doc_keys = ", ".join(local_document_cache.keys())
+        raise ValueError(
+            f"document-key: {document_key} is not found. Existing document-keys are: "
+            f"{doc_keys}"
+        )
+
+    anchor_map = local_anchor_cache.get(document_key)
+
+    # validate all the updates before applying any of them
+    items: list[TextItem | None] = []
+    errors: list[str | None] = []
+    seen: set[int] = set()
+    for update in updates:
+        try:
+            resolved = anchor_map.resolve(update.document_anchor)
+        except ValueError as e:
+            items.append(None)
+            errors.append(str(e))
+            continue
+
+        if not isinstance(resolved, TextItem):
+            items.append(None)
+            errors.append(f"Item at {update.document_anchor} is not a textual item.")
+        elif id(resolved) in seen:
+            items.append(None)
+            errors.append(
+                f"Item at {update.document_anchor} is updated more than once."
+            )
+        else:
+            seen.add(id(resolved))
+            items.append(resolved)
+            errors.append(None)
+
+    applied = all(error is None for error in errors)
+    if applied:
+        local_transactions.before_update(
+            document_key,
+            [
+                text_item
+                for update, text_item in zip(updates, items, strict=True)
+                if text_item is not None and text_item.text != update.updated_text
+            ],
+        )
+
+    results = []
+    updated = []
+    for update, text_item, error in zip(updates, items, errors, strict=True):
+        if error is not None:
+            results.append(
+                DocumentItemUpdateStatus(update.document_anchor, "failed", error)
+            )
+        elif text_item is None or not applied:
+            results.append(
+                DocumentItemUpdateStatus(update.document_anchor, "not_applied")
+            )
+        elif text_item.text == update.updated_text:
+            results.append(
+                DocumentItemUpdateStatus(update.document_anchor, "unchanged")
+            )
+        else:
+            text_item.text = update.updated_text
+            updated.append(text_item)
+            results.append(DocumentItemUpdateStatus(update.document_anchor, "updated"))
+
+    if updated:
+        local_document_versions.record(document_key, updated=updated)
+
+    return BatchUpdateDocumentOutput(
+        document_key=document_key, applied=applied, results=results
+    )
+
+
+@dataclass
+class DeleteDocumentItemsOutput:
+    """Output of the delete_document_items_at_anchors tool."""
+
+    document_key: Annotated[
+        str,
+        Field(description="The unique identifier of the document in the local cache."),
+    ]
+    moved_anchors: Annotated[
+        dict[str, str],
+        Field(
+            description=(
+                "The new anchor of every remaining item whose anchor shifted after the "
+                "deletion, by its previous anchor. The stable ids of the items do not "
+                "change."
+            ),
+            examples=[{"#/texts/3": "#/texts/2"}],
+        ),
+    ]
+
+
 @mcp.tool(title="Delete Docling document items at anchors")
 def delete_document_items_at_anchors(
     document_key: Annotated[
@@ -310,18 +638,20 @@ def delete_document_items_at_anchors(
         list[str],
         Field(
             description=(
-                "A list of anchor references identifying the items to be deleted from the "
-                "document."
+                "A list of anchor references or stable ids identifying the items to be "
+                "deleted from the document."
             ),
-            examples=["#/texts/2", "#/tables/1"],
+            examples=["#/texts/2", "#/tables/1", "@12"],
         ),
     ],
-) -> UpdateDocumentOutput:
+) -> DeleteDocumentItemsOutput:
     """Delete multiple document items identified by their anchors.
 
     This tool removes specified items from a Docling document that exists in the local
     document cache, based on their anchor references. It requires that the document
-    already exists in the cache before performing the deletion.
+    already exists in the cache before performing the deletion. The anchors of the
+    items after the deleted ones shift, and the tool returns their new anchors, so
+    that the overview of the document does not need to be retrieved again.
     """
     if document_key not in local_document_cache:
         doc_keys = ", ".join(local_document_cache.keys())
@@ -330,12 +660,194 @@ def delete_document_items_at_anchors(
         )
 
     doc = local_document_cache[document_key]
+    anchor_map = local_anchor_cache.get(document_key)
 
-    items = []
-    for _ in document_anchors:
-        ref = RefItem(cref=_)
-        items.append(ref.resolve(doc=doc))
+    # the same item may be given by its anchor and its stable id
+    items = list(
+        {id(item): item for item in map(anchor_map.resolve, document_anchors)}.values()
+    )
 
+    local_transactions.before_delete(document_key)
     doc.delete_items(node_items=items)
+    local_document_versions.record(document_key, removed=items)
+    moved_anchors = anchor_map.refresh()
 
-    return UpdateDocumentOutput(document_key=document_key)
+    return DeleteDocumentItemsOutput(
+        document_key=document_key, moved_anchors=moved_anchors
+    )
+
+
+@dataclass
+class DocumentAnchorId:
+    """The anchor and stable id of an item of a Docling document."""
+
+    document_anchor: Annotated[
+        str,
+        Field(description="The current anchor reference of the item."),
+    ]
+    stable_id: Annotated[
+        str,
+        Field(
+            description=(
+                "The stable id of the item, which does not change when the anchors "
+                "shift after deletions."
+            )
+        ),
+    ]
+
+
+@mcp.tool(title="Get stable ids of Docling document anchors")
+def get_stable_ids_of_document_anchors(
+    document_key: Annotated[
+        str,
+        Field(description="The unique identifier of the document in the local cache."),
+    ],
+    document_anchors: Annotated[
+        list[str],
+        Field(
+            description=(
+                "A list of anchor references or stable ids identifying items of the "
+                "document."
+            ),
+            examples=["#/texts/2", "@12"],
+        ),
+    ],
+) -> list[DocumentAnchorId]:
+    """Get both the current anchor and the stable id of document items.
+
+    The anchors of the items of a document shift when other items are deleted, while
+    their stable ids do not change. Every tool taking an anchor accepts a stable id
+    instead. This tool maps anchors to stable ids, and stable ids to current anchors.
+    """
+    if document_key not in local_document_cache:
+        doc_keys = ", ".join(local_document_cache.keys())
+        raise ValueError(
+            f"document-key: {document_key} is not found. Existing document-keys are: "
+            f"{doc_keys}"
+        )
+
+    anchor_map = local_anchor_cache.get(document_key)
+
+    out = []
+    for anchor in document_anchors:
+        item = anchor_map.resolve(anchor)
+        out.append(
+            DocumentAnchorId(
+                document_anchor=item.self_ref,
+                stable_id=anchor_map.get_stable_id(item),
+            )
+        )
+
+    return out
+
+
+@dataclass
+class DocumentTransactionOutput:
+    """Output of the tools beginning, committing and rolling back transactions."""
+
+    document_key: Annotated[
+        str,
+        Field(description="The unique identifier of the document in the local cache."),
+    ]
+    operations: Annotated[
+        int,
+        Field(
+            description=(
+                "The number of operations committed or rolled back, i.e. the number "
+                "of tool calls which changed the document during the transaction."
+            )
+        ),
+    ]
+    version: Annotated[
+        int,
+        Field(description="The version of the document after the call."),
+    ]
+
+
+@mcp.tool(title="Begin transaction on Docling document")
+def begin_document_transaction(
+    document_key: Annotated[
+        str,
+        Field(description="The unique identifier of the document in the local cache."),
+    ],
+) -> DocumentTransactionOutput:
+    """Begin a transaction, grouping the next changes of a document.
+
+    This tool starts logging the changes made to a document that exists in the local
+    document cache, i.e. the added, updated and deleted items, so that they can all be
+    undone at once with rollback_document_transaction, or kept with
+    commit_document_transaction. Only one transaction can be active on a document.
+    """
+    if document_key not in local_document_cache:
+        doc_keys = ", ".join(local_document_cache.keys())
+        raise ValueError(
+            f"document-key: {document_key} is not found. Existing document-keys are: "
+            f"{doc_keys}"
+        )
+
+    local_transactions.begin(document_key)
+
+    return DocumentTransactionOutput(
+        document_key=document_key,
+        operations=0,
+        version=local_document_versions.get(document_key),
+    )
+
+
+@mcp.tool(title="Commit transaction on Docling document")
+def commit_document_transaction(
+    document_key: Annotated[
+        str,
+        Field(description="The unique identifier of the document in the local cache."),
+    ],
+) -> DocumentTransactionOutput:
+    """Commit the active transaction of a document, keeping its changes.
+
+    This tool ends the transaction begun with begin_document_transaction on a document
+    that exists in the local document cache. The changes made during the transaction
+    are kept and can no longer be rolled back.
+    """
+    if document_key not in local_document_cache:
+        doc_keys = ", ".join(local_document_cache.keys())
+        raise ValueError(
+            f"document-key: {document_key} is not found. Existing document-keys are: "
+            f"{doc_keys}"
+        )
+
+    operations = local_transactions.commit(document_key)
+
+    return DocumentTransactionOutput(
+        document_key=document_key,
+        operations=operations,
+        version=local_document_versions.get(document_key),
+    )
+
+
+@mcp.tool(title="Roll back transaction on Docling document")
+def rollback_document_transaction(
+    document_key: Annotated[
+        str,
+        Field(description="The unique identifier of the document in the local cache."),
+    ],
+) -> DocumentTransactionOutput:
+    """Roll back the active transaction of a document, undoing its changes.
+
+    This tool ends the transaction begun with begin_document_transaction on a document
+    that exists in the local document cache, and restores the document as it was when
+    the transaction began: added items are deleted, updated texts are restored, and
+    deleted items are put back with their anchors and stable ids.
+    """
+    if document_key not in local_document_cache:
+        doc_keys = ", ".join(local_document_cache.keys())
+        raise ValueError(
+            f"document-key: {document_key} is not found. Existing document-keys are: "
+            f"{doc_keys}"
+        )
+
+    operations = local_transactions.rollback(document_key)
+
+    return DocumentTransactionOutput(
+        document_key=document_key,
+        operations=operations,
+        version=local_document_versions.get(document_key),
+    )
@@ -0,0 +1,345 @@
+"""This module groups the edits of cached Docling documents into transactions."""
+
+import threading
+import warnings
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from docling_core.types.doc.document import (
+    DoclingDocument,
+    FormItem,
+    KeyValueItem,
+    NodeItem,
+    RefItem,
+    RichTableCell,
+    TableItem,
+    TextItem,
+)
+
+from docling_mcp.anchors import ITEM_LISTS, AnchorMapCache
+from docling_mcp.docling_cache import DocumentCache
+from docling_mcp.logger import setup_logger
+from docling_mcp.versions import DocumentChange, DocumentVersions
+
+# Create a default project logger
+logger = setup_logger()
+
+# fields of the items referencing other items, which deletions replace
+_REF_FIELDS = ("parent", "children", "captions", "references", "footnotes", "comments")
+
+
+def _iter_all_nodes(doc: DoclingDocument) -> Iterator[NodeItem]:
+    """Iterate over all the nodes of a document, whether in its tree or not."""
+    yield doc.body
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=DeprecationWarning)
+        yield doc.furniture
+    for name in ITEM_LISTS:
+        yield from getattr(doc, name, [])
+
+
+@dataclass
+class StructureSnapshot:
+    """The references between the items of a document, at some point in time.
+
+    A snapshot only holds references to the items and to their references, which
+    deletions replace rather than modify, so that it is cheap to take and restore.
+    """
+
+    lists: dict[str, list[NodeItem]]
+    nodes: list[tuple[NodeItem, str, dict[str, Any]]]
+    # references modified in place by deletions, along with their previous target
+    refs: list[tuple[RefItem, str]]
+    # rich table cells and graph cells, along with their reference
+    cells: list[tuple[Any, str, Any]]
+
+    @classmethod
+    def capture(cls, doc: DoclingDocument) -> "StructureSnapshot":
+        """Take a snapshot of the structure of a document."""
+        lists = {
+            name: list(getattr(doc, name)) for name in ITEM_LISTS if hasattr(doc, name)
+        }
+        nodes = []
+        refs: list[tuple[RefItem, str]] = []
+        cells: list[tuple[Any, str, Any]] = []
+        for node in _iter_all_nodes(doc):
+            fields = {}
+            for name in _REF_FIELDS:
+                if name in type(node).model_fields:
+                    value = getattr(node, name)
+                    fields[name] = list(value) if isinstance(value, list) else value
+            nodes.append((node, node.self_ref, fields))
+
+            refs.extend((ref, ref.cref) for ref in getattr(node, "comments", []))
+            if isinstance(node, TableItem):
+                cells.extend(
+                    (cell, "ref", cell.ref)
+                    for cell in node.data.table_cells
+                    if isinstance(cell, RichTableCell)
+                )
+            if isinstance(node, KeyValueItem | FormItem):
+                cells.extend(
+                    (cell, "item_ref", cell.item_ref) for cell in node.graph.cells
+                )
+
+        return cls(lists=lists, nodes=nodes, refs=refs, cells=cells)
+
+    def restore(self, doc: DoclingDocument) -> list[NodeItem]:
+        """Restore the structure of a document.
+
+        Returns:
+            The items which were restored in the document.
+        """
+        present = {id(node) for name in ITEM_LISTS for node in getattr(doc, name, [])}
+        restored = [
+            node
+            for nodes in self.lists.values()
+            for node in nodes
+            if id(node) not in present
+        ]
+
+        for name, nodes in self.lists.items():
+            getattr(doc, name)[:] = nodes
+        for node, self_ref, fields in self.nodes:
+            node.self_ref = self_ref
+            for name, value in fields.items():
+                setattr(node, name, list(value) if isinstance(value, list) else value)
+        for ref, cref in self.refs:
+            ref.cref = cref
+        for cell, name, value in self.cells:
+            setattr(cell, name, value)
+
+        return restored
+
+
+@dataclass
+class _TextEdit:
+    items: list[TextItem]
+    texts: list[str]
+
+
+@dataclass
+class _Addition:
+    items: list[NodeItem]
+
+
+@dataclass
+class _Deletion:
+    snapshot: StructureSnapshot
+    stable_ids: dict[int, str]
+
+
+@dataclass
+class Transaction:
+    """The log of the operations applied to a document since a transaction began."""
+
+    document_key: str
+    doc: DoclingDocument
+    stack: list[NodeItem] | None
+    operations: list[_TextEdit | _Addition | _Deletion] = field(default_factory=list)
+
+
+class DocumentTransactions:
+    """Transactions over the documents of a document cache.
+
+    While a transaction is active on a document, the tools changing it log the
+    inverse of their operations: the previous texts of the updated items, the added
+    items, and a snapshot of the structure before deletions. A rollback undoes the
+    operations in reverse order, without ever copying the document.
+
+    Tools must report text updates and deletions before applying them, while added
+    items are picked up from the changes recorded with the document versions. The
+    document of a transaction is pinned in memory, since a reloaded document would
+    not hold the logged items.
+    """
+
+    def __init__(
+        self,
+        documents: DocumentCache,
+        versions: DocumentVersions,
+        anchors: AnchorMapCache,
+        stacks: dict[str, list[NodeItem]],
+    ):
+        self.documents = documents
+        self.versions = versions
+        self.anchors = anchors
+        self.stacks = stacks
+
+        self._transactions: dict[str, Transaction] = {}
+        self._lock = threading.RLock()
+
+        versions.add_listener(self._apply_change)
+        documents.add_evict_callback(self._evict)
+
+    def begin(self, document_key: str) -> Transaction:
+        """Begin a transaction on a document.
+
+        Raises:
+            ValueError: If a transaction is already active on the document.
+        """
+        with self._lock:
+            if document_key in self._transactions:
+                raise ValueError(
+                    f"A transaction is already active on document-key: {document_key}."
+                )
+            self.documents.pin(document_key)
+            doc = self.documents[document_key]
+            stack = self.stacks.get(document_key)
+            transaction = Transaction(
+                document_key=document_key,
+                doc=doc,
+                stack=list(stack) if stack is not None else None,
+            )
+            self._transactions[document_key] = transaction
+            return transaction
+
+    def is_active(self, document_key: str) -> bool:
+        """Whether a transaction is active on a document."""
+        with self._lock:
+            return document_key in self._transactions
+
+    def before_update(self, document_key: str, items: Sequence[TextItem]) -> None:
+        """Log the texts of items about to be updated."""
+        with self._lock:
+            transaction = self._transactions.get(document_key)
+            if transaction is not None and items:
+                transaction.operations.append(
+                    _TextEdit(items=list(items), texts=[item.text for item in items])
+                )
+
+    def before_delete(self, document_key: str) -> None:
+        """Log the structure of a document about to have items deleted."""
+        with self._lock:
+            transaction = self._transactions.get(document_key)
+            if transaction is not None:
+                transaction.operations.append(
+                    _Deletion(
+                        snapshot=StructureSnapshot.capture(transaction.doc),
+                        stable_ids=self.anchors.get(document_key).get_stable_ids(),
+                    )
+                )
+
+    def commit(self, document_key: str) -> int:
+        """Keep the changes made during the transaction on a document.
+
+        Returns:
+            The number of operations of the transaction.
+
+        Raises:
+            ValueError: If no transaction is active on the document.
+        """
+        with self._lock:
+            transaction = self._pop(document_key)
+            return len(transaction.operations)
+
+    def rollback(self, document_key: str) -> int:
+        """Undo the changes made during the transaction on a document.
+
+        Returns:
+            The number of operations undone.
+
+        Raises:
+            ValueError: If no transaction is active on the document.
+        """
+        with self._lock:
+            transaction = self._pop(document_key)
+            if self.documents[document_key] is not transaction.doc:
+                raise ValueError(
+                    f"document-key: {document_key} was replaced during the "
+                    "transaction, which cannot be rolled back."
+                )
+
+            doc = transaction.doc
+            updated: dict[int, NodeItem] = {}
+            added: dict[int, NodeItem] = {}
+            removed: dict[int, NodeItem] = {}
+            stable_ids: dict[int, str] = {}
+
+            operations = list(transaction.operations)
+            while operations:
+                operation = operations.pop()
+                if isinstance(operation, _TextEdit):
+                    for item, text in zip(
+                        operation.items, operation.texts, strict=True
+                    ):
+                        item.text = text
+                        updated[id(item)] = item
+
+                elif isinstance(operation, _Deletion):
+                    for node in operation.snapshot.restore(doc):
+                        added[id(node)] = node
+                        removed.pop(id(node), None)
+                    stable_ids.update(operation.stable_ids)
+
+                else:
+                    # delete the items of consecutive additions at once
+                    items = list(operation.items)
+                    while operations and isinstance(operations[-1], _Addition):
+                        items.extend(operations.pop().items)  # type: ignore[union-attr]
+                    for node in self._delete_added(doc, items):
+                        removed[id(node)] = node
+                        added.pop(id(node), None)
+
+            if transaction.stack is not None:
+                self.stacks[document_key] = transaction.stack
+            else:
+                self.stacks.pop(document_key, None)
+
+            self.anchors.get(document_key).refresh(stable_ids)
+            if transaction.operations:
+                self.versions.record(
+                    document_key,
+                    added=list(added.values()),
+                    updated=list(updated.values()),
+                    removed=list(removed.values()),
+                )
+
+            logger.info(
+                f"Rolled back {len(transaction.operations)} operations on "
+                f"document {document_key}"
+            )
+            return len(transaction.operations)
+
+    def _delete_added(
+        self, doc: DoclingDocument, items: list[NodeItem]
+    ) -> list[NodeItem]:
+        """Delete added items, along with their children, if still in the document."""
+        present = {id(node) for name in ITEM_LISTS for node in getattr(doc, name, [])}
+        items = [item for item in items if id(item) in present]
+        if not items:
+            return []
+
+        # deleting a parent also deletes its children, which must not be given
+        ids = {id(item) for item in items}
+        roots = [
+            item
+            for item in items
+            if item.parent is None or id(item.parent.resolve(doc=doc)) not in ids
+        ]
+        doc.delete_items(node_items=roots)
+
+        return items
+
+    def _pop(self, document_key: str) -> Transaction:
+        if document_key not in self._transactions:
+            raise ValueError(
+                f"No transaction is active on document-key: {document_key}."
+            )
+        self.documents.unpin(document_key)
+        return self._transactions.pop(document_key)
+
+    def _apply_change(self, change: DocumentChange) -> None:
+        with self._lock:
+            transaction = self._transactions.get(change.document_key)
+            if transaction is not None and change.added:
+                transaction.operations.append(_Addition(items=list(change.added)))
+
+    def _evict(self, document_key: str) -> None:
+        with self._lock:
+            if document_key in self._transactions:
+                logger.warning(
+                    f"Dropped the transaction on document {document_key}, which was "
+                    "deleted"
+                )
+                del self._transactions[document_key]
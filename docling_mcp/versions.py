@@ -0,0 +1,96 @@
+"""This module tracks the changes made to the cached Docling documents."""
+
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+
+from docling_core.types.doc.document import NodeItem
+
+from docling_mcp.docling_cache import DocumentCache
+
+
+@dataclass
+class DocumentChange:
+    """A change made to a document by a tool."""
+
+    document_key: str
+    version: int
+    added: list[NodeItem] = field(default_factory=list)
+    updated: list[NodeItem] = field(default_factory=list)
+    removed: list[NodeItem] = field(default_factory=list)
+
+    @property
+    def structural(self) -> bool:
+        """Whether items were added to or removed from the document."""
+        return bool(self.added or self.removed)
+
+
+class DocumentVersions:
+    """Version counters of the documents of a document cache.
+
+    Tools changing a document record the items they added, updated or removed,
+    which bumps the version of the document and notifies the listeners, e.g. the
+    indexes to update. Replacing a document in the cache bumps its version too,
+    without notifying the listeners, which rebuild the state of a replaced document
+    on its next use. Versions are kept while a document is spilled to disk, and
+    forgotten when it is deleted from the cache.
+    """
+
+    def __init__(self, documents: DocumentCache):
+        self.documents = documents
+        self._versions: dict[str, int] = {}
+        self._listeners: list[Callable[[DocumentChange], None]] = []
+        self._lock = threading.RLock()
+
+        documents.add_evict_callback(self._evict)
+        documents.add_replace_callback(self._replace)
+
+    def add_listener(self, listener: Callable[[DocumentChange], None]) -> None:
+        """Register a function called with every change of a document."""
+        self._listeners.append(listener)
+
+    def get(self, document_key: str) -> int:
+        """Get the current version of a document, 0 if it was never changed."""
+        with self._lock:
+            return self._versions.get(document_key, 0)
+
+    def record(
+        self,
+        document_key: str,
+        added: Sequence[NodeItem] = (),
+        updated: Sequence[NodeItem] = (),
+        removed: Sequence[NodeItem] = (),
+    ) -> int:
+        """Record a change of a document and notify the listeners.
+
+        The listeners are notified once the lock of the versions is released.
+
+        Returns:
+            The new version of the document.
+        """
+        with self._lock:
+            version = self._versions.get(document_key, 0) + 1
+            self._versions[document_key] = version
+
+        change = DocumentChange(
+            document_key=document_key,
+            version=version,
+            added=list(added),
+            updated=list(updated),
+            removed=list(removed),
+        )
+        # the listeners may take the lock of the document cache, never held here
+        for listener in self._listeners:
+            listener(change)
+
+        return version
+
+    def _evict(self, document_key: str) -> None:
+        deleted = document_key not in self.documents
+        with self._lock:
+            if deleted:
+                self._versions.pop(document_key, None)
+
+    def _replace(self, document_key: str) -> None:
+        with self._lock:
+            self._versions[document_key] = self._versions.get(document_key, 0) + 1
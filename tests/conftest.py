@@ -2,11 +2,13 @@
 
 from collections.abc import AsyncGenerator
 from contextlib import AsyncExitStack
+from pathlib import Path
 from typing import Any
 
+import pytest
 import pytest_asyncio
 from mcp import ClientSession, StdioServerParameters, Tool
-from mcp.client.stdio import stdio_client
+from mcp.client.stdio import get_default_environment, stdio_client
 
 
 class MCPClient:
@@ -15,17 +17,20 @@ class MCPClient:
         self.session: ClientSession | None = None
         self.exit_stack = AsyncExitStack()
 
-    async def connect_to_server(self, server_script_path: str) -> None:
+    async def connect_to_server(
+        self, server_script_path: str, env: dict[str, str] | None = None
+    ) -> None:
         """Connect to an MCP server
 
         Args:
             server_script_path: Path to the server script
+            env: Environment variables of the server process
         """
         if not server_script_path.endswith(".py"):
             raise ValueError("Server script must be a .py file")
 
         server_params = StdioServerParameters(
-            command="python", args=[server_script_path], env=None
+            command="python", args=[server_script_path], env=env
         )
 
         stdio_transport = await self.exit_stack.enter_async_context(
@@ -65,8 +70,14 @@ class MCPClient:
 
 
 @pytest_asyncio.fixture()
-async def mcp_client() -> AsyncGenerator[Any, Any]:
+async def mcp_client(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> AsyncGenerator[Any, Any]:
+    # isolate the server from the conversions persisted by previous runs
+    cache_dir: Path = tmp_path_factory.mktemp("cache")
+    env = {**get_default_environment(), "CACHE_DIR": str(cache_dir)}
+
     client = MCPClient()
-    await client.connect_to_server("docling_mcp/servers/mcp_server.py")
+    await client.connect_to_server("docling_mcp/servers/mcp_server.py", env=env)
     yield client
     # await client.cleanup()
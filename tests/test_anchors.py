@@ -0,0 +1,60 @@
+"""Test the anchor maps of Docling documents."""
+
+from pathlib import Path
+
+import pytest
+
+from docling_core.types.doc.document import DoclingDocument
+from docling_core.types.doc.labels import DocItemLabel
+
+from docling_mcp.anchors import AnchorMap, AnchorMapCache
+from docling_mcp.docling_cache import DocumentCache
+
+
+def test_anchor_map_keeps_stable_ids() -> None:
+    doc = DoclingDocument(name="test")
+    first = doc.add_text(label=DocItemLabel.TEXT, text="first")
+    second = doc.add_text(label=DocItemLabel.TEXT, text="second")
+    third = doc.add_text(label=DocItemLabel.TEXT, text="third")
+    anchor_map = AnchorMap(doc)
+
+    assert anchor_map.resolve("#/texts/1") is second
+    stable_id = anchor_map.get_stable_id(third)
+    assert anchor_map.resolve(stable_id) is third
+    with pytest.raises(ValueError):
+        anchor_map.resolve("#/texts/3")
+
+    # items added since the map was built are found
+    fourth = doc.add_text(label=DocItemLabel.TEXT, text="fourth")
+    assert anchor_map.resolve("#/texts/3") is fourth
+
+    doc.delete_items(node_items=[first])
+    assert anchor_map.refresh() == {
+        "#/texts/1": "#/texts/0",
+        "#/texts/2": "#/texts/1",
+        "#/texts/3": "#/texts/2",
+    }
+    assert anchor_map.resolve("#/texts/1") is third
+    assert anchor_map.resolve(stable_id) is third
+    assert anchor_map.get_stable_id(third) == stable_id
+
+
+def test_anchor_map_cache_restores_spilled_ids(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    documents = DocumentCache(max_documents=1)
+    anchor_maps = AnchorMapCache(documents)
+
+    doc = DoclingDocument(name="first")
+    item = doc.add_text(label=DocItemLabel.TEXT, text="text")
+    documents["first"] = doc
+    stable_id = anchor_maps.get("first").get_stable_id(item)
+
+    # spill the first document to disk, then reload it
+    documents["second"] = DoclingDocument(name="second")
+    assert not documents.is_resident("first")
+
+    anchor_map = anchor_maps.get("first")
+    assert anchor_map.doc is not doc
+    assert anchor_map.resolve(stable_id).self_ref == item.self_ref
@@ -1,13 +1,28 @@
 """Test the Docling MCP server conversion tools."""
 
+import asyncio
 import shutil
 from collections.abc import AsyncGenerator
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
 import pytest
+from mcp.shared.exceptions import McpError
 from mcp.types import TextContent
 
+from docling.exceptions import ConversionError
+from docling_core.types.doc.document import DocItem, DoclingDocument
+
+from docling_mcp.shared import local_document_cache
+from docling_mcp.tools import conversion
+from docling_mcp.tools.conversion import (
+    _convert_files_in_batches,
+    _iter_page_chunks,
+    _merge_page_chunks,
+    stream_document_into_docling_document,
+)
+
 
 @pytest.mark.asyncio
 async def test_convert_directory_files_into_docling_document(
@@ -45,3 +60,337 @@ async def test_convert_directory_files_into_docling_document(
         assert "from_cache" in item
         assert not item.get("from_cache")
         assert item.get("document_key", None)
+
+
+@pytest.mark.asyncio
+async def test_convert_directory_files_recursively(
+    mcp_client: AsyncGenerator[Any, Any], tmp_path: Path
+) -> None:
+    test_dir = Path(__file__).parent
+    (tmp_path / "reports" / "2025").mkdir(parents=True)
+    (tmp_path / "drafts").mkdir()
+    (tmp_path / "reports" / "drafts").mkdir()
+    shutil.copy(test_dir / "data" / "lorem_ipsum.docx.json", tmp_path)
+    shutil.copy(test_dir / "data" / "amt_handbook_sample.json", tmp_path / "reports")
+    shutil.copy(test_dir / "data" / "2203.01017v2.json", tmp_path / "reports" / "2025")
+    shutil.copy(test_dir / "data" / "2203.01017v2.json", tmp_path / "drafts")
+    shutil.copy(
+        test_dir / "data" / "2203.01017v2.json", tmp_path / "reports" / "drafts"
+    )
+    (tmp_path / "reports" / "notes.unsupported").write_text("not a document")
+
+    res = await mcp_client.call_tool(  # type: ignore[attr-defined]
+        "convert_directory_files_into_docling_document",
+        {"source": str(tmp_path), "recursive": True, "exclude": ["drafts"]},
+    )
+    assert not res.isError
+    assert len(res.structuredContent["result"]) == 3
+
+    res = await mcp_client.call_tool(  # type: ignore[attr-defined]
+        "convert_directory_files_into_docling_document",
+        {
+            "source": str(tmp_path),
+            "recursive": True,
+            "include": ["reports/**/*.json"],
+            "exclude": ["drafts"],
+        },
+    )
+    assert not res.isError
+    results = res.structuredContent["result"]
+    assert len(results) == 2
+    assert all(item["from_cache"] for item in results)
+
+    # a star does not match the slashes of a path
+    res = await mcp_client.call_tool(  # type: ignore[attr-defined]
+        "convert_directory_files_into_docling_document",
+        {"source": str(tmp_path), "recursive": True, "include": ["reports/*"]},
+    )
+    assert not res.isError
+    assert len(res.structuredContent["result"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_convert_directory_files_isolates_failures(
+    mcp_client: AsyncGenerator[Any, Any], tmp_path: Path
+) -> None:
+    """Validate that failed files are reported and skipped when resuming."""
+    test_dir = Path(__file__).parent
+    shutil.copy(test_dir / "data" / "lorem_ipsum.docx.json", tmp_path)
+    (tmp_path / "broken.json").write_text('{"not": "a docling document"}')
+
+    res = await mcp_client.call_tool(  # type: ignore[attr-defined]
+        "convert_directory_files_into_docling_document",
+        {"source": str(tmp_path)},
+    )
+    assert not res.isError
+    results = {
+        Path(item["source"]).name: item for item in res.structuredContent["result"]
+    }
+    assert results["lorem_ipsum.docx.json"]["status"] in ("converted", "cached")
+    assert results["broken.json"]["status"] == "failed"
+    assert results["broken.json"]["error"]
+
+    res = await mcp_client.call_tool(  # type: ignore[attr-defined]
+        "convert_directory_files_into_docling_document",
+        {"source": str(tmp_path)},
+    )
+    assert not res.isError
+    results = {
+        Path(item["source"]).name: item for item in res.structuredContent["result"]
+    }
+    assert results["lorem_ipsum.docx.json"]["status"] == "cached"
+    assert results["broken.json"]["status"] == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_conversion_job(mcp_client: AsyncGenerator[Any, Any]) -> None:
+    """Validate the submission of a conversion job and the retrieval of its result."""
+    source = str(Path(__file__).parent / "data" / "lorem_ipsum.docx.json")
+    res = await mcp_client.call_tool(  # type: ignore[attr-defined]
+        "submit_conversion_job", {"source": source}
+    )
+    assert not res.isError
+    job_id = res.structuredContent["job_id"]
+
+    for _ in range(100):
+        res = await mcp_client.call_tool(  # type: ignore[attr-defined]
+            "get_conversion_job_status", {"job_id": job_id}
+        )
+        assert not res.isError
+        if res.structuredContent["status"] not in ("queued", "running"):
+            break
+        await asyncio.sleep(0.1)
+    assert res.structuredContent["status"] == "succeeded"
+
+    res = await mcp_client.call_tool(  # type: ignore[attr-defined]
+        "get_conversion_job_result", {"job_id": job_id}
+    )
+    assert not res.isError
+    assert res.structuredContent["document_key"]
+
+
+@pytest.mark.asyncio
+async def test_convert_document_with_profile(
+    mcp_client: AsyncGenerator[Any, Any],
+) -> None:
+    """Validate that each conversion profile caches its own documents."""
+    source = str(Path(__file__).parent / "data" / "amt_handbook_sample.json")
+    keys = []
+    for profile in ("fast", "accurate"):
+        res = await mcp_client.call_tool(  # type: ignore[attr-defined]
+            "convert_document_into_docling_document",
+            {"source": source, "profile": profile},
+        )
+        assert not res.isError
+        keys.append(res.structuredContent["document_key"])
+    assert keys[0] != keys[1]
+
+    res = await mcp_client.call_tool(  # type: ignore[attr-defined]
+        "convert_document_into_docling_document",
+        {"source": source, "profile": "unknown"},
+    )
+    assert res.isError
+
+
+@pytest.mark.asyncio
+async def test_convert_files_in_batches_with_same_names(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Validate that results are matched to files by path, not only by name."""
+    files = [tmp_path / "a" / "report.pdf", tmp_path / "b" / "report.pdf"]
+    doc = DoclingDocument(name="report")
+
+    class Converter:
+        def convert_all(self, files: list[Path], raises_on_error: bool) -> Any:
+            # Docling skipped the first file
+            yield SimpleNamespace(
+                input=SimpleNamespace(file=files[1]), status=None, document=doc
+            )
+
+    monkeypatch.setattr(conversion, "_get_converter", lambda profile, ocr: Converter())
+
+    results = [result async for result in _convert_files_in_batches(files, "balanced")]
+    assert results == [
+        (0, None, "Conversion failed: the file was not converted"),
+        (1, doc, None),
+    ]
+
+
+def test_warm_up_converter(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Validate that the conversion workers warm up every OCR variant they use."""
+    warmed: list[tuple[str, bool]] = []
+
+    class Converter:
+        def __init__(self, profile: str, ocr: bool):
+            self.key = (profile, ocr)
+
+        def initialize_pipeline(self, input_format: Any) -> None:
+            warmed.append(self.key)
+
+    monkeypatch.setattr(conversion, "_get_converter", Converter)
+    monkeypatch.setattr(conversion.settings, "ocr_triage", True)
+    conversion._warm_up_converter()
+    profile = conversion.settings.default_profile
+    assert warmed == [(profile, True), (profile, False)]
+
+    warmed.clear()
+    monkeypatch.setattr(conversion.settings, "ocr_triage", False)
+    conversion._warm_up_converter()
+    assert warmed == [(profile, True)]
+
+
+def test_merge_page_chunks() -> None:
+    """Validate that merged chunks of pages keep their original page numbers."""
+    doc = DoclingDocument.load_from_json(
+        filename=Path(__file__).parent / "data" / "2203.01017v2.json"
+    )
+    chunks = [_merge_page_chunks([doc], 1, 8), _merge_page_chunks([doc], 9, 16)]
+    assert sorted(chunks[1].pages) == list(range(9, 17))
+
+    def items(doc: DoclingDocument) -> list[tuple[int, str | None]]:
+        return [
+            (item.prov[0].page_no, getattr(item, "text", None))
+            for item, _ in doc.iterate_items()
+            if isinstance(item, DocItem) and item.prov
+        ]
+
+    merged = _merge_page_chunks(chunks, 5, 12)
+    assert sorted(merged.pages) == list(range(5, 13))
+    assert all(merged.pages[page_no].page_no == page_no for page_no in merged.pages)
+    assert items(merged) == [item for item in items(doc) if 5 <= item[0] <= 12]
+
+    merged = _merge_page_chunks(chunks, 1, 16)
+    assert merged.export_to_markdown() == doc.export_to_markdown()
+
+
+@pytest.mark.parametrize("page_count", [16, None])
+def test_iter_page_chunks_ends_on_chunk_boundary(
+    page_count: int | None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Validate the chunks of a document ending on a multiple of the chunk size."""
+    doc = DoclingDocument.load_from_json(
+        filename=Path(__file__).parent / "data" / "2203.01017v2.json"
+    )
+    converted: list[tuple[int, int]] = []
+
+    def convert_file(
+        source: str, profile: str, ocr: bool, page_range: tuple[int, int]
+    ) -> DoclingDocument:
+        # like Docling, reject the ranges starting after the last of the 16 pages
+        if page_range[0] > len(doc.pages):
+            raise ConversionError(
+                f"Document has 16 pages, fewer than the requested page_range start "
+                f"{page_range[0]}."
+            )
+        converted.append(page_range)
+        return _merge_page_chunks([doc], *page_range)
+
+    monkeypatch.setattr(conversion.cache_settings, "persistent", False)
+    monkeypatch.setattr(conversion, "get_page_count", lambda source: page_count)
+    monkeypatch.setattr(conversion, "_convert_file", convert_file)
+
+    chunks = list(_iter_page_chunks("doc.pdf", "balanced", False, (1, 40)))
+    assert [sorted(chunk.pages) for chunk in chunks] == [list(range(1, 17))]
+    assert converted == [(1, 16)]
+
+
+@pytest.mark.asyncio
+async def test_stream_document_in_page_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Validate that the pages of a streamed document are published chunk by chunk."""
+    source = str(Path(__file__).parent / "data" / "2203.01017v2.json")
+    doc = DoclingDocument.load_from_json(filename=source)
+    published: list[list[int]] = []
+
+    class Context:
+        async def info(self, message: str) -> None:
+            pass
+
+        async def report_progress(
+            self, progress: float, total: float | None, message: str
+        ) -> None:
+            published_doc = local_document_cache[key]
+            pages = sorted(published_doc.pages)
+            published.append(pages)
+            assert progress == len(pages)
+            assert total == 14
+            assert (
+                published_doc.export_to_markdown()
+                == _merge_page_chunks([doc], pages[0], pages[-1]).export_to_markdown()
+            )
+
+    monkeypatch.setattr(conversion.cache_settings, "persistent", False)
+    monkeypatch.setattr(conversion.settings, "page_chunk_size", 4)
+    monkeypatch.setattr(conversion, "get_page_count", lambda source: len(doc.pages))
+    monkeypatch.setattr(
+        conversion,
+        "_convert_file",
+        lambda source, profile, ocr, page_range: _merge_page_chunks([doc], *page_range),
+    )
+
+    key, _ = conversion._get_document_key(source, "balanced", (3, 20))
+    res = await stream_document_into_docling_document(
+        source,
+        Context(),  # type: ignore[arg-type]
+        profile="balanced",
+        page_range=(3, 20),
+    )
+    try:
+        assert res.document_key == key
+        assert published == [
+            list(range(3, 5)),
+            list(range(3, 9)),
+            list(range(3, 13)),
+            list(range(3, 17)),
+        ]
+        streamed = local_document_cache[key]
+        assert (
+            streamed.export_to_markdown()
+            == _merge_page_chunks([doc], 3, 16).export_to_markdown()
+        )
+    finally:
+        del local_document_cache[key]
+
+    # a failed conversion does not leave the pages published so far in the cache
+    def convert_file(
+        source: str, profile: str, ocr: bool, page_range: tuple[int, int]
+    ) -> DoclingDocument:
+        if page_range[0] > 4:
+            raise RuntimeError("Conversion failed: broken page")
+        return _merge_page_chunks([doc], *page_range)
+
+    monkeypatch.setattr(conversion, "_convert_file", convert_file)
+    published.clear()
+    with pytest.raises(McpError):
+        await stream_document_into_docling_document(
+            source,
+            Context(),  # type: ignore[arg-type]
+            profile="balanced",
+            page_range=(3, 20),
+        )
+    assert published == [list(range(3, 5))]
+    assert key not in local_document_cache
+
+
+@pytest.mark.asyncio
+async def test_stream_document_into_docling_document(
+    mcp_client: AsyncGenerator[Any, Any],
+) -> None:
+    """Validate that a streamed document is cached like a converted one."""
+    source = str(Path(__file__).parent / "data" / "2203.01017v2.json")
+    res = await mcp_client.call_tool(  # type: ignore[attr-defined]
+        "stream_document_into_docling_document",
+        {"source": source, "page_range": [3, 20]},
+    )
+    assert not res.isError
+    assert not res.structuredContent["from_cache"]
+
+    res_convert = await mcp_client.call_tool(  # type: ignore[attr-defined]
+        "convert_document_into_docling_document",
+        {"source": source, "page_range": [3, 20]},
+    )
+    assert not res_convert.isError
+    assert res_convert.structuredContent["from_cache"]
+    assert (
+        res_convert.structuredContent["document_key"]
+        == res.structuredContent["document_key"]
+    )
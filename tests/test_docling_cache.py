@@ -0,0 +1,183 @@
+"""Test the Docling MCP cache utilities."""
+
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from docling_core.types.doc.document import DoclingDocument
+from docling_core.types.doc.labels import DocItemLabel
+
+from docling_mcp.docling_cache import (
+    DocumentCache,
+    estimate_document_size,
+    get_cache_key,
+    get_conversion_store_dir,
+    load_converted_document,
+    save_converted_document,
+)
+from docling_mcp.versions import DocumentChange, DocumentVersions
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_conversion_store_roundtrip(cache_dir: Path) -> None:
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/lorem_ipsum.docx.json")
+    )
+
+    assert load_converted_document("missing") is None
+
+    path = save_converted_document("abc", doc)
+    assert path.parent == get_conversion_store_dir()
+    assert path.parent.parent == cache_dir
+    assert not list(path.parent.glob("*.tmp"))
+
+    loaded = load_converted_document("abc")
+    assert loaded is not None
+    assert loaded.export_to_markdown() == doc.export_to_markdown()
+
+
+def test_conversion_store_discards_corrupt_files(cache_dir: Path) -> None:
+    path = get_conversion_store_dir() / "broken.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert load_converted_document("broken") is None
+    assert not path.exists()
+
+
+def test_cache_key_of_local_files(tmp_path: Path) -> None:
+    first = tmp_path / "first.md"
+    second = tmp_path / "second.md"
+    first.write_text("# Title", encoding="utf-8")
+    second.write_text("# Title", encoding="utf-8")
+
+    # the same content under different paths shares a key
+    key = get_cache_key(str(first))
+    assert key == get_cache_key(str(second))
+    assert key != get_cache_key(str(first), options={"do_ocr": False})
+
+    # a file edited in place gets a new key
+    first.write_text("# Another title", encoding="utf-8")
+    assert get_cache_key(str(first)) != key
+    assert get_cache_key(str(second)) == key
+
+
+def test_cache_key_of_urls() -> None:
+    url = "https://arxiv.org/pdf/2408.09869"
+    assert get_cache_key(url) == get_cache_key(url)
+    assert get_cache_key(url) != get_cache_key(url + "v2")
+
+
+def test_document_cache_spills_least_recently_used(cache_dir: Path) -> None:
+    evicted: list[str] = []
+    reloaded: list[str] = []
+    cache = DocumentCache(max_documents=2)
+    cache.add_evict_callback(evicted.append)
+    cache.add_reload_callback(lambda key, _: reloaded.append(key))
+
+    for key in ("a", "b", "c"):
+        doc = DoclingDocument(name=key)
+        doc.add_text(label=DocItemLabel.TEXT, text=f"text of {key}")
+        cache[key] = doc
+        if key == "b":
+            # touch the first document, so that the second one is evicted
+            assert cache["a"].name == "a"
+
+    assert evicted == ["b"]
+    assert "b" in cache
+    assert not cache.is_resident("b")
+    assert sorted(cache) == ["a", "b", "c"]
+    assert len(cache) == 3
+
+    doc = cache["b"]
+    assert doc.texts[0].text == "text of b"
+    assert reloaded == ["b"]
+    assert cache.is_resident("b")
+    assert evicted == ["b", "a"]
+
+    del cache["a"]
+    assert "a" not in cache
+    assert len(cache) == 2
+    with pytest.raises(KeyError):
+        cache["a"]
+
+
+def test_document_cache_size_limit(cache_dir: Path) -> None:
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/lorem_ipsum.docx.json")
+    )
+    size = estimate_document_size(doc)
+    assert size > 0
+
+    cache = DocumentCache(max_bytes=size, spill_to_disk=False)
+    cache["first"] = doc
+    assert cache.resident_bytes == size
+
+    cache["second"] = doc.model_copy(deep=True)
+    assert "first" not in cache
+    assert cache.is_resident("second")
+
+    # a modified document is re-estimated before evicting
+    cache["second"].add_text(label=DocItemLabel.TEXT, text="x" * 100)
+    assert cache.shrink(max_bytes=2 * size) == 0
+    assert cache.resident_bytes > size
+
+
+def test_document_cache_callbacks_do_not_hold_locks(cache_dir: Path) -> None:
+    cache = DocumentCache(max_documents=1)
+    versions = DocumentVersions(cache)
+
+    def call_from_another_thread(call: Callable[[], object]) -> None:
+        thread = threading.Thread(target=call, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+
+    calls: list[str] = []
+
+    def on_evict(key: str) -> None:
+        # e.g. a tool recording a change while a document is being evicted
+        call_from_another_thread(lambda: versions.record("b"))
+        calls.append(f"evict {key}")
+
+    def on_change(change: DocumentChange) -> None:
+        # e.g. an index checking whether the changed document is in memory
+        call_from_another_thread(lambda: cache.is_resident(change.document_key))
+        calls.append(f"change {change.document_key}")
+
+    cache.add_evict_callback(on_evict)
+    versions.add_listener(on_change)
+
+    cache["a"] = DoclingDocument(name="a")
+    cache["b"] = DoclingDocument(name="b")
+    versions.record("a")
+
+    assert calls == ["change b", "evict a", "change a"]
+
+
+def test_document_versions_of_replaced_documents(cache_dir: Path) -> None:
+    cache = DocumentCache(max_documents=1)
+    versions = DocumentVersions(cache)
+    changes: list[DocumentChange] = []
+    versions.add_listener(changes.append)
+
+    doc = DoclingDocument(name="a")
+    cache["a"] = doc
+    cache["a"] = doc
+    assert versions.get("a") == 0
+
+    cache["a"] = DoclingDocument(name="a")
+    assert versions.get("a") == 1
+
+    # a spilled document is replaced too
+    cache["b"] = DoclingDocument(name="b")
+    cache["a"] = DoclingDocument(name="a")
+    assert versions.get("a") == 2
+    assert versions.get("b") == 0
+    assert changes == []
@@ -7,10 +7,35 @@ import pytest
 from docling_core.types.doc.document import DoclingDocument
 
 from docling_mcp.logger import setup_logger
-from docling_mcp.shared import local_document_cache
+from docling_mcp.shared import (
+    local_document_cache,
+    local_index_cache,
+    local_stack_cache,
+)
+from docling_mcp.tools.generation import (
+    ListItem,
+    add_list_items_to_list_in_docling_document,
+    add_paragraph_to_docling_document,
+    close_list_in_docling_document,
+    open_list_in_docling_document,
+)
 from docling_mcp.tools.manipulation import (
+    CachedDocumentsSearchOutput,
+    DeleteDocumentItemsOutput,
+    DocumentAnchorId,
+    DocumentItemTextUpdate,
     TextSearchOutput,
+    begin_document_transaction,
+    commit_document_transaction,
+    delete_document_items_at_anchors,
+    get_overview_of_document_anchors,
+    get_stable_ids_of_document_anchors,
+    get_text_of_document_item_at_anchor,
+    rollback_document_transaction,
+    search_for_text_in_cached_documents,
     search_for_text_in_document_anchors,
+    update_text_of_document_item_at_anchor,
+    update_texts_of_document_items_at_anchors,
 )
 
 logger = setup_logger()
@@ -109,3 +134,339 @@ def test_search_for_text_in_document_anchors() -> None:
         with open(source_path, "w") as f:
             json.dump(golden_results, f, indent=2)
         logger.info(f"Generated golden search results at {source_path}")
+
+
+def test_search_index_follows_document_changes() -> None:
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/lorem_ipsum.docx.json")
+    )
+    doc_key = "test_doc_index"
+    local_document_cache[doc_key] = doc
+    local_stack_cache[doc_key] = [doc.texts[-1]]
+
+    result = search_for_text_in_document_anchors(document_key=doc_key, text="banana")
+    assert result.result.startswith("No exact text matches nor")
+    index = local_index_cache.get(doc_key)
+
+    anchor = doc.texts[1].get_ref().cref
+    update_text_of_document_item_at_anchor(
+        document_key=doc_key, document_anchor=anchor, updated_text="A banana peel"
+    )
+    result = search_for_text_in_document_anchors(document_key=doc_key, text="banana")
+    assert result.result.endswith(f"[anchor:{anchor}]")
+
+    add_paragraph_to_docling_document(
+        document_key=doc_key, paragraph="Another banana, and a banana split"
+    )
+    new_anchor = doc.texts[-1].get_ref().cref
+    result = search_for_text_in_document_anchors(
+        document_key=doc_key, text="split banana"
+    )
+    assert result.result.splitlines()[1:] == [
+        f"[anchor:{new_anchor}] keyword matches (3 total): banana (2 occurrences),"
+        " split (1 occurrences)",
+        f"[anchor:{anchor}] keyword matches (1 total): banana (1 occurrences)",
+    ]
+
+    delete_document_items_at_anchors(document_key=doc_key, document_anchors=[anchor])
+    result = search_for_text_in_document_anchors(document_key=doc_key, text="peel")
+    assert result.result.startswith("No exact text matches nor")
+
+    # the index was updated in place rather than rebuilt
+    assert local_index_cache.get(doc_key) is index
+
+
+def test_search_for_text_in_cached_documents() -> None:
+    handbook = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/amt_handbook_sample.json")
+    )
+    local_document_cache["test_rank_1"] = handbook
+    local_document_cache["test_rank_2"] = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/lorem_ipsum.docx.json")
+    )
+
+    result = search_for_text_in_cached_documents(text="Locking NUTS", top_k=3)
+    assert isinstance(result, CachedDocumentsSearchOutput)
+    assert 0 < len(result.results) <= 3
+    # other tests may cache the same documents under other keys
+    assert local_document_cache[result.results[0].document_key].name == handbook.name
+    assert "nut" in result.results[0].snippet.lower()
+    scores = [_.score for _ in result.results]
+    assert scores == sorted(scores, reverse=True)
+
+    result = search_for_text_in_cached_documents(text="lorem nut", top_k=100)
+    keys = {_.document_key for _ in result.results}
+    assert {"test_rank_1", "test_rank_2"} <= keys
+
+    result = search_for_text_in_cached_documents(text="durian")
+    assert result.results == []
+
+
+def test_search_match_modes() -> None:
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/amt_handbook_sample.json")
+    )
+    doc_key = "test_doc_modes"
+    local_document_cache[doc_key] = doc
+
+    result = search_for_text_in_document_anchors(
+        document_key=doc_key, text="Load carrying NUT", match_mode="phrase"
+    )
+    assert result.result.splitlines() == [
+        "Found phrase matches in the following anchors:",
+        "[anchor:#/texts/3] matching words: load, carrying, nut",
+    ]
+    result = search_for_text_in_document_anchors(
+        document_key=doc_key, text="nut carrying load", match_mode="phrase"
+    )
+    assert result.result.startswith("No phrase matches found")
+
+    prefix = search_for_text_in_document_anchors(
+        document_key=doc_key, text="lock nu", match_mode="prefix"
+    )
+    assert "[anchor:#/texts/1] matching words: locking, nuts" in prefix.result
+
+    # OCR typos match as well as the exact words
+    fuzzy = search_for_text_in_document_anchors(
+        document_key=doc_key, text="lockinq nutt", match_mode="fuzzy"
+    )
+    assert fuzzy.result.replace("fuzzy", "prefix") == prefix.result
+    result = search_for_text_in_document_anchors(
+        document_key=doc_key, text="lockinq", match_mode="fuzzy", max_edits=0
+    )
+    assert result.result.startswith("No fuzzy matches found")
+
+    # the fuzzy index follows the updates of the document
+    update_text_of_document_item_at_anchor(
+        document_key=doc_key, document_anchor="#/texts/4", updated_text="Castellated"
+    )
+    result = search_for_text_in_document_anchors(
+        document_key=doc_key, text="castelated", match_mode="fuzzy"
+    )
+    assert result.result.endswith("[anchor:#/texts/4] matching words: castellated")
+
+
+def test_anchors_after_deletions() -> None:
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/lorem_ipsum.docx.json")
+    )
+    doc_key = "test_doc_anchors"
+    local_document_cache[doc_key] = doc
+
+    [anchor] = get_stable_ids_of_document_anchors(
+        document_key=doc_key, document_anchors=["#/texts/3"]
+    )
+    assert anchor.document_anchor == "#/texts/3"
+    text = get_text_of_document_item_at_anchor(
+        document_key=doc_key, document_anchor=anchor.stable_id
+    ).text
+    assert text == doc.texts[3].text
+
+    result = delete_document_items_at_anchors(
+        document_key=doc_key, document_anchors=["#/texts/1", "#/texts/1"]
+    )
+    assert isinstance(result, DeleteDocumentItemsOutput)
+    assert result.moved_anchors["#/texts/3"] == "#/texts/2"
+
+    # the stable id follows the item to its new anchor
+    [moved] = get_stable_ids_of_document_anchors(
+        document_key=doc_key, document_anchors=[anchor.stable_id]
+    )
+    assert moved == DocumentAnchorId(
+        document_anchor="#/texts/2", stable_id=anchor.stable_id
+    )
+    assert (
+        get_text_of_document_item_at_anchor(
+            document_key=doc_key, document_anchor="#/texts/2"
+        ).text
+        == text
+    )
+    with pytest.raises(ValueError):
+        get_text_of_document_item_at_anchor(
+            document_key=doc_key, document_anchor="@100000"
+        )
+
+
+def test_overview_of_document_anchors() -> None:
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/2203.01017v2.json")
+    )
+    doc_key = "test_doc_overview"
+    local_document_cache[doc_key] = doc
+
+    overview = get_overview_of_document_anchors(document_key=doc_key)
+    lines = overview.structure.splitlines()
+    assert overview.total_lines == len(lines)
+
+    page = get_overview_of_document_anchors(document_key=doc_key, offset=10, limit=5)
+    assert page.structure.splitlines() == lines[10:15]
+    assert page.total_lines == len(lines)
+
+    headings = get_overview_of_document_anchors(document_key=doc_key, max_depth=2)
+    assert headings.structure.splitlines() == [
+        line for line in lines if len(line) - len(line.lstrip()) <= 4
+    ]
+    assert "section_header-1: 1. Introduction" in headings.structure
+
+    # edits are reflected in the overview, along with a new version
+    update_text_of_document_item_at_anchor(
+        document_key=doc_key, document_anchor="#/texts/7", updated_text="Intro"
+    )
+    updated = get_overview_of_document_anchors(document_key=doc_key)
+    assert updated.version is not None and overview.version is not None
+    assert updated.version > overview.version
+    assert updated.structure == overview.structure.replace(
+        "section_header-1: 1. Introduction", "section_header-1: Intro"
+    )
+
+    delete_document_items_at_anchors(
+        document_key=doc_key, document_anchors=["#/texts/7"]
+    )
+    deleted = get_overview_of_document_anchors(document_key=doc_key)
+    assert deleted.total_lines == len(lines) - 1
+    assert "Intro" not in deleted.structure
+
+
+def test_update_texts_of_document_items_at_anchors() -> None:
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/lorem_ipsum.docx.json")
+    )
+    doc_key = "test_doc_batch"
+    local_document_cache[doc_key] = doc
+    texts = [item.text for item in doc.texts]
+
+    # a single invalid update leaves the document untouched
+    result = update_texts_of_document_items_at_anchors(
+        document_key=doc_key,
+        updates=[
+            DocumentItemTextUpdate("#/texts/1", "first"),
+            DocumentItemTextUpdate("#/texts/404", "missing"),
+            DocumentItemTextUpdate("#/body", "not a text"),
+        ],
+    )
+    assert not result.applied
+    assert [_.status for _ in result.results] == ["not_applied", "failed", "failed"]
+    assert [item.text for item in doc.texts] == texts
+
+    result = update_texts_of_document_items_at_anchors(
+        document_key=doc_key,
+        updates=[
+            DocumentItemTextUpdate("#/texts/1", "first banana"),
+            DocumentItemTextUpdate("#/texts/2", texts[2]),
+            DocumentItemTextUpdate("#/texts/3", "second banana"),
+        ],
+    )
+    assert result.applied
+    assert [_.status for _ in result.results] == ["updated", "unchanged", "updated"]
+    assert doc.texts[1].text == "first banana"
+    assert doc.texts[3].text == "second banana"
+
+    search = search_for_text_in_document_anchors(document_key=doc_key, text="banana")
+    assert search.result.splitlines()[1:] == [
+        "[anchor:#/texts/1]",
+        "[anchor:#/texts/3]",
+    ]
+
+    [anchor] = get_stable_ids_of_document_anchors(
+        document_key=doc_key, document_anchors=["#/texts/1"]
+    )
+    result = update_texts_of_document_items_at_anchors(
+        document_key=doc_key,
+        updates=[
+            DocumentItemTextUpdate("#/texts/1", "first"),
+            DocumentItemTextUpdate(anchor.stable_id, "again"),
+        ],
+    )
+    assert not result.applied
+    assert result.results[1].status == "failed"
+
+
+def test_rollback_document_transaction() -> None:
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/lorem_ipsum.docx.json")
+    )
+    doc_key = "test_doc_transaction"
+    local_document_cache[doc_key] = doc
+    local_stack_cache[doc_key] = [doc.texts[-1]]
+    original = doc.export_to_dict()
+
+    anchors = [item.self_ref for item in doc.texts]
+    stable_ids = get_stable_ids_of_document_anchors(
+        document_key=doc_key, document_anchors=anchors
+    )
+    begin_document_transaction(document_key=doc_key)
+    with pytest.raises(ValueError):
+        begin_document_transaction(document_key=doc_key)
+
+    update_text_of_document_item_at_anchor(
+        document_key=doc_key, document_anchor="#/texts/2", updated_text="A banana"
+    )
+    delete_document_items_at_anchors(
+        document_key=doc_key, document_anchors=["#/texts/1", "#/texts/3"]
+    )
+    open_list_in_docling_document(document_key=doc_key)
+    add_list_items_to_list_in_docling_document(
+        document_key=doc_key,
+        list_items=[ListItem(list_item_text="A cherry", list_marker_text="-")],
+    )
+    close_list_in_docling_document(document_key=doc_key)
+    add_paragraph_to_docling_document(document_key=doc_key, paragraph="A mango")
+    update_texts_of_document_items_at_anchors(
+        document_key=doc_key,
+        updates=[DocumentItemTextUpdate(document_anchor="#/texts/1", updated_text="")],
+    )
+    result = search_for_text_in_document_anchors(document_key=doc_key, text="mango")
+    assert not result.result.startswith("No exact text matches nor")
+
+    result = rollback_document_transaction(document_key=doc_key)
+    assert result.operations == 6
+
+    # the document, its anchors and their stable ids are restored
+    assert doc.export_to_dict() == original
+    assert local_stack_cache[doc_key] == [doc.texts[-1]]
+    assert (
+        get_stable_ids_of_document_anchors(
+            document_key=doc_key, document_anchors=anchors
+        )
+        == stable_ids
+    )
+    for text in ("banana", "cherry", "mango"):
+        result = search_for_text_in_document_anchors(document_key=doc_key, text=text)
+        assert result.result.startswith("No exact text matches nor")
+
+    with pytest.raises(ValueError):
+        rollback_document_transaction(document_key=doc_key)
+
+    begin_document_transaction(document_key=doc_key)
+    add_paragraph_to_docling_document(document_key=doc_key, paragraph="A mango")
+    result = commit_document_transaction(document_key=doc_key)
+    assert result.operations == 1
+    assert doc.texts[-1].text == "A mango"
+
+
+def test_transaction_keeps_document_in_memory() -> None:
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/lorem_ipsum.docx.json")
+    )
+    doc_key = "test_doc_transaction_pinned"
+    local_document_cache[doc_key] = doc
+    original = doc.export_to_dict()
+
+    begin_document_transaction(document_key=doc_key)
+    update_text_of_document_item_at_anchor(
+        document_key=doc_key, document_anchor="#/texts/2", updated_text="A banana"
+    )
+
+    # e.g. the memory manager evicting every document under memory pressure
+    local_document_cache.shrink(max_documents=0)
+    assert local_document_cache.is_resident(doc_key)
+
+    result = rollback_document_transaction(document_key=doc_key)
+    assert result.operations == 1
+    assert local_document_cache[doc_key] is doc
+    assert doc.export_to_dict() == original
+
+    # the document can be evicted again once the transaction ended
+    local_document_cache.shrink(max_documents=0)
+    assert not local_document_cache.is_resident(doc_key)
+    del local_document_cache[doc_key]
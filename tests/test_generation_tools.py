@@ -1,16 +1,32 @@
 """Test the Docling MCP server generation tools."""
 
+import gzip
+import importlib.util
+import json
 import re
+from pathlib import Path
+from typing import Any
 
 import pytest
 
+from docling_core.types.doc.document import DoclingDocument
+
 from docling_mcp.logger import setup_logger
-from docling_mcp.shared import local_document_cache
+from docling_mcp.shared import local_document_cache, local_stack_cache
 from docling_mcp.tools.generation import (
     NewDoclingDocumentOutput,
     UpdateDocumentOutput,
+    _parse_html_table,
+    add_paragraph_to_docling_document,
     add_table_in_html_format_to_docling_document,
     create_new_docling_document,
+    export_docling_document_chunk_to_markdown,
+    export_docling_document_to_markdown,
+    save_docling_document,
+)
+from docling_mcp.tools.manipulation import (
+    delete_document_items_at_anchors,
+    update_text_of_document_item_at_anchor,
 )
 
 logger = setup_logger()
@@ -45,3 +61,137 @@ def test_table_in_html_format_to_docling_document(doc_key: str) -> None:
 
     assert isinstance(reply, UpdateDocumentOutput)
     assert reply.document_key == doc_key
+
+    # a repeated table is parsed once, each table item owning a copy of its data
+    hits = _parse_html_table.cache_info().hits
+    reply = add_table_in_html_format_to_docling_document(
+        document_key=doc_key, html_table=html_table
+    )
+    assert isinstance(reply, UpdateDocumentOutput)
+    first, second = local_document_cache[doc_key].tables
+    assert first.data == second.data
+    assert first.data is not second.data
+    assert _parse_html_table.cache_info().hits == hits + 1
+
+
+def test_export_docling_document_to_markdown() -> None:
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/lorem_ipsum.docx.json")
+    )
+    doc_key = "test_doc_export"
+    local_document_cache[doc_key] = doc
+    local_stack_cache[doc_key] = [doc.texts[-1]]
+
+    def export(max_size: int | None = None) -> str:
+        return export_docling_document_to_markdown(
+            document_key=doc_key, max_size=max_size
+        ).markdown
+
+    assert export(max_size=100) == doc.export_to_markdown()[:100]
+    assert export() == doc.export_to_markdown()
+
+    update_text_of_document_item_at_anchor(
+        document_key=doc_key, document_anchor="#/texts/2", updated_text="A banana"
+    )
+    assert "A banana" in export()
+    delete_document_items_at_anchors(
+        document_key=doc_key, document_anchors=["#/texts/1"]
+    )
+    add_paragraph_to_docling_document(document_key=doc_key, paragraph="A mango")
+    assert export() == doc.export_to_markdown()
+    assert export().endswith("A mango")
+    for max_size in (1, 50, 1000, 100000):
+        assert export(max_size=max_size) == doc.export_to_markdown()[:max_size]
+
+
+def test_export_docling_document_chunk_to_markdown() -> None:
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/2203.01017v2.json")
+    )
+    doc_key = "test_doc_export_chunks"
+    local_document_cache[doc_key] = doc
+    local_stack_cache[doc_key] = [doc.texts[-1]]
+
+    def export_all(**kwargs: Any) -> list[str]:
+        chunks = []
+        cursor = None
+        while True:
+            reply = export_docling_document_chunk_to_markdown(
+                document_key=doc_key, cursor=cursor, **kwargs
+            )
+            assert len(reply.markdown) <= kwargs.get("max_size", 10000)
+            chunks.append(reply.markdown)
+            cursor = reply.next_cursor
+            if cursor is None:
+                return chunks
+
+    # the chunks of the whole document make up its markdown export
+    chunks = export_all(max_size=2000)
+    assert len(chunks) > 1
+    assert "".join(chunks) == doc.export_to_markdown()
+
+    [page] = export_all(first_page=2, last_page=2)
+    assert page == doc.export_to_markdown(page_no=2)
+
+    [section] = export_all(start_anchor="#/texts/4", end_anchor="#/texts/6")
+    assert section.startswith("## Abstract")
+    assert section.endswith(doc.texts[6].text)
+
+    reply = export_docling_document_chunk_to_markdown(
+        document_key=doc_key, max_size=2000
+    )
+    assert reply.next_cursor is not None
+    update_text_of_document_item_at_anchor(
+        document_key=doc_key, document_anchor="#/texts/2", updated_text="A banana"
+    )
+    with pytest.raises(ValueError):
+        export_docling_document_chunk_to_markdown(
+            document_key=doc_key, max_size=2000, cursor=reply.next_cursor
+        )
+
+
+def test_save_docling_document(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/lorem_ipsum.docx.json")
+    )
+    doc_key = "test_doc_save"
+    local_document_cache[doc_key] = doc
+    local_stack_cache[doc_key] = [doc.texts[-1]]
+
+    reply = save_docling_document(document_key=doc_key)
+    assert reply.md_file is not None and reply.json_file is not None
+    assert [file.written for file in reply.files] == [True, True]
+    doc.save_as_markdown(filename=tmp_path / "expected.md", text_width=72)
+    doc.save_as_json(filename=tmp_path / "expected.json")
+    assert Path(reply.md_file).read_text() == (tmp_path / "expected.md").read_text()
+    assert Path(reply.json_file).read_text() == (tmp_path / "expected.json").read_text()
+
+    # saving an unchanged document again is skipped
+    reply = save_docling_document(document_key=doc_key, formats=["json", "text"])
+    assert [file.written for file in reply.files] == [False, True]
+    assert reply.md_file is None
+    assert not list(tmp_path.glob("*.tmp"))
+
+    update_text_of_document_item_at_anchor(
+        document_key=doc_key, document_anchor="#/texts/2", updated_text="A banana"
+    )
+    reply = save_docling_document(document_key=doc_key, formats=["json.gz", "json"])
+    assert [file.written for file in reply.files] == [True, True]
+    with gzip.open(reply.files[0].path, "rt", encoding="utf-8") as f:
+        assert DoclingDocument.model_validate(json.load(f)) == doc
+
+    if importlib.util.find_spec("zstandard") is None:
+        with pytest.raises(ValueError):
+            save_docling_document(document_key=doc_key, formats=["json.zst"])
+    else:
+        [file] = save_docling_document(document_key=doc_key, formats=["json.zst"]).files
+        assert Path(file.path).stat().st_size > 0
+
+    # a document replaced under the same key is saved again
+    replaced = doc.model_copy(deep=True)
+    replaced.texts[2].text = "A cherry"
+    local_document_cache[doc_key] = replaced
+    reply = save_docling_document(document_key=doc_key, formats=["json"])
+    assert [file.written for file in reply.files] == [True]
+    assert "A cherry" in Path(reply.files[0].path).read_text()
@@ -0,0 +1,46 @@
+"""Test the inverted index of Docling documents."""
+
+from docling_core.types.doc.document import DoclingDocument
+from docling_core.types.doc.labels import DocItemLabel
+
+from docling_mcp.indexing import DocumentIndex, get_edit_distance, get_max_edits
+
+
+def test_edit_distance() -> None:
+    assert get_edit_distance("nut", "nut", 1) == 0
+    assert get_edit_distance("nut", "nuts", 1) == 1
+    assert get_edit_distance("locking", "lcoking", 2) == 2
+    assert get_edit_distance("locking", "lo", 2) == 3
+    assert get_edit_distance("spring", "string", 0) == 1
+
+    assert get_max_edits("of") == 0
+    assert get_max_edits("bolt") == 1
+    assert get_max_edits("castellated") == 2
+
+
+def test_index_expansions() -> None:
+    doc = DoclingDocument(name="test")
+    doc.add_text(
+        label=DocItemLabel.TEXT, text="The castellated nut and the cotter pin."
+    )
+    item = doc.add_text(label=DocItemLabel.TEXT, text="Self-locking nuts.")
+    index = DocumentIndex(doc)
+
+    assert index.expand_prefix("co") == {"cotter"}
+    assert index.expand_prefix("nu") == {"nut", "nuts"}
+    assert index.expand_fuzzy("nit", 1) == {"nut"}
+    assert index.expand_fuzzy("castelated", 2) == {"castellated"}
+    assert index.expand_fuzzy("xyz", 1) == set()
+
+    # new and removed tokens are reflected in the expansions
+    item.text = "Self-locking cotters."
+    index.update_items([item])
+    assert index.expand_prefix("nu") == {"nut"}
+    assert index.expand_fuzzy("coter", 1) == {"cotter"}
+    assert index.expand_fuzzy("cotter", 1) == {"cotter", "cotters"}
+
+    found = index.find_terms([{"cotter"}, {"pin"}], phrase=True)
+    assert [(_.text, tokens) for _, tokens in found] == [
+        ("The castellated nut and the cotter pin.", ["cotter", "pin"])
+    ]
+    assert index.find_terms([{"pin"}, {"cotter"}], phrase=True) == []
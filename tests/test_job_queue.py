@@ -0,0 +1,62 @@
+"""Test the Docling MCP job queue."""
+
+import threading
+import time
+
+import pytest
+
+from docling_mcp.job_queue import Job, JobQueue
+
+
+def _wait(job: Job, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not job.done and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_job_queue_runs_jobs_by_priority() -> None:
+    release = threading.Event()
+    order: list[str] = []
+    jobs = JobQueue(max_workers=1)
+
+    blocker = jobs.submit(release.wait)
+    low = jobs.submit(lambda: order.append("low"), priority=5)
+    high = jobs.submit(lambda: order.append("high"), priority=-5)
+    failing = jobs.submit(lambda: 1 / 0, priority=10)
+
+    _wait(blocker, timeout=0.1)
+    assert blocker.status == "running"
+    assert jobs.position(high.job_id) == 0
+    assert jobs.position(low.job_id) == 1
+
+    release.set()
+    for job in (blocker, low, high, failing):
+        _wait(job)
+
+    assert order == ["high", "low"]
+    assert blocker.result is True
+    assert failing.status == "failed"
+    assert failing.error == "division by zero"
+
+
+def test_job_queue_cancels_queued_jobs() -> None:
+    release = threading.Event()
+    jobs = JobQueue(max_workers=1, max_pending=2)
+
+    blocker = jobs.submit(release.wait)
+    queued = jobs.submit(lambda: "done")
+    with pytest.raises(ValueError):
+        jobs.submit(lambda: "too many")
+
+    assert jobs.cancel(queued.job_id)
+    assert queued.status == "cancelled"
+    _wait(blocker, timeout=0.1)
+    assert not jobs.cancel(blocker.job_id)
+
+    release.set()
+    _wait(blocker)
+    assert blocker.status == "succeeded"
+    assert queued.result is None
+
+    with pytest.raises(ValueError):
+        jobs.get("unknown")
@@ -7,6 +7,12 @@ from typing import Any
 import anyio
 import pytest
 from mcp import Tool
+from starlette.testclient import TestClient
+from typer.testing import CliRunner
+
+from docling_mcp.servers.mcp_server import app, mcp
+from docling_mcp.shared import server_ready
+from docling_mcp.tools.conversion import warm_up_converters
 
 
 @pytest.mark.asyncio
@@ -16,10 +22,17 @@ async def test_list_tools(mcp_client: AsyncGenerator[Any, Any]) -> None:
     gold_tools = [
         "is_document_in_local_cache",
         "convert_document_into_docling_document",
+        "stream_document_into_docling_document",
+        "submit_conversion_job",
+        "get_conversion_job_status",
+        "cancel_conversion_job",
+        "get_conversion_job_result",
         "convert_directory_files_into_docling_document",
+        "get_memory_statistics",
         # "convert_attachments_into_docling_document",
         "create_new_docling_document",
         "export_docling_document_to_markdown",
+        "export_docling_document_chunk_to_markdown",
         "save_docling_document",
         "page_thumbnail",
         "add_title_to_docling_document",
@@ -31,9 +44,15 @@ async def test_list_tools(mcp_client: AsyncGenerator[Any, Any]) -> None:
         "add_table_in_html_format_to_docling_document",
         "get_overview_of_document_anchors",
         "search_for_text_in_document_anchors",
+        "search_for_text_in_cached_documents",
         "get_text_of_document_item_at_anchor",
         "update_text_of_document_item_at_anchor",
+        "update_texts_of_document_items_at_anchors",
         "delete_document_items_at_anchors",
+        "get_stable_ids_of_document_anchors",
+        "begin_document_transaction",
+        "commit_document_transaction",
+        "rollback_document_transaction",
     ]
 
     assert tools == gold_tools
@@ -80,3 +99,26 @@ async def test_call_tool(mcp_client: AsyncGenerator[Any, Any]) -> None:
     assert len(res.content) == 1
     assert "validation error" in res.content[0].text
     assert res.structuredContent is None
+
+
+def test_health() -> None:
+    client = TestClient(mcp.streamable_http_app())
+    server_ready.clear()
+    res = client.get("/health")
+    assert res.status_code == 503
+    assert res.json() == {"status": "warming-up"}
+
+    server_ready.set()
+    res = client.get("/health")
+    assert res.status_code == 200
+    assert res.json() == {"status": "ready"}
+
+
+def test_warm_up_unknown_profile() -> None:
+    # the server does not start with an unknown profile to warm up
+    res = CliRunner().invoke(app, ["--warmup", "--warmup-profile", "unknown"])
+    assert res.exit_code == 2
+    assert isinstance(res.exception, SystemExit)
+
+    # nor does warming up fail
+    assert not warm_up_converters(["unknown"])
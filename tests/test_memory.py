@@ -0,0 +1,47 @@
+"""Test the Docling MCP memory manager."""
+
+from pathlib import Path
+
+import pytest
+
+from docling_core.types.doc.document import DoclingDocument
+
+from docling_mcp.docling_cache import DocumentCache, estimate_document_size
+from docling_mcp.memory import MemoryManager, get_rss
+
+
+def test_memory_manager_watermarks(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    doc = DoclingDocument.load_from_json(
+        filename=Path("./tests/data/lorem_ipsum.docx.json")
+    )
+    size = estimate_document_size(doc)
+    cache = DocumentCache()
+    manager = MemoryManager(cache, evict_cache_bytes=2 * size)
+
+    assert get_rss() is not None
+    cache["first"] = doc
+    cache["second"] = doc.model_copy(deep=True)
+    manager.check()
+    stats = manager.stats
+    assert stats.checks == 1
+    assert stats.collections == 0
+    assert stats.evictions == 0
+    assert stats.cache_bytes == 2 * size
+
+    # above the watermark, the least recently used document is evicted and
+    # garbage is collected
+    cache["third"] = doc.model_copy(deep=True)
+    manager.check()
+    stats = manager.stats
+    assert stats.evicted_documents == 1
+    assert stats.collections == 1
+    assert not cache.is_resident("first")
+    assert "first" in cache
+
+    # the resident set size grew beyond the allowed growth
+    manager.rss_growth_bytes = -1
+    manager.check()
+    assert manager.stats.collections == 2
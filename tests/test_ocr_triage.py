@@ -0,0 +1,63 @@
+"""Test the OCR triage of the Docling MCP conversions."""
+
+from pathlib import Path
+
+import pypdfium2 as pdfium
+
+from docling_mcp.ocr_triage import has_text_layer
+
+
+def _write_text_pdf(path: Path, text: str) -> None:
+    """Write a single-page PDF file with a text layer."""
+    content = f"BT /F1 12 Tf 20 100 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 400 200] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(data)
+
+
+def test_has_text_layer(tmp_path: Path) -> None:
+    born_digital = tmp_path / "born_digital.pdf"
+    _write_text_pdf(born_digital, "The quick brown fox jumps over the lazy dog")
+    assert has_text_layer(str(born_digital))
+    assert not has_text_layer(str(born_digital), min_chars=1000)
+
+    scanned = tmp_path / "scanned.pdf"
+    pdf = pdfium.PdfDocument.new()
+    pdf.new_page(400, 200)
+    pdf.save(scanned)
+    pdf.close()
+    assert not has_text_layer(str(scanned))
+
+    # a long document with a single scanned page, e.g. the last one
+    mixed = tmp_path / "mixed.pdf"
+    pdf = pdfium.PdfDocument.new()
+    source = pdfium.PdfDocument(born_digital)
+    for _ in range(9):
+        pdf.import_pages(source)
+    pdf.new_page(400, 200)
+    pdf.save(mixed)
+    pdf.close()
+    source.close()
+    assert not has_text_layer(str(mixed))
+
+    assert not has_text_layer(str(tmp_path / "missing.pdf"))
+    assert not has_text_layer("https://arxiv.org/pdf/2408.09869")